@@ -10,7 +10,11 @@ from dotenv import load_dotenv
 from .models import db, User
 from .api import user_routes, auth_routes, restaurant_routes, favorite_routes, review_routes, review_img_routes, menu_item_routes, menu_item_img_routes, shopping_cart_routes, order_routes, payment_routes, maps_routes, ubereats_routes, s3_routes, delivery_routes
 from .seeds import seed_commands
+from .benchmarks import benchmark_commands
+from .stubs import stub_commands
 from .config import Config, cache
+from .helper_functions import build_restaurant_spatial_index
+from sqlalchemy.exc import SQLAlchemyError
 
 import logging
 from logging.handlers import RotatingFileHandler
@@ -33,8 +37,10 @@ login.login_view = 'auth.unauthorized'
 def load_user(id):
     return User.query.get(int(id))
 
-# Tell flask about our seed commands
+# Tell flask about our seed, benchmark and stub commands
 app.cli.add_command(seed_commands)
+app.cli.add_command(benchmark_commands)
+app.cli.add_command(stub_commands)
 
 app.config.from_object(Config)
 
@@ -67,6 +73,14 @@ app.register_blueprint(s3_routes, url_prefix='/s3')
 
 db.init_app(app)
 Migrate(app, db)
+
+# Warm the nearby spatial index when the worker starts (it is built lazily otherwise)
+if app.config.get('SPATIAL_INDEX_ENABLED'):
+    with app.app_context():
+        try:
+            build_restaurant_spatial_index()
+        except SQLAlchemyError as e:
+            app.logger.warning(f"Spatial index not built at startup: {e}")
 csrf = CSRFProtect(app)
 # Application Security
 CORS(app)
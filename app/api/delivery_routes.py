@@ -1,4 +1,5 @@
 from flask import Blueprint, request, jsonify, abort, current_app
+from flask_login import login_required, current_user
 from app.models import (
     User,
     db,
@@ -11,15 +12,33 @@ from app.models import (
     Delivery,
 )
 from ..forms import DeliveryForm
+from ..helper_functions import idempotent, publish_delivery_status, owns_restaurant_of_delivery
 from sqlite3 import OperationalError
 from sqlalchemy.exc import SQLAlchemyError
 import uuid
 import logging
+from datetime import datetime
 
 delivery = 0
 logging.basicConfig(level=logging.INFO)
 delivery_routes = Blueprint("delivery_routes", __name__)
 
+DELIVERY_STATUSES = ["Pending", "Shipped", "Delivered"]
+
+
+def validate_delivery_status(status):
+    """
+    Validates the provided status against allowed values.
+
+    Args:
+        status (str): The status to validate.
+
+    Raises:
+        ValueError: If the status is not allowed.
+    """
+    if status not in DELIVERY_STATUSES:
+        raise ValueError(f"Invalid status: {status}. Allowed statuses are: {', '.join(DELIVERY_STATUSES)}.")
+
 
 @delivery_routes.route("", methods=["GET"])
 def get_deliverys():
@@ -37,6 +56,8 @@ def get_delivery(delivery_id):
 
 
 @delivery_routes.route("", methods=["POST"])
+@login_required
+@idempotent('deliveries.create')
 def create_delivery():
     """
     Creates a new delivery record in the database.
@@ -99,6 +120,51 @@ def delete_delivery(delivery_id):
         return abort(404, description="delivery record not found")
 
 
+@delivery_routes.route("/<int:delivery_id>/status", methods=["PUT"])
+@login_required
+def update_delivery_status(delivery_id):
+    """
+    Updates the status of a delivery and publishes the transition to the
+    order event stream. Only the owner of the restaurant fulfilling the
+    delivery's order can update it.
+
+    Returns:
+        Response: The updated delivery record or an error message.
+    """
+    delivery = Delivery.query.get(delivery_id)
+    if not delivery:
+        return abort(404, description="delivery record not found")
+    if not owns_restaurant_of_delivery(current_user, delivery_id):
+        return jsonify({"error": "Unauthorized."}), 403
+
+    data = request.get_json() or {}
+    status = data.get("status")
+    try:
+        validate_delivery_status(status)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        previous_status = delivery.status
+        delivery.status = status
+        if status == "Shipped" and not delivery.shipped_at:
+            delivery.shipped_at = datetime.utcnow()
+        if data.get("estimated_delivery"):
+            delivery.estimated_delivery = datetime.fromisoformat(data["estimated_delivery"])
+        db.session.commit()
+    except ValueError:
+        db.session.rollback()
+        return jsonify({"error": "estimated_delivery must be an ISO datetime"}), 400
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logging.error("SQLAlchemyError occurred: %s", e)
+        return jsonify({"error": "Database operation failed."}), 500
+
+    if delivery.status != previous_status:
+        publish_delivery_status(delivery, previous_status)
+    return jsonify(delivery.to_dict()), 200
+
+
 @delivery_routes.route("/<int:delivery_id>/track", methods=["GET"])
 def track_delivery(delivery_id):
     delivery = Delivery.query.get(delivery_id)
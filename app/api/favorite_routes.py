@@ -1,4 +1,5 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy.exc import IntegrityError
 from ..models import db, User, Review
 from app.models import db, Favorite
 
@@ -35,6 +36,14 @@ def create_or_delete_favorite():
         db.session.add(new_favorite)
         db.session.commit()
         return {"action": "added", "favorite": new_favorite.to_dict()}, 201
+    except IntegrityError:
+        # A double submit added the same favorite first (unique_user_restaurant)
+        db.session.rollback()
+        existing_favorite = Favorite.query.filter_by(user_id=user_id, restaurant_id=restaurant_id).first()
+        if existing_favorite is None:
+            return {"error": "Favorite creation failed: invalid user or restaurant"}, 400
+        return {"action": "added", "message": "Favorite already added",
+                "favorite": existing_favorite.to_dict()}, 200
     except Exception as e:
         db.session.rollback()
         return {"error": f"Favorite creation failed: {str(e)}"}, 500
@@ -7,7 +7,7 @@ from ..forms import MenuItemImgForm
 import json
 from ..helper_functions import (review_image_exists, associated_review_exists,
                                 review_belongs_to_user, remove_image_from_s3,
-                                upload_image, delete_image)
+                                upload_image, delete_image, invalidate_restaurant_caches)
 
 # Blueprint for routes related to Menu Item Images
 menu_item_img_routes = Blueprint('menu_item_img', __name__)
@@ -34,6 +34,7 @@ def delete_menu_item_image(id):
     image = MenuItemImg.query.get(id)
     if not image:
         return jsonify({"error": f"Menu item image with ID {id} not found."}), 404
+    restaurant_id = image.menu_item.restaurant_id
     # Callback to check if the current user (restaurant owner)
     # has permission to delete the specified image.
     def has_permission(owner):
@@ -50,6 +51,7 @@ def delete_menu_item_image(id):
 
     # Return the appropriate response based on the deletion outcome.
     if result['status'] == "success":
+        invalidate_restaurant_caches(restaurant_id, listings=False)
         return jsonify(message=result["message"]), result["code"]
     else:
         return jsonify({"error": result["message"]}), result["code"]
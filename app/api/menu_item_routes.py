@@ -18,6 +18,7 @@ menu_item_routes = Blueprint('menu_items', __name__)
 # Endpoint to Get Details of a Menu Item by Id
 # ***************************************************************
 @menu_item_routes.route('/<int:id>', methods=["GET"])
+@hf.conditional_get(lambda id: hf.menu_item_stamp(id))
 def get_menu_item(id):
     """
     Retrieve the details of a specific menu item.
@@ -140,6 +141,9 @@ def update_menu_item(id):
                 setattr(menu_item_to_update, field.name, field.data)
 
             db.session.commit()
+            hf.refresh_menu_item_in_autocomplete(menu_item_to_update)
+            hf.refresh_restaurant_search_document(restaurant.id)
+            hf.invalidate_restaurant_caches(restaurant.id, listings=False)
             return jsonify(message="Menu Item updated successfully"), 200
         else:
             return jsonify(errors=form.errors), 400
@@ -178,6 +182,9 @@ def delete_menu_item(id):
 
         db.session.delete(menu_item_to_delete)
         db.session.commit()
+        hf.remove_menu_item_from_autocomplete(id)
+        hf.refresh_restaurant_search_document(restaurant.id)
+        hf.invalidate_restaurant_caches(restaurant.id, listings=False)
 
         return jsonify(message="Menu Item deleted successfully"), 200
 
@@ -215,6 +222,9 @@ def upload_menu_item_image(menu_item_id):
         db.session.add(new_image)
         db.session.commit()
 
+        restaurant_id = db.session.query(MenuItem.restaurant_id).filter_by(id=menu_item_id).scalar()
+        hf.invalidate_restaurant_caches(restaurant_id, listings=False)
+
         print("Sending image data:", {"status": "success", "image_url": image_url, "id": new_image.id})
         # Return the ID of the new image along with the other data
         return jsonify({
@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, request, abort, current_app
+from flask import Blueprint, jsonify, request, abort, current_app, Response, stream_with_context
 import requests
 
 from flask_login import login_required, current_user
@@ -36,6 +36,33 @@ def validate_order_status(status):
         raise ValueError(f"Invalid status: {status}. Allowed statuses are: {', '.join(allowed_statuses)}.")
 
 
+def parse_date_param(name, end_of_day=False):
+    """
+    Parses an ISO date or datetime query parameter.
+
+    Args:
+        name (str): The query parameter name.
+        end_of_day (bool): Move a plain date to the start of the next day, so
+            that it can be used as an exclusive upper bound.
+
+    Raises:
+        ValueError: If the value is not an ISO date or datetime.
+
+    Returns:
+        datetime.datetime or None: The parsed value, or None when absent.
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {value}. Expected an ISO date such as 2024-01-31.")
+    if end_of_day and len(value) == 10:
+        parsed += datetime.timedelta(days=1)
+    return parsed
+
+
 def error_response(message, status_code):
     """
     Create a standardized error response.
@@ -56,17 +83,46 @@ def error_response(message, status_code):
 # ***************************************************************
 # Endpoint to Get User Orders
 # ***************************************************************
-@login_required
 @order_routes.route('/user/<int:user_id>')
+@login_required
+@hf.conditional_get(lambda user_id: hf.user_orders_stamp(user_id))
 def get_user_orders(user_id):
+    """
+    Returns a page of the user's orders, newest first.
+
+    Query Parameters:
+        limit (int, optional): Page size (default 50, max 100).
+        cursor (str, optional): The nextCursor of the previous page.
+        status (str, optional): Only orders with this status.
+        start_date (str, optional): ISO date/datetime; orders created on or after it.
+        end_date (str, optional): ISO date/datetime; orders created before it
+            (a plain date includes that whole day).
+    """
     try:
         if current_user.id != user_id:
             return jsonify({"error": "Unauthorized access"}), 403
 
-        # Fetch orders associated with the current user
-        orders = Order.query.filter_by(user_id=current_user.id).all()
-
-        if not orders:
+        try:
+            limit = request.args.get('limit', hf.DEFAULT_ORDERS_PAGE_SIZE, type=int)
+            if limit <= 0:
+                raise ValueError("limit must be a positive integer.")
+            limit = min(limit, hf.MAX_ORDERS_PAGE_SIZE)
+
+            status = request.args.get('status')
+            if status:
+                validate_order_status(status)
+            start_date = parse_date_param('start_date')
+            end_date = parse_date_param('end_date', end_of_day=True)
+            cursor = request.args.get('cursor')
+
+            orders, next_cursor = hf.fetch_user_orders_page(
+                current_user.id, limit, cursor=cursor, status=status,
+                start_date=start_date, end_date=end_date
+            )
+        except ValueError as ve:
+            return error_response(str(ve), 400)
+
+        if not orders and not cursor:
             logging.info(f"No orders found for user ID {user_id}")
             return jsonify({
                 "message": "No orders found.",
@@ -77,12 +133,17 @@ def get_user_orders(user_id):
                     }
                 }
             }), 404
-        
+
         normalized_orders = hf.normalize_data([order.to_dict() for order in orders], 'id')
 
         return jsonify({
             "entities": {
                 "orders": normalized_orders
+            },
+            "pagination": {
+                "limit": limit,
+                "nextCursor": next_cursor,
+                "hasMore": next_cursor is not None
             }
         })
 
@@ -96,29 +157,24 @@ def get_user_orders(user_id):
 # ***************************************************************
 @order_routes.route('/create_order', methods=['POST'])
 @login_required
+@hf.idempotent('orders.create')
 def create_order_from_cart():
     try:
         # Step 1: Get order data and validate
         data = request.get_json()
         current_app.logger.info(f"Order creation data received: {data}")
 
-        # Validate shopping cart
-        shopping_cart = ShoppingCart.query.filter_by(user_id=current_user.id).first()
-        if not shopping_cart or not shopping_cart.items:
-            return jsonify({'error': 'Shopping cart is empty'}), HTTPStatus.BAD_REQUEST
-
-        # Calculate total price
-        total_price = sum(item.quantity * item.menu_item.price for item in shopping_cart.items)
-
-        # Step 2: Create the order
-        new_order = hf.create_new_order(data, total_price)
-
-        # Step 3: Create order items
-        hf.create_order_items(shopping_cart, new_order)
+        # Lock the cart, price it in SQL, copy it into the order and clear it
+        try:
+            new_order = hf.place_order_from_cart(data or {}, current_user.id)
+        except ValueError as ve:
+            db.session.rollback()
+            return jsonify({'error': str(ve)}), HTTPStatus.BAD_REQUEST
+        total_price = new_order.total_price
 
-        # Step 4: Commit transaction
         db.session.commit()
         current_app.logger.info(f"Order committed to DB with ID: {new_order.id}")
+        hf.invalidate_order_restaurant_caches(new_order.id)
 
         return jsonify({
             'success': True,
@@ -143,68 +199,94 @@ def create_order_from_cart():
         return jsonify({'error': 'An unexpected error occurred', 'details': error_details, 'traceback': error_traceback}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 # ***************************************************************
-# Endpoint to Get Order Details
+# Endpoint to Stream Order and Delivery Status Events
 # ***************************************************************
+@order_routes.route('/events')
 @login_required
+def stream_order_events():
+    """
+    Server-Sent Events stream of the current user's order and delivery
+    status changes ('order.status' and 'delivery.status' events). Replaces
+    polling the order and /api/delivery/<id>/track endpoints.
+
+    Disabled (404) unless ORDER_EVENTS_STREAM_ENABLED is set, since every open
+    stream holds a worker.
+
+    Returns:
+        Response: A text/event-stream response that stays open.
+    """
+    if not current_app.config.get('ORDER_EVENTS_STREAM_ENABLED'):
+        return error_response("The order event stream is not enabled.", 404)
+
+    user_id = current_user.id
+    # The stream never touches the database; give the connection back to the
+    # pool instead of holding it until the client disconnects
+    db.session.remove()
+    response = Response(
+        stream_with_context(hf.stream_user_events(user_id)),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# ***************************************************************
+# Endpoint to Get Order Details
+# ***************************************************************
 @order_routes.route('/<int:order_id>', methods=['GET'])
+@login_required
+@hf.conditional_get(lambda order_id: hf.order_stamp(order_id))
 def get_order_details(order_id):
     try:
-        logging.info(f"Fetching details for order ID: {order_id}")
-
-        # Fetching order
-        order = Order.query.get(order_id)
-        logging.info(f"Order fetched: {order}")
+        # One query for the order with its delivery and payment, one for the
+        # items with their menu items
+        order = (
+            Order.query
+            .options(
+                joinedload(Order.delivery),
+                joinedload(Order.payment),
+                selectinload(Order.items).joinedload(OrderItem.menu_item)
+            )
+            .filter(Order.id == order_id)
+            .first()
+        )
 
         if not order:
             logging.warning(f"Order with ID {order_id} not found.")
-            abort(404, description=f"Order with ID {order_id} not found.")
+            return error_response(f"Order with ID {order_id} not found.", 404)
 
         # Check if the current user is the owner of the order
         if order.user_id != current_user.id:
-            abort(403, description="You do not have permission to view this order.")
-
-        logging.info(f"Order found: {order}")
-
-        # Fetching order items
-        order_items = OrderItem.query.filter_by(order_id=order_id).all()
-        logging.info(f"Order items fetched for order ID {order_id}: {order_items}")
-
-        # Handling case where no order items are found
-        if not order_items:
-            logging.warning(f"No order items found for order ID {order_id}")
-            order_items = []  # Return an empty list instead of aborting
-
-        # Fetching menu items
-        menu_item_ids = [oi.menu_item_id for oi in order_items]
-        menu_items = MenuItem.query.filter(MenuItem.id.in_(menu_item_ids)).all()
-        logging.info(f"Menu items fetched for menu item IDs {menu_item_ids}: {menu_items}")
+            return error_response("You do not have permission to view this order.", 403)
 
         # Building response dictionary
-        order_items_dict = {oi.id: oi.to_dict() for oi in order_items}
-        menu_items_dict = {mi.id: mi.to_dict() for mi in menu_items}
+        order_items_dict = {oi.id: oi.to_dict() for oi in order.items}
+        menu_items_dict = {oi.menu_item.id: oi.menu_item.to_dict() for oi in order.items if oi.menu_item}
         normalized_order_details = {
             'order': order.to_dict(),
             'orderItems': {"byId": order_items_dict, "allIds": list(order_items_dict.keys())},
             'menuItems': {"byId": menu_items_dict, "allIds": list(menu_items_dict.keys())}
         }
-        logging.info(f"Normalized order details prepared for order ID {order_id}")
+        logging.debug(f"Order {order_id} loaded with {len(order_items_dict)} items")
 
         return jsonify(normalized_order_details)
 
     except SQLAlchemyError as e:
         logging.exception("Database Error encountered while fetching order details.")
-        abort(500, description='Database operation failed')
+        return error_response('Database operation failed', 500)
 
     except Exception as e:
         logging.exception("Unexpected Error encountered while fetching order details.")
-        abort(500, description='An unexpected error occurred')
+        return error_response('An unexpected error occurred', 500)
 
 
 # ***************************************************************
 # Endpoint to Reorder Past Order
 # ***************************************************************
-@login_required
 @order_routes.route('/<int:order_id>/reorder', methods=['POST'])
+@login_required
 def reorder_past_order(order_id):
     """
     Reorders a past order by creating a new order with the same items.
@@ -217,44 +299,13 @@ def reorder_past_order(order_id):
                   and menu items, or an error message.
     """
     try:
-        past_order = Order.query.get(order_id)
-        if not past_order:
-            raise ValueError("Order not found.", 404)
-
-        if past_order.user_id != current_user.id:
-            raise PermissionError("You don't have permission to reorder this order.", 403)
-
-        # Create new delivery and payment records
-        ic(past_order)
-        new_delivery = duplicate_delivery(past_order.delivery_id)
-        ic(past_order.delivery_id)
-        new_payment = duplicate_payment(past_order.payment_id)
-        ic(past_order.payment_id)
-
-        new_order = Order(
-            user_id=current_user.id,
-            total_price=past_order.total_price,
-            status='Pending',
-            delivery_id=new_delivery.id,
-            payment_id=new_payment.id
-        )
-        db.session.add(new_order)
-        db.session.flush()
-
-        # Duplicate order items
-        new_order_items = [
-            OrderItem(menu_item_id=item.menu_item_id, order_id=new_order.id, quantity=item.quantity)
-            for item in past_order.items
-        ]
-        db.session.bulk_save_objects(new_order_items)
+        # Clone order, items, delivery and payment in one transaction
+        new_order = hf.reorder_order(order_id, current_user.id)
         db.session.commit()
+        hf.invalidate_order_restaurant_caches(new_order.id)
 
         # Fetch additional details and prepare the response
-        order_items = [item.to_dict() for item in new_order.items]
-        menu_items_ids = [item['menu_item_id'] for item in order_items]
-        menu_items = MenuItem.query.filter(MenuItem.id.in_(menu_items_ids)).all()
-        normalized_order_items = hf.normalize_data(order_items, 'id')
-        normalized_menu_items = hf.normalize_data([item.to_dict() for item in menu_items], 'id')
+        normalized_order_items, normalized_menu_items = hf.fetch_additional_details(new_order)
 
         return jsonify({
             "message": "Order has been successfully reordered.",
@@ -266,60 +317,22 @@ def reorder_past_order(order_id):
             }
         })
     except ValueError as ve:
+        db.session.rollback()
         return jsonify({"error": str(ve)}), 404
     except PermissionError as pe:
+        db.session.rollback()
         return jsonify({"error": str(pe)}), 403
     except Exception as e:
         db.session.rollback()
+        current_app.logger.error(f"Error reordering order {order_id}: {e}")
         return jsonify({"error": "An unexpected error occurred."}), 500
 
-def duplicate_delivery(delivery_id):
-    original_delivery = Delivery.query.get(delivery_id)
-    ic("***********************", original_delivery)
-    if not original_delivery:
-        raise ValueError("Original delivery not found.")
-
-    new_delivery = Delivery(
-        user_id=original_delivery.user_id,
-        street_address=original_delivery.street_address,
-        city=original_delivery.city,
-        state=original_delivery.state,
-        postal_code=original_delivery.postal_code,
-        country=original_delivery.country,
-        cost=original_delivery.cost,
-        status='Pending',
-        tracking_number=str(uuid.uuid4())
-    )
-    db.session.add(new_delivery)
-    db.session.flush()
-    return new_delivery
-
-def duplicate_payment(payment_id):
-    original_payment = Payment.query.get(payment_id)
-    if not original_payment:
-        raise ValueError("Original payment not found.")
-
-    new_payment = Payment(
-        gateway=original_payment.gateway,
-        amount=original_payment.amount,
-        status='Pending',
-
-        cardholder_name=original_payment.cardholder_name,
-        card_number=original_payment.card_number,
-        card_expiry_month=original_payment.card_expiry_month,
-        card_expiry_year=original_payment.card_expiry_year,
-        card_cvc=original_payment.card_cvc,
-        postal_code=original_payment.postal_code
-    )
-    db.session.add(new_payment)
-    db.session.flush()
-    return new_payment
-
 # ***************************************************************
 # Endpoint to Get Order Items
 # ***************************************************************
 @login_required
 @order_routes.route('/<int:order_id>/items')
+@hf.conditional_get(lambda order_id: hf.order_stamp(order_id))
 def get_order_items(order_id):
     """
     Retrieve items associated with a specific order.
@@ -394,6 +407,7 @@ def delete_order(order_id):
         # Soft delete the order
         order.is_deleted = True
         db.session.commit()
+        hf.invalidate_order_restaurant_caches(order_id)
 
         return jsonify({
             "message": f"Order {order_id} has been successfully marked as deleted."
@@ -429,10 +443,13 @@ def update_order(order_id):
         return jsonify({"error": "Unauthorized."}), 403
 
     data = request.json
+    previous_status = order.status
     if 'status' in data:
         order.status = data['status']
 
     db.session.commit()
+    if order.status != previous_status:
+        hf.publish_order_status(order, previous_status)
     return order.to_dict()
 
 # ***************************************************************
@@ -459,8 +476,11 @@ def cancel_order(order_id):
     if order.status == "Completed":
         return jsonify({"error": "Cannot cancel a completed order."}), 400
 
+    previous_status = order.status
     order.status = "Cancelled"
     db.session.commit()
+    if previous_status != order.status:
+        hf.publish_order_status(order, previous_status)
 
     return order.to_dict()
 
@@ -493,6 +513,7 @@ def update_order_status(order_id):
     try:
         # raising a ValueError if the status is not valid.
         validate_order_status(status)
+        previous_status = order.status
         if status.lower() == 'cancel':  # Using lower to ensure case-insensitivity
             if order.status == "Completed":
                 return jsonify({"error": "Cannot cancel a completed order."}), 400
@@ -501,12 +522,113 @@ def update_order_status(order_id):
             order.status = status
 
         db.session.commit()
+        if order.status != previous_status:
+            hf.publish_order_status(order, previous_status)
         return jsonify(order.to_dict())
 
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
 
+# ***************************************************************
+# Endpoint to Update the Status of Many Orders
+# ***************************************************************
+MAX_BULK_STATUS_ORDERS = 500
+
+
+@order_routes.route('/status', methods=['PUT'])
+@login_required
+def bulk_update_order_status():
+    """
+    Moves many orders to the same status in one transaction.
+
+    Authorization is checked for all orders with one query and the eligible
+    orders are updated with a single UPDATE ... WHERE id IN (...). A status of
+    'cancel' cancels the orders; completed orders cannot be cancelled. Orders
+    already at the new status are reported as failed and not counted.
+
+    Request Body:
+        order_ids (List[int]): The orders to update (at most 500).
+        status (str): The new status.
+
+    Returns:
+        Response: The applied status, the number of updated orders and a
+                  per-order result ({"order_id", "success", "status" or "error"}).
+    """
+    data = request.get_json() or {}
+    status = data.get('status')
+    order_ids = data.get('order_ids')
+
+    try:
+        validate_order_status(status or '')
+    except ValueError as e:
+        return error_response(str(e), 400)
+    if not isinstance(order_ids, list) or not order_ids or not all(isinstance(i, int) for i in order_ids):
+        return error_response("order_ids must be a non-empty list of integers.", 400)
+    if len(order_ids) > MAX_BULK_STATUS_ORDERS:
+        return error_response(f"At most {MAX_BULK_STATUS_ORDERS} orders can be updated at once.", 400)
+
+    is_cancel = status.lower() == 'cancel'
+    new_status = 'Cancelled' if is_cancel else status
+    order_ids = list(dict.fromkeys(order_ids))
+
+    try:
+        orders = hf.authorize_orders(current_user, order_ids)
+
+        results = {}
+        to_update = []
+        for order_id in order_ids:
+            order = orders.get(order_id)
+            if order is None:
+                results[order_id] = {"order_id": order_id, "success": False, "error": "Order not found."}
+            elif not order.is_authorized:
+                results[order_id] = {"order_id": order_id, "success": False, "error": "Unauthorized."}
+            elif is_cancel and order.status == "Completed":
+                results[order_id] = {"order_id": order_id, "success": False, "error": "Cannot cancel a completed order."}
+            elif order.status == new_status:
+                results[order_id] = {"order_id": order_id, "success": False, "error": f"Order is already {new_status}."}
+            else:
+                to_update.append(order)
+
+        current_statuses = {}
+        if to_update:
+            ids = [order.id for order in to_update]
+            # Both filters are re-checked in the UPDATE in case an order changed since the read
+            query = Order.query.filter(Order.id.in_(ids), Order.status != new_status)
+            if is_cancel:
+                query = query.filter(Order.status != "Completed")
+            query.update(
+                {Order.status: new_status, Order.updated_at: datetime.datetime.now()},
+                synchronize_session=False
+            )
+            # Read back in the same transaction where the eligible orders ended up
+            current_statuses = dict(db.session.query(Order.id, Order.status).filter(Order.id.in_(ids)))
+        db.session.commit()
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.error(f"Database error in bulk order status update: {e}")
+        return error_response("Database operation failed.", 500)
+
+    updated_ids = set()
+    for order in to_update:
+        current_status = current_statuses.get(order.id)
+        if current_status is None:
+            results[order.id] = {"order_id": order.id, "success": False, "error": "Order not found."}
+        elif current_status != new_status:
+            results[order.id] = {"order_id": order.id, "success": False, "error": "Cannot cancel a completed order."}
+        else:
+            updated_ids.add(order.id)
+            results[order.id] = {"order_id": order.id, "success": True, "status": new_status}
+            hf.publish_order_status(order, order.status, status=new_status)
+
+    return jsonify({
+        "status": new_status,
+        "updated": len(updated_ids),
+        "results": [results[order_id] for order_id in order_ids]
+    })
+
+
 
 
 
@@ -4,7 +4,7 @@ from sqlite3 import OperationalError
 from flask_login import login_required, current_user
 from app.models import db, Order, OrderItem, MenuItem, Payment
 from ..forms import PaymentForm
-from ..helper_functions import normalize_data, is_valid_payment_data
+from ..helper_functions import normalize_data, is_valid_payment_data, idempotent, CARD_RESPONSE_FIELDS
 
 payment_routes = Blueprint('payments', __name__)
 
@@ -60,8 +60,9 @@ def get_payment(id):
 # ***************************************************************
 # Endpoint to Create a Payment
 # ***************************************************************
-@login_required
 @payment_routes.route('', methods=['POST'])
+@login_required
+@idempotent('payments.create', redact=CARD_RESPONSE_FIELDS)
 def create_payment():
     """
     Creates a new payment record in the database.
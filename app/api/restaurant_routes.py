@@ -1,5 +1,5 @@
 from sqlite3 import OperationalError
-from flask import Blueprint, jsonify, request, redirect, url_for, abort, current_app
+from flask import Blueprint, jsonify, request, redirect, url_for, abort, current_app, g
 from icecream import ic
 import requests
 import logging
@@ -29,6 +29,7 @@ restaurant_routes = Blueprint('restaurants', __name__)
 # Endpoint to Get All Restaurants
 # ***************************************************************
 @restaurant_routes.route('/all', methods=['GET'])
+@hf.conditional_get(hf.restaurant_list_stamp)
 def get_all_restaurants():
     """
     Retrieve all restaurants from the database with pagination and normalize the data.
@@ -47,18 +48,21 @@ def get_all_restaurants():
         if page < 1 or per_page < 1:
             raise ValueError("Page number and per_page must be greater than 0")
 
-        pagination = Restaurant.query.paginate(page=page, per_page=per_page, error_out=False)
+        def load_page():
+            pagination = Restaurant.query.paginate(page=page, per_page=per_page, error_out=False)
 
+            all_restaurants_list = Restaurant.serialize_many(pagination.items)
+            normalized_restaurants = hf.normalize_data(all_restaurants_list, 'id')
 
-        all_restaurants_list = [restaurant.to_dict() for restaurant in pagination.items]
-        normalized_restaurants = hf.normalize_data(all_restaurants_list, 'id')
+            return {
+                "restaurants": normalized_restaurants,
+                "total_items": pagination.total,
+                "total_pages": pagination.pages,
+                "current_page": page
+            }
 
-        response = {
-            "restaurants": normalized_restaurants,
-            "total_items": pagination.total,
-            "total_pages": pagination.pages,
-            "current_page": page
-        }
+        # Served from the shared cache; invalidated by restaurant, review and order writes
+        response = hf.get_shared_cache().get_or_set(hf.RESTAURANT_LIST_NAMESPACE, f"{page}:{per_page}", load_page)
 
         return jsonify(response)
 
@@ -84,6 +88,12 @@ def get_nearby_restaurants():
     """
     Retrieve nearby restaurants from multiple sources: UberEats, Google Places, and a local database.
 
+    Query Parameters:
+        - latitude, longitude (float): The search origin.
+        - city, state, country (str): Used when coordinates are not provided.
+        - radius_km (float): Search radius in kilometers (default 5.0).
+        - limit (int): Maximum number of restaurants to return, nearest first.
+
     Returns:
         Response: A JSON list of aggregated nearby restaurants or an error message.
     """
@@ -95,6 +105,11 @@ def get_nearby_restaurants():
     city_name = request.args.get('city')
     state_name = request.args.get('state')
     country_name = request.args.get('country')
+    radius_km = request.args.get('radius_km', hf.DEFAULT_RADIUS_KM, type=float)
+    limit = request.args.get('limit', None, type=int)
+
+    if radius_km <= 0 or (limit is not None and limit < 1):
+        return jsonify({"error": "radius_km and limit must be greater than 0."}), 400
 
     # Convert the extracted values to float
     if latitude:
@@ -108,7 +123,7 @@ def get_nearby_restaurants():
     # If both latitude and longitude aren't provided but city is, then attempt geocoding.
     if not latitude or not longitude:
         if city_name:
-            coordinates = hf.get_coordinates_from_geocoding_service(city_name, current_app.config['MAPS_API_KEY'])
+            coordinates = hf.get_coordinates_from_geocoding_service(city_name, current_app.config['MAPS_API_KEY'], state_name, country_name)
             if coordinates:
                 latitude = coordinates['latitude']
                 longitude = coordinates['longitude']
@@ -121,24 +136,65 @@ def get_nearby_restaurants():
                     return jsonify({"error": "Failed to get coordinates for the provided city and no restaurants found in the database for this city."}), 400
         else:
             return jsonify({"error": "Latitude, longitude, or city name must be provided."}), 400
-    # If latitude and longitude are provided, aggregate data based on coordinates.
-    if latitude and longitude:
-        aggregated_results = hf.aggregate_restaurant_data_by_coordinates(latitude, longitude)
-    # If city is provided (without latitude and longitude), aggregate data based on city, state, and country.
-    elif city_name:
-        aggregated_results = hf.aggregate_restaurant_data_by_city_state_country(city_name, state_name, country_name)
+
+    # Query the local database, UberEats and Google Places concurrently, each within its own timeout
+    aggregated = hf.aggregate_restaurant_data(latitude, longitude, city_name, state_name, country_name,
+                                              radius_km=radius_km, limit=limit)
+    logger.info(f"Nearby restaurant sources: {aggregated['metadata']}")
+    # Records that are not in the database are keyed by their Google place or UberEats store id
+    aggregated_results = [
+        {**restaurant, "id": restaurant.get("id") or restaurant.get("google_place_id") or restaurant.get("store_id")}
+        for restaurant in aggregated["restaurants"]
+    ]
 
     # Return aggregated results or an error if no restaurants were found.
     if not aggregated_results:
         return jsonify({"error": "No restaurants found nearby."}), 404
 
-    # Normalize the aggregated results
+    # Normalize the aggregated results; byId keys are strings in JSON anyway, and
+    # must all be strings here since database and external ids are mixed
     normalized_results = hf.normalize_data(aggregated_results, 'id')
+    normalized_results["byId"] = {str(id): restaurant for id, restaurant in normalized_results["byId"].items()}
 
     return jsonify(normalized_results)
 
 
 
+# ***************************************************************
+# Endpoint to Get Nearby Spatial Index Metrics
+# ***************************************************************
+@restaurant_routes.route('/nearby/index-stats', methods=['GET'])
+def get_nearby_index_stats():
+    """
+    Reports the size, memory footprint and last rebuild time of this worker's
+    in-memory spatial index used by the nearby endpoint.
+
+    Returns:
+        Response: The index metrics, or enabled=false when the index is turned off.
+    """
+    spatial_index = hf.get_restaurant_spatial_index()
+    if spatial_index is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **spatial_index.stats()})
+
+
+# ***************************************************************
+# Endpoint to Get Shared Cache Metrics
+# ***************************************************************
+@restaurant_routes.route('/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """
+    Reports this worker's shared cache hits, misses, loads and waits per namespace.
+
+    Returns:
+        Response: The cache backend and per-namespace metrics.
+    """
+    return jsonify({
+        "backend": current_app.config.get('SHARED_CACHE_BACKEND'),
+        "namespaces": hf.get_shared_cache().stats()
+    })
+
+
 # ***************************************************************
 # Endpoint to Get Restaurants of Current User
 # ***************************************************************
@@ -155,7 +211,7 @@ def get_owned_restaurants():
         owned_restaurants = Restaurant.query.filter_by(owner_id=current_user.id).all()
 
         # Convert the restaurants to a list of dictionaries
-        restaurants_list = [restaurant.to_dict() for restaurant in owned_restaurants]
+        restaurants_list = Restaurant.serialize_many(owned_restaurants)
 
         # Normalize the list
         normalized_results = hf.normalize_data(restaurants_list, 'id')
@@ -175,6 +231,8 @@ def get_owned_restaurants():
 # Endpoint to Get Details of a Restaurant by Id or Google Place Id
 # ***************************************************************
 @restaurant_routes.route('/<string:id>')
+@hf.conditional_get(lambda id: hf.restaurant_stamp(id))
+@hf.cached_response(lambda id: [hf.restaurant_cache_tag(id)] if id.isdigit() else None)
 def get_restaurant_detail(id):
     """
     Fetches detailed information of a specific restaurant.
@@ -199,6 +257,8 @@ def get_restaurant_detail(id):
             access_token = hf.get_uber_access_token()
             ubereats_data = hf.fetch_from_ubereats_api_by_store_id(restaurant.ubereats_store_id, access_token)
             if ubereats_data:
+                # Live data from UberEats is not kept in the response cache
+                g.skip_response_cache = True
                 return jsonify(ubereats_data)  # Return data directly from UberEats
 
         # If not available on UberEats or doesn't have a store_id, fetch data from the database
@@ -280,6 +340,10 @@ def update_restaurant(id):
                 setattr(restaurant_to_update, field.name, field.data)
 
             db.session.commit()
+            hf.refresh_restaurant_in_spatial_index(restaurant_to_update)
+            hf.refresh_restaurant_in_autocomplete(restaurant_to_update)
+            hf.refresh_restaurant_search_document(restaurant_to_update.id)
+            hf.invalidate_restaurant_caches(restaurant_to_update.id)
 
             return jsonify({
                 "message": "Restaurant updated successfully",
@@ -333,6 +397,10 @@ def create_restaurant():
 
             db.session.add(new_restaurant)
             db.session.commit()
+            hf.refresh_restaurant_in_spatial_index(new_restaurant)
+            hf.refresh_restaurant_in_autocomplete(new_restaurant)
+            hf.refresh_restaurant_search_document(new_restaurant.id)
+            hf.invalidate_restaurant_caches()
 
             return jsonify({
                 "message": "Restaurant successfully created",
@@ -367,6 +435,10 @@ def delete_restaurant(id):
     try:
         db.session.delete(restaurant)
         db.session.commit()
+        hf.remove_restaurant_from_spatial_index(id)
+        hf.remove_restaurant_from_autocomplete(id)
+        hf.refresh_restaurant_search_document(id)
+        hf.invalidate_restaurant_caches(id)
         return jsonify({
             "message": "Restaurant deleted successfully",
             "deletedRestaurantId": id
@@ -380,21 +452,80 @@ def delete_restaurant(id):
         return jsonify(error=f"Error deleting restaurant: {e}"), 500
 
 # ***************************************************************
-# Endpoint to Search Restaurants by Name
+# Endpoint to Search Restaurants
 # ***************************************************************
 @restaurant_routes.route('/search/<search_term>')
 def search_restaurants(search_term):
     """
-    Searches restaurants in the database based on a given term.
+    Full-text search over restaurant names, food types and descriptions and
+    the names and descriptions of their menu items, best match first.
+    Words match as prefixes, so the endpoint also serves typeahead.
 
     Args:
-        search_term (str): The term to search for in restaurant names.
+        search_term (str): The words to search for.
+
+    Query Parameters:
+        limit (int, optional): Page size (default 20, max 50).
+        offset (int, optional): Number of results to skip.
+
+    Returns:
+        Response: A page of matching restaurants with pagination info.
+    """
+    try:
+        limit = min(max(request.args.get('limit', hf.DEFAULT_SEARCH_PAGE_SIZE, type=int), 1), hf.MAX_SEARCH_PAGE_SIZE)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+
+        restaurant_ids, has_more = hf.search_restaurant_ids(search_term, limit, offset)
+
+        # Keep the rank order of the search results
+        restaurants = Restaurant.query.filter(Restaurant.id.in_(restaurant_ids)).all() if restaurant_ids else []
+        position = {restaurant_id: index for index, restaurant_id in enumerate(restaurant_ids)}
+        restaurants.sort(key=lambda restaurant: position[restaurant.id])
+
+        return jsonify({
+            "restaurants": Restaurant.serialize_many(restaurants),
+            "pagination": {
+                "limit": limit,
+                "offset": offset,
+                "nextOffset": offset + limit if has_more else None,
+                "hasMore": has_more
+            }
+        })
+
+    except Exception as e:
+        print(e)
+        return jsonify({"error": "An error occurred while searching restaurants."}), 500
+
+# ***************************************************************
+# Endpoint to Autocomplete Restaurant and Menu Item Names
+# ***************************************************************
+@restaurant_routes.route('/autocomplete', methods=['GET'])
+def autocomplete_names():
+    """
+    Suggests restaurant and menu item names for search-as-you-type. Served
+    from this worker's in-memory name index; returns ids and names only.
+
+    Query Parameters:
+        q (str): What the user has typed so far; any word of a name may match.
+        limit (int, optional): Suggestions per kind (default 8, max 20).
 
     Returns:
-        Response: A list of restaurants that match the search term.
+        Response: Matching restaurants and menu items.
     """
-    restaurants = Restaurant.query.filter(Restaurant.name.ilike(f'%{search_term}%')).all()
-    return jsonify([restaurant.to_dict() for restaurant in restaurants])
+    prefix = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', hf.DEFAULT_AUTOCOMPLETE_LIMIT, type=int), 1), hf.MAX_AUTOCOMPLETE_LIMIT)
+
+    restaurant_index, menu_item_index = hf.get_autocomplete_indexes()
+    return jsonify({
+        "restaurants": [
+            {"id": restaurant_id, "name": name}
+            for restaurant_id, name, _ in restaurant_index.query(prefix, limit)
+        ],
+        "menuItems": [
+            {"id": menu_item_id, "name": name, "restaurantId": restaurant_id}
+            for menu_item_id, name, restaurant_id in menu_item_index.query(prefix, limit)
+        ]
+    })
 
 # ***************************************************************
 # Endpoint to Fetch Detailed Restaurant Info from Google Places API
@@ -413,7 +544,7 @@ def get_detailed_restaurant(place_id):
     google_api_key = current_app.config['MAPS_API_KEY']
     endpoint = f"https://maps.googleapis.com/maps/api/place/details/json?place_id={place_id}&key={google_api_key}"
 
-    response = requests.get(endpoint)
+    response = hf.http_get(endpoint)
     data = response.json()
 
     restaurant = data.get('result', {})
@@ -435,6 +566,7 @@ def get_detailed_restaurant(place_id):
 # Endpoint to Get Reviews by Restaurant ID
 # ***************************************************************
 @restaurant_routes.route('/<int:id>/reviews')
+@hf.conditional_get(lambda id: hf.restaurant_reviews_stamp(id))
 def get_reviews_by_restaurant_id(id):
     """
     Fetches reviews associated with a specific restaurant.
@@ -538,7 +670,9 @@ def create_review(id):
             new_review.restaurant_id = id
 
             db.session.add(new_review)
+            hf.apply_review_to_aggregates(id, new_review.stars or 0, 1)
             db.session.commit()
+            hf.invalidate_restaurant_caches(id)
 
             user_info = current_user.to_dict()
 
@@ -565,6 +699,8 @@ def create_review(id):
 # Endpoint to Fetch All Menu Items for a Restaurant by ID
 # ***************************************************************
 @restaurant_routes.route('/<int:id>/menu-items')
+@hf.conditional_get(lambda id: hf.restaurant_stamp(id))
+@hf.cached_response(lambda id: [hf.restaurant_cache_tag(id)])
 def get_menu_items_by_restaurant_id(id):
     """
     Retrieves all menu items for a specific restaurant.
@@ -593,6 +729,8 @@ def get_menu_items_by_restaurant_id(id):
 # Endpoint to Filter Menu Items by Type and Price Range
 # ***************************************************************
 @restaurant_routes.route('/<int:id>/menu-items/filter')
+@hf.conditional_get(lambda id: hf.restaurant_stamp(id))
+@hf.cached_response(lambda id: [hf.restaurant_cache_tag(id)])
 def filter_menu_items_by_type(id):
     """
     Retrieves filtered menu items for a specific restaurant based on type and price range.
@@ -674,6 +812,9 @@ def create_menu_item_by_restaurant_id(id):
             # Add and commit new menu item to database
             db.session.add(new_MenuItem)
             db.session.commit()
+            hf.refresh_menu_item_in_autocomplete(new_MenuItem)
+            hf.refresh_restaurant_search_document(id)
+            hf.invalidate_restaurant_caches(id, listings=False)
 
             return jsonify({
                 "message": "Menu Item successfully created",
@@ -7,7 +7,7 @@ import app, json
 import traceback
 import time
 from flask_login import current_user, login_user, logout_user, login_required
-from ..models import User, Review, ReviewImg, db, MenuItem, MenuItemImg
+from ..models import User, Review, ReviewImg, db, MenuItem, MenuItemImg, Restaurant
 from ..s3 import get_unique_filename, upload_file_to_s3, remove_file_from_s3, upload_file, allowed_file, ALLOWED_EXTENSIONS
 from ..forms import ReviewForm, ReviewImgForm
 from .. import helper_functions as hf
@@ -18,6 +18,7 @@ review_routes = Blueprint('review', __name__)
 # Endpoint to Fetch Reviews of the Currently Logged-in User
 # ***************************************************************
 @review_routes.route('/current')
+@hf.conditional_get(hf.current_user_reviews_stamp)
 def get_reviews_of_current_user():
     """
     Fetches all reviews written by the currently logged-in user.
@@ -46,19 +47,22 @@ def get_reviews_of_current_user():
             return jsonify({"error": "No reviews found for the current user."}), 404
 
         # Extract and format the data for the response
-        review_dicts, restaurant_dicts, image_dicts, user_dicts = [], [], [], []
+        review_dicts, restaurants, image_dicts, user_dicts = [], [], [], []
         for review in reviews:
             review_dict = review.to_dict()
             review_dict["review_img_ids"] = [img.id for img in review.review_imgs]
             review_dicts.append(review_dict)
 
             if review.restaurant:
-                restaurant_dicts.append(review.restaurant.to_dict())
+                restaurants.append(review.restaurant)
             if review.user:
                 user_dicts.append(review.user.to_dict())
             for img in review.review_imgs:
                 image_dicts.append(img.to_dict())
 
+        # Serialize the reviewed restaurants in one batch
+        restaurant_dicts = Restaurant.serialize_many({r.id: r for r in restaurants}.values())
+
         # Normalize the data for the response
         normalized_reviews = hf.normalize_data(review_dicts, 'id')
         normalized_restaurants = hf.normalize_data(restaurant_dicts, 'id')
@@ -84,6 +88,7 @@ def get_reviews_of_current_user():
 # Endpoint to Get Details of a Review by Id
 # ***************************************************************
 @review_routes.route('/<int:id>', methods=["GET"])
+@hf.conditional_get(lambda id: hf.review_stamp(id))
 def get_review(id):
     """
     Retrieve the details of a specific review.
@@ -162,10 +167,13 @@ def update_review(id):
 
         # If data is valid, update the review
         if form.validate_on_submit():
+            previous_stars = review_to_update.stars or 0
             for field in form:
                 setattr(review_to_update, field.name, field.data)
 
+            hf.apply_review_to_aggregates(review_to_update.restaurant_id, (review_to_update.stars or 0) - previous_stars, 0)
             db.session.commit()
+            hf.invalidate_restaurant_caches(review_to_update.restaurant_id)
             return jsonify(message="Review updated successfully"), 200
         else:
             # Return validation errors
@@ -210,7 +218,9 @@ def delete_review(id):
 
         # Delete the review from the database
         db.session.delete(review_to_delete)
+        hf.apply_review_to_aggregates(review_to_delete.restaurant_id, -(review_to_delete.stars or 0), -1)
         db.session.commit()
+        hf.invalidate_restaurant_caches(review_to_delete.restaurant_id)
 
         return jsonify(message="Review deleted successfully"), 200
 
@@ -5,7 +5,8 @@ from app.models import User, Review, Review, db, MenuItem, MenuItemImg, Shopping
 from sqlalchemy import func, distinct, or_, desc
 from ..forms import ShoppingCartItemForm
 import json
-from ..helper_functions import normalize_data
+from ..helper_functions import (normalize_data, get_cart_view, get_cart_total, upsert_cart_items,
+                                conditional_get, current_cart_stamp)
 from icecream import ic
 
 # Define the blueprint for shopping cart routes
@@ -14,8 +15,9 @@ shopping_cart_routes = Blueprint('shopping_cart', __name__)
 # ***************************************************************
 # Endpoint to Fetch the Current User's Shopping Cart
 # ***************************************************************
-@login_required  # Ensure the user is logged in to access this endpoint
 @shopping_cart_routes.route('/current')
+@login_required  # Ensure the user is logged in to access this endpoint
+@conditional_get(current_cart_stamp)
 def get_cart():
     """
     Fetches the current user's shopping cart, including all items within.
@@ -30,8 +32,6 @@ def get_cart():
     try:
         # Query the database for the current user's shopping cart
         cart = ShoppingCart.query.filter_by(user_id=current_user.id).first()
-        if cart:
-            total_price = cart.calculate_total_price()
         # If the cart is not found, return a structured response indicating there's no cart
         if not cart:
             return jsonify({
@@ -51,9 +51,10 @@ def get_cart():
         if cart.user_id != current_user.id:
             raise PermissionError("You don't have permission to access this cart.", 403)
 
-        # Convert the items in the cart to dictionaries and normalize the data for frontend consumption
-        items = [item.to_dict() for item in cart.items]
-        normalized_items = normalize_data(items, 'id')
+        # Load the items with their menu item details and the totals in one query,
+        # then normalize the data for frontend consumption
+        cart_view = get_cart_view(cart.id)
+        normalized_items = normalize_data(cart_view["items"], 'id')
 
         # Return the normalized items and a count of total items
         return jsonify({
@@ -61,8 +62,8 @@ def get_cart():
                 "shoppingCartItems": normalized_items
             },
             "metadata": {
-                "totalItems": len(normalized_items["allIds"]),
-                "totalPrice": total_price
+                "totalItems": cart_view["totalItems"],
+                "totalPrice": cart_view["totalPrice"]
             }
         })
 
@@ -84,12 +85,15 @@ def get_cart():
 # ***************************************************************
 # Endpoint to Add an Item to the Current User's Shopping Cart
 # ***************************************************************
-@login_required
 @shopping_cart_routes.route('/items/add', methods=['POST'])
+@login_required
 def add_item_to_cart():
     """
     Adds a new item to the current user's shopping cart based on the provided menu item ID.
 
+    The quantity is added to an existing line of the same menu item, and all
+    items of a cart must come from one restaurant (same rules as POST /items).
+
     Args:
         id (int): The ID of the menu item to be added to the cart.
 
@@ -112,29 +116,25 @@ def add_item_to_cart():
             if not form.menu_item_id.data:
                 return jsonify({"error": "menu_item_id is required"}), 400
 
-            # Query the database for the user's cart, or create a new one if it doesn't exist
-            cart = ShoppingCart.query.filter_by(user_id=current_user.id).first()
+            # Query the database for the user's cart, or create a new one if it doesn't exist.
+            # The row lock serializes this write with a checkout of the same cart.
+            cart = ShoppingCart.query.filter_by(user_id=current_user.id).with_for_update().first()
 
             if not cart:
                 cart = ShoppingCart(user_id=current_user.id)
                 db.session.add(cart)
-
-                db.session.commit()
-
-            # Ensure the current user is the owner of the retrieved/created cart
-            if cart.user_id != current_user.id:
-                raise PermissionError("You don't have permission to modify this cart.", 403)
-
-            # Create a new shopping cart item with the provided details and add it to the database
-            cart_item = ShoppingCartItem(
-                menu_item_id=form.menu_item_id.data,
-                quantity=form.quantity.data,
-                shopping_cart_id=cart.id
-            )
-            db.session.add(cart_item)
+                db.session.flush()
+
+            # Merge into an existing line and enforce the single-restaurant cart
+            try:
+                cart_item_id, = upsert_cart_items(cart, {form.menu_item_id.data: form.quantity.data})
+            except ValueError as ve:
+                db.session.rollback()
+                return jsonify({"error": str(ve)}), 400
             db.session.commit()
 
             # Return a success message along with the details of the added item
+            cart_item = ShoppingCartItem.query.get(cart_item_id)
             return jsonify({
                 "message": "Item added to cart successfully",
                 "entities": {
@@ -146,12 +146,8 @@ def add_item_to_cart():
         return jsonify(errors=form.errors), 400
 
     # Handle various types of exceptions and log the errors
-    except PermissionError as pe:
-        current_app.logger.error(f"PermissionError in add_item_to_cart: {str(pe)}")
-        message, code = pe.args if len(pe.args) == 2 else (str(pe), 403)
-        return jsonify({"error": message}), code
-
     except Exception as e:
+        db.session.rollback()
         current_app.logger.error(f"Unexpected error in add_item_to_cart: {str(e)}")
         return jsonify({"error": "An unexpected error occurred while adding item to the cart."}), 500
 
@@ -159,59 +155,63 @@ def add_item_to_cart():
 # ***************************************************************
 # Endpoint to Add Multiple Items to the Current User's Shopping Cart
 # ***************************************************************
-@login_required
 @shopping_cart_routes.route('/items', methods=['POST'])
+@login_required
 def add_items_to_cart():
     """
-    Adds new items to the current user's shopping cart based on the provided menu item IDs and quantities.
+    Adds items to the current user's shopping cart based on the provided menu item IDs and quantities.
+
+    Quantities are added to existing lines of the same menu item, and all items
+    of a cart must come from one restaurant.
 
     Returns:
         Response: A message indicating the success or failure of the addition.
-                  On success, also returns the details of the added items.
+                  On success, also returns the whole updated cart (same shape as
+                  GET /current) and the IDs of the created or updated items.
     """
     try:
         # Parse the JSON payload
         data = request.get_json()
-        if not isinstance(data, list):
+        if not isinstance(data, list) or not data:
             return jsonify({"error": "Expected a list of items"}), 400
 
-        # Find or create a shopping cart for the current user
-        cart = ShoppingCart.query.filter_by(user_id=current_user.id).first()
+        # Merge the requested quantities per menu item
+        quantities = {}
+        for item_data in data:
+            menu_item_id = item_data.get('menu_item_id') if isinstance(item_data, dict) else None
+            quantity = item_data.get('quantity') if isinstance(item_data, dict) else None
+            if not isinstance(menu_item_id, int) or not isinstance(quantity, int) or quantity <= 0:
+                return jsonify({"error": "menu_item_id and a positive quantity are required for each item"}), 400
+            quantities[menu_item_id] = quantities.get(menu_item_id, 0) + quantity
+
+        # Find or create a shopping cart for the current user (locked against a concurrent checkout)
+        cart = ShoppingCart.query.filter_by(user_id=current_user.id).with_for_update().first()
         if not cart:
             cart = ShoppingCart(user_id=current_user.id)
             db.session.add(cart)
+            db.session.flush()
 
-        # Process each item in the payload
-        new_items = []
-        for item_data in data:
-            menu_item_id = item_data.get('menu_item_id')
-            quantity = item_data.get('quantity')
-            if not menu_item_id or not quantity:
-                return jsonify({"error": "menu_item_id and quantity are required for each item"}), 400
-
-            # Validate the menu item exists
-            item = MenuItem.query.get(menu_item_id)
-            if not item:
-                return jsonify({"error": f"Invalid menu_item_id {menu_item_id}. This item does not exist."}), 400
-
-            # Add the item to the cart
-            cart_item = ShoppingCartItem(
-                menu_item_id=menu_item_id,
-                quantity=quantity,
-                shopping_cart_id=cart.id
-            )
-            db.session.add(cart_item)
-            new_items.append(cart_item)
-
-        # Commit the new items to the database
+        try:
+            updated_item_ids = upsert_cart_items(cart, quantities)
+        except ValueError as ve:
+            db.session.rollback()
+            return jsonify({"error": str(ve)}), 400
+
+        # Commit the new and updated items to the database
         db.session.commit()
 
-        # Return a success message with the details of the added items
+        # Return the updated cart so the client does not need to refetch it
+        cart_view = get_cart_view(cart.id)
         return jsonify({
             "message": "Items added to cart successfully",
             "entities": {
-                "shoppingCartItems": normalize_data([item.to_dict() for item in new_items], 'id')
-            }
+                "shoppingCartItems": normalize_data(cart_view["items"], 'id')
+            },
+            "metadata": {
+                "totalItems": cart_view["totalItems"],
+                "totalPrice": cart_view["totalPrice"]
+            },
+            "updatedItemIds": updated_item_ids
         }), 201
 
     except Exception as e:
@@ -254,15 +254,13 @@ def update_cart_item(item_id):
             db.session.commit()
 
 
-            shopping_cart = ShoppingCart.query.get(cart_item.shopping_cart_id)
-            db.session.refresh(shopping_cart)
             # Return a success message along with the updated item details
             return jsonify({
                "message": "Item updated successfully",
                "entities": {
                    "shoppingCartItems": normalize_data([cart_item.to_dict()], 'id')
                },
-               "totalPrice": shopping_cart.calculate_total_price()
+               "totalPrice": get_cart_total(cart_item.shopping_cart_id)
             }), 200
 
         # If the form doesn't validate, return the form errors
@@ -313,16 +311,8 @@ def delete_cart_item(item_id):
         db.session.delete(cart_item)
         db.session.commit()
 
-        # Fetch the updated shopping cart (if it still exists)
-        shopping_cart = ShoppingCart.query.get(shopping_cart_id)
-
-        # Calculate the new total price of the shopping cart
-        if shopping_cart:
-            db.session.refresh(shopping_cart)
-            new_total_price = shopping_cart.calculate_total_price()
-            ic('new_total_price', new_total_price)
-        else:
-            new_total_price = 0
+        # Calculate the new total price of the shopping cart in SQL
+        new_total_price = get_cart_total(shopping_cart_id)
 
         # Return a success message with the new total price
         return jsonify({
@@ -368,9 +358,8 @@ def clear_cart():
         if cart.user_id != current_user.id:
             raise PermissionError("You don't have permission to clear this cart.", 403)
 
-        # Iterate through each item in the cart and delete it from the database
-        for item in cart.items:
-            db.session.delete(item)
+        # Delete all items of the cart with a single statement
+        ShoppingCartItem.query.filter_by(shopping_cart_id=cart.id).delete(synchronize_session=False)
 
         # Commit the changes to the database
         db.session.commit()
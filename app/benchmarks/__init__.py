@@ -0,0 +1,12 @@
+from flask.cli import AppGroup
+from .haversine_benchmark import benchmark_haversine
+from .reorder_benchmark import benchmark_reorder
+from .explain_benchmark import benchmark_explain
+
+# Creates a benchmark group to hold our commands
+# So we can type `flask benchmark --help`
+benchmark_commands = AppGroup('benchmark')
+
+benchmark_commands.add_command(benchmark_haversine)
+benchmark_commands.add_command(benchmark_reorder)
+benchmark_commands.add_command(benchmark_explain)
@@ -0,0 +1,71 @@
+import click
+from sqlalchemy import text
+
+
+def _hot_queries():
+    # (description, table expected to be read through an index, query)
+    from ..models import (Review, MenuItem, Order, OrderItem, ShoppingCart,
+                          ShoppingCartItem, Favorite, Restaurant)
+
+    return [
+        ("reviews of a restaurant", 'reviews',
+         Review.query.filter(Review.restaurant_id == 1).order_by(Review.created_at.desc())),
+        ("menu of a restaurant by type", 'menu_items',
+         MenuItem.query.filter(MenuItem.restaurant_id == 1, MenuItem.type == 'Entree')),
+        ("items of an order", 'order_items', OrderItem.query.filter(OrderItem.order_id == 1)),
+        ("orders of a menu item", 'order_items', OrderItem.query.filter(OrderItem.menu_item_id == 1)),
+        ("orders of a user", 'orders',
+         Order.query.filter(Order.user_id == 1).order_by(Order.created_at.desc(), Order.id.desc())),
+        ("cart of a user", 'shopping_carts', ShoppingCart.query.filter(ShoppingCart.user_id == 1)),
+        ("cart line of a menu item", 'shopping_cart_items',
+         ShoppingCartItem.query.filter(ShoppingCartItem.shopping_cart_id == 1, ShoppingCartItem.menu_item_id == 1)),
+        ("favorite of a user", 'favorites',
+         Favorite.query.filter(Favorite.user_id == 1, Favorite.restaurant_id == 1)),
+        ("restaurants of a city", 'restaurants',
+         Restaurant.query.filter_by(city='San Francisco', state='CA', country='USA')),
+        ("restaurants of an owner", 'restaurants', Restaurant.query.filter(Restaurant.owner_id == 1)),
+    ]
+
+
+def _plan(db, dialect, query):
+    sql = str(query.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    if dialect.name == 'sqlite':
+        return [row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return [row[0] for row in db.session.execute(text(f"EXPLAIN {sql}"))]
+
+
+def _uses_index(dialect_name, table, plan):
+    if dialect_name == 'sqlite':
+        return not any(line.startswith(f"SCAN {table}") and "INDEX" not in line for line in plan)
+    return not any(f"Seq Scan on {table}" in line for line in plan)
+
+
+# Creates the `flask benchmark explain` command
+@click.command('explain')
+@click.option('--verbose', is_flag=True, help='Print every query plan.')
+def benchmark_explain(verbose):
+    """
+    Checks with EXPLAIN that the hot queries are served by an index.
+    Exits with status 1 when one of them falls back to a full table scan.
+    """
+    from ..models import db
+
+    dialect = db.session.get_bind().dialect
+    if dialect.name == 'postgresql':
+        # Small development tables make a sequential scan the cheapest plan;
+        # disable it so the plan shows whether a usable index exists
+        db.session.execute(text("SET LOCAL enable_seqscan = off"))
+
+    failures = 0
+    for description, table, query in _hot_queries():
+        plan = _plan(db, dialect, query)
+        ok = _uses_index(dialect.name, table, plan)
+        failures += not ok
+        click.echo(f"{'ok' if ok else 'FULL SCAN':>9}  {description}")
+        if verbose or not ok:
+            for line in plan:
+                click.echo(f"{'':>11}{line}")
+
+    db.session.rollback()
+    if failures:
+        raise SystemExit(1)
@@ -0,0 +1,58 @@
+import time
+import random
+import click
+from ..helper_functions.database_related_helper_function import (
+    haversine_distance,
+    haversine_distances,
+    haversine_distance_matrix,
+    np
+)
+
+
+def _best_of(repeat, func):
+    # Best wall-clock time of `repeat` runs, in seconds
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+# Creates the `flask benchmark haversine` command
+@click.command('haversine')
+@click.option('--sizes', default='10000,100000,1000000', help='Comma separated point counts.')
+@click.option('--repeat', default=3, help='Runs per measurement (best is reported).')
+@click.option('--origins', default=100, help='Origins used for the distance matrix run.')
+def benchmark_haversine(sizes, repeat, origins):
+    """
+    Compares the scalar haversine loop with the vectorized variants.
+    """
+    if np is None:
+        click.echo("NumPy is not installed; the vectorized helpers fall back to the scalar loop.")
+
+    random.seed(42)
+    origin_lat, origin_lon = 40.7128, -74.0060
+
+    click.echo(f"{'points':>10} {'scalar (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+    for size in (int(s) for s in sizes.split(',')):
+        lats = [random.uniform(40.0, 41.5) for _ in range(size)]
+        lons = [random.uniform(-75.0, -73.0) for _ in range(size)]
+
+        scalar = _best_of(repeat, lambda: [
+            haversine_distance(origin_lat, origin_lon, lat, lon) for lat, lon in zip(lats, lons)
+        ])
+        lat_array = np.asarray(lats) if np is not None else lats
+        lon_array = np.asarray(lons) if np is not None else lons
+        vectorized = _best_of(repeat, lambda: haversine_distances(origin_lat, origin_lon, lat_array, lon_array))
+
+        click.echo(f"{size:>10} {scalar:>12.4f} {vectorized:>15.4f} {scalar / vectorized:>8.1f}x")
+
+    # Many origins x many restaurants, e.g. delivery fee estimation across a city
+    size = min(int(s) for s in sizes.split(','))
+    origin_lats = [random.uniform(40.0, 41.5) for _ in range(origins)]
+    origin_lons = [random.uniform(-75.0, -73.0) for _ in range(origins)]
+    lats = [random.uniform(40.0, 41.5) for _ in range(size)]
+    lons = [random.uniform(-75.0, -73.0) for _ in range(size)]
+    matrix = _best_of(repeat, lambda: haversine_distance_matrix(origin_lats, origin_lons, lats, lons))
+    click.echo(f"distance matrix {origins} x {size}: {matrix:.4f}s")
@@ -0,0 +1,104 @@
+import time
+import click
+from ..models import db, Order, OrderItem, Delivery, Payment
+from ..helper_functions.orders_helper import reorder_order
+from ..helper_functions.http_client import http_post
+
+
+def _legacy_reorder(past_order, base_url):
+    # The previous reorder flow: delivery and payment were created by POSTing
+    # back to our own API, then the order and its items were written locally.
+    delivery = past_order.delivery
+    response = http_post(f"{base_url}/api/delivery", json={
+        "user_id": past_order.user_id,
+        "street_address": delivery.street_address,
+        "city": delivery.city,
+        "state": delivery.state,
+        "postal_code": delivery.postal_code,
+        "country": delivery.country,
+        "cost": delivery.cost,
+        "status": 'Pending',
+    })
+    response.raise_for_status()
+    delivery_id = response.json()['id']
+
+    payment = past_order.payment
+    response = http_post(f"{base_url}/api/payments", json={
+        "gateway": payment.gateway,
+        "amount": payment.amount,
+        "status": 'Pending',
+    })
+    response.raise_for_status()
+    payment_id = response.json()['data']['id']
+
+    new_order = Order(
+        user_id=past_order.user_id,
+        total_price=past_order.total_price,
+        status='Pending',
+        delivery_id=delivery_id,
+        payment_id=payment_id
+    )
+    db.session.add(new_order)
+    db.session.flush()
+    db.session.bulk_save_objects([
+        OrderItem(menu_item_id=item.menu_item_id, order_id=new_order.id, quantity=item.quantity)
+        for item in past_order.items
+    ])
+    db.session.flush()
+    return delivery_id, payment_id
+
+
+def _rate(iterations, func):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - started
+    return iterations / elapsed if elapsed else float('inf')
+
+
+# Creates the `flask benchmark reorder` command
+@click.command('reorder')
+@click.argument('order_id', type=int)
+@click.option('--iterations', default=200, help='Reorders per measurement.')
+@click.option('--base-url', default=None,
+              help='URL of a running API (e.g. http://localhost:5000) to also measure the legacy self-HTTP flow.')
+def benchmark_reorder(order_id, iterations, base_url):
+    """
+    Measures reorders/sec of the in-process reorder service for ORDER_ID.
+
+    Each local reorder is rolled back, so the database is left unchanged.
+    With --base-url the legacy flow is measured too; the deliveries and
+    payments it creates through the API are deleted afterwards.
+    """
+    past_order = Order.query.get(order_id)
+    if past_order is None:
+        raise click.ClickException(f"Order {order_id} not found.")
+    user_id = past_order.user_id
+
+    def in_process():
+        reorder_order(order_id, user_id)
+        db.session.rollback()
+
+    in_process()  # warm up connection and mapper caches
+    rate = _rate(iterations, in_process)
+    click.echo(f"{'in-process service':<20} {rate:>10.1f} reorders/sec")
+
+    if base_url:
+        if not past_order.delivery or not past_order.payment:
+            raise click.ClickException("The legacy flow needs an order with a delivery and a payment.")
+
+        created = []
+
+        def legacy():
+            past = Order.query.get(order_id)
+            created.append(_legacy_reorder(past, base_url))
+            db.session.rollback()
+
+        legacy_rate = _rate(iterations, legacy)
+        click.echo(f"{'legacy self-HTTP':<20} {legacy_rate:>10.1f} reorders/sec")
+        click.echo(f"speedup: {rate / legacy_rate:.1f}x")
+
+        # The API committed these rows on its own connection
+        Delivery.query.filter(Delivery.id.in_([d for d, _ in created])).delete(synchronize_session=False)
+        Payment.query.filter(Payment.id.in_([p for _, p in created])).delete(synchronize_session=False)
+        db.session.commit()
@@ -19,6 +19,29 @@ class Config:
     S3_CLIENT = boto3.client("s3", aws_access_key_id=S3_KEY, aws_secret_access_key=S3_SECRET)
 
     MAPS_API_KEY = os.environ.get('MAPS_API_KEY')
+    # Point at the local stub (`flask stub geocoding`) in tests
+    GEOCODING_API_URL = os.environ.get('GEOCODING_API_URL', 'https://maps.googleapis.com/maps/api/geocode/json')
+
+    # In-process spatial grid for /api/restaurants/nearby (rebuilt every SPATIAL_INDEX_MAX_AGE seconds)
+    SPATIAL_INDEX_ENABLED = os.environ.get('SPATIAL_INDEX_ENABLED', 'false').lower() == 'true'
+    SPATIAL_INDEX_MAX_AGE = int(os.environ.get('SPATIAL_INDEX_MAX_AGE', 300))
+
+    # In-process name index for /api/restaurants/autocomplete (rebuilt every AUTOCOMPLETE_INDEX_MAX_AGE seconds)
+    AUTOCOMPLETE_INDEX_MAX_AGE = int(os.environ.get('AUTOCOMPLETE_INDEX_MAX_AGE', 300))
+
+    # Reverse geocode cache (reverse_geocodes table) used when mapping Google Places results
+    REVERSE_GEOCODE_TTL_DAYS = int(os.environ.get('REVERSE_GEOCODE_TTL_DAYS', 30))
+    REVERSE_GEOCODE_MAX_ENTRIES = int(os.environ.get('REVERSE_GEOCODE_MAX_ENTRIES', 50000))
+    # The size bound is checked on one store out of this many, per worker
+    REVERSE_GEOCODE_EVICTION_INTERVAL = int(os.environ.get('REVERSE_GEOCODE_EVICTION_INTERVAL', 100))
+    DEFER_ADDRESS_ENRICHMENT = os.environ.get('DEFER_ADDRESS_ENRICHMENT', 'false').lower() == 'true'
+
+    # Idempotency-Key handling for order, payment and delivery creation
+    IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+    # A key still 'in progress' after this many seconds is considered abandoned
+    IDEMPOTENCY_LOCK_TIMEOUT = int(os.environ.get('IDEMPOTENCY_LOCK_TIMEOUT', 30))
+    # How long a concurrent duplicate waits for the first request before a 409
+    IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get('IDEMPOTENCY_WAIT_SECONDS', 5))
 
 
     CLIENT_SECRET = os.environ.get('GOOGLE_OAUTH_CLIENT_SECRET')
@@ -26,10 +49,21 @@ class Config:
     BASE_URL = os.environ.get('BASE_URL')
     # GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
     # GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET')
-    # UBER_CLIENT_ID = os.environ.get('UBER_CLIENT_ID')
-    # UBER_CLIENT_SECRET = os.environ.get('UBER_CLIENT_SECRET')
+    UBER_CLIENT_ID = os.environ.get('UBER_CLIENT_ID')
+    UBER_CLIENT_SECRET = os.environ.get('UBER_CLIENT_SECRET')
     # UBER_REDIRECT_URI = os.environ.get('UBER_REDIRECT_URI')
 
+    # Where the UberEats OAuth token is shared between workers: 'file', 'redis' or 'memory'
+    UBER_TOKEN_STORE = os.environ.get('UBER_TOKEN_STORE', 'file')
+    UBER_TOKEN_DIR = os.environ.get('UBER_TOKEN_DIR')
+    REDIS_URL = os.environ.get('REDIS_URL')
+
+    # Pub/sub behind the order status event stream: 'memory' (single worker) or 'redis'
+    EVENT_BROKER = os.environ.get('EVENT_BROKER', 'memory')
+    # GET /api/orders/events holds a worker for as long as the client listens; only
+    # enable it behind an async worker class (gunicorn --worker-class gevent)
+    ORDER_EVENTS_STREAM_ENABLED = os.environ.get('ORDER_EVENTS_STREAM_ENABLED', 'false').lower() == 'true'
+
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     # SQLAlchemy 1.4 no longer supports url strings that start with 'postgres'
     # (only 'postgresql') but heroku's postgres add-on automatically sets the
@@ -39,9 +73,16 @@ class Config:
         'DATABASE_URL').replace('postgres://', 'postgresql://')
     SQLALCHEMY_ECHO = True
 
-    # Cache Configuration
-    CACHE_TYPE = 'simple'
+    # Shared cache used by the API read paths (helper_functions.shared_cache):
+    # 'redis' shares entries between all workers, 'local'/'fakeredis' are per-process stand-ins
+    SHARED_CACHE_BACKEND = os.environ.get('SHARED_CACHE_BACKEND', 'redis' if os.environ.get('REDIS_URL') else 'local')
+    SHARED_CACHE_PREFIX = os.environ.get('SHARED_CACHE_PREFIX', 'starcoeat')
+    SHARED_CACHE_DEFAULT_TTL = int(os.environ.get('SHARED_CACHE_DEFAULT_TTL', 300))
+
+    # Flask-Caching follows the same backend so it is shared between workers too
+    CACHE_TYPE = 'RedisCache' if SHARED_CACHE_BACKEND == 'redis' else 'SimpleCache'
+    CACHE_REDIS_URL = os.environ.get('REDIS_URL')
     
     # DATA_VERSION = 12
 # Initialize the cache
-cache = Cache(config={'CACHE_TYPE': 'simple'})
+cache = Cache()
@@ -1,15 +1,75 @@
 from .normalize_data import normalize_data
 from .date_format_threshold import format_review_date
 from .review_image_helpers import review_image_exists, associated_review_exists, review_belongs_to_user, remove_image_from_s3
-from .order_authorization import is_authorized_to_access_order
+from .order_authorization import is_authorized_to_access_order, owns_restaurant_of_delivery, authorize_orders
 from .payment_validation import is_valid_payment_data
 from .image_handlers import upload_image, delete_image
+from .http_client import http_request, http_get, http_post, get_http_client_stats
+from .idempotency import idempotent, purge_expired_idempotency_keys, CARD_RESPONSE_FIELDS
+from .shared_cache import (
+    get_shared_cache,
+    cached_response,
+    restaurant_cache_tag,
+    invalidate_restaurant_caches,
+    invalidate_order_restaurant_caches,
+    RESTAURANT_LIST_NAMESPACE
+)
+from .conditional_requests import (
+    conditional_get,
+    make_weak_etag,
+    restaurant_list_stamp,
+    restaurant_stamp,
+    menu_item_stamp,
+    review_stamp,
+    restaurant_reviews_stamp,
+    current_user_reviews_stamp,
+    order_stamp,
+    user_orders_stamp,
+    current_cart_stamp
+)
+from .search_index import (
+    search_restaurant_ids,
+    refresh_restaurant_search_document,
+    rebuild_search_index,
+    DEFAULT_SEARCH_PAGE_SIZE,
+    MAX_SEARCH_PAGE_SIZE
+)
+from .order_events import (
+    get_event_broker,
+    publish_order_status,
+    publish_delivery_status,
+    stream_user_events
+)
+
+from .reverse_geocode_cache import (
+    reverse_geocode_key,
+    get_cached_address_components,
+    store_address_components,
+    resolve_address_components,
+    enrich_address_components_in_background
+)
+
+from .city_geocode_cache import (
+    city_geocode_key,
+    get_cached_city_coordinates,
+    store_city_coordinates,
+    warm_city_geocodes_from_restaurants
+)
 
 from .google_map_related_helper_function import (
     fetch_google_places_data,
     get_address_components_from_geocoding,
     map_google_place_to_restaurant_model,
-    get_coordinates_from_geocoding_service
+    get_coordinates_from_geocoding_service,
+    geocoding_api_url
+)
+
+from .uber_token_manager import (
+    UberTokenManager,
+    InMemoryTokenStore,
+    FileTokenStore,
+    RedisTokenStore,
+    get_uber_token_manager
 )
 
 from .uber_eats_related_helper_function import (
@@ -26,17 +86,52 @@ from .database_related_helper_function import (
     fetch_local_db_data,
     fetch_from_database_by_city_state_country,
     fetch_from_database_by_coordinates,
-    haversine_distance
+    fetch_from_spatial_index,
+    haversine_distance,
+    haversine_distances,
+    haversine_distance_matrix,
+    DEFAULT_RADIUS_KM
+)
+
+from .spatial_index import (
+    restaurant_spatial_index,
+    build_restaurant_spatial_index,
+    get_restaurant_spatial_index,
+    refresh_restaurant_in_spatial_index,
+    remove_restaurant_from_spatial_index
+)
+
+from .autocomplete_index import (
+    NamePrefixIndex,
+    get_autocomplete_indexes,
+    build_autocomplete_indexes,
+    refresh_restaurant_in_autocomplete,
+    remove_restaurant_from_autocomplete,
+    refresh_menu_item_in_autocomplete,
+    remove_menu_item_from_autocomplete,
+    DEFAULT_AUTOCOMPLETE_LIMIT,
+    MAX_AUTOCOMPLETE_LIMIT
 )
 
 from .restaurant_helper import (
     aggregate_restaurant_data,
+    deduplicate_restaurants,
     fetch_menu_items_for_restaurant
 )
+from .review_aggregates import (
+    apply_review_to_aggregates,
+    backfill_review_aggregates,
+    find_review_aggregate_mismatches
+)
 from .payments_helper import get_payment_gateway_enum
 from .payment_gateway import PaymentGateway
 from .menu_items_helper import fetch_filtered_menu_items
+from .cart_helper import get_cart_view, get_cart_total, upsert_cart_items
 from .orders_helper import (create_new_order, create_order_items,
                             create_new_delivery, create_new_payment,
-                            fetch_additional_details
+                            fetch_additional_details, reorder_order,
+                            place_order_from_cart,
+                            fetch_user_orders_page, encode_order_cursor,
+                            decode_order_cursor, DEFAULT_ORDERS_PAGE_SIZE,
+                            MAX_ORDERS_PAGE_SIZE
                             )
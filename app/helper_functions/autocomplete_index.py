@@ -0,0 +1,226 @@
+import sys
+import time
+import bisect
+import logging
+import threading
+import unicodedata
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUTOCOMPLETE_LIMIT = 8
+MAX_AUTOCOMPLETE_LIMIT = 20
+
+
+def normalize_name(name):
+    """Lowercases a name and strips accents and punctuation for prefix matching."""
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    # Apostrophes are dropped so that "mario's" and "marios" match
+    folded = ''.join(char for char in decomposed
+                     if not unicodedata.combining(char) and char not in "'\u2019").lower()
+    return ' '.join(''.join(char if char.isalnum() else ' ' for char in folded).split())
+
+
+class NamePrefixIndex:
+    """
+    In-process sorted-array index of names for typeahead.
+
+    Every word start of a name is a key ("thai garden" and "garden"), kept in
+    one sorted list next to a parallel list of item ids. A lookup is a binary
+    search to the first key with the prefix and a short forward scan, so it
+    never touches the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+        self.build_seconds = None
+        self.built_at = None
+
+    def _reset(self):
+        self._keys = []
+        self._ids = []
+        self._names = {}
+        self._groups = {}
+        self._members = {}
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    @staticmethod
+    def _keys_of(name):
+        words = normalize_name(name).split(' ')
+        return [' '.join(words[start:]) for start in range(len(words)) if words[start]]
+
+    def build(self, rows):
+        """
+        Replaces the index content.
+
+        Args:
+            rows (Iterable[Tuple[int, str, Optional[int]]]): (id, name, group) rows;
+                group is e.g. the restaurant of a menu item.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            self._reset()
+            pairs = []
+            for item_id, name, group in rows:
+                if not name:
+                    continue
+                self._remember(item_id, name, group)
+                pairs.extend((key, item_id) for key in self._keys_of(name))
+            pairs.sort()
+            self._keys = [key for key, _ in pairs]
+            self._ids = [item_id for _, item_id in pairs]
+            self.build_seconds = time.perf_counter() - started
+            self.built_at = time.time()
+        logger.info(f"Autocomplete index built with {len(self._names)} names in {self.build_seconds:.4f}s")
+
+    def _remember(self, item_id, name, group):
+        self._names[item_id] = name
+        if group is not None:
+            self._groups[item_id] = group
+            self._members.setdefault(group, set()).add(item_id)
+
+    def _delete(self, item_id):
+        name = self._names.pop(item_id, None)
+        if name is None:
+            return
+        for key in self._keys_of(name):
+            position = bisect.bisect_left(self._keys, key)
+            while position < len(self._keys) and self._keys[position] == key:
+                if self._ids[position] == item_id:
+                    del self._keys[position]
+                    del self._ids[position]
+                    break
+                position += 1
+        group = self._groups.pop(item_id, None)
+        if group is not None:
+            members = self._members.get(group)
+            if members is not None:
+                members.discard(item_id)
+                if not members:
+                    del self._members[group]
+
+    def upsert(self, item_id, name, group=None):
+        """Adds an item or replaces its name."""
+        with self._lock:
+            self._delete(item_id)
+            if not name:
+                return
+            self._remember(item_id, name, group)
+            for key in self._keys_of(name):
+                position = bisect.bisect_right(self._keys, key)
+                self._keys.insert(position, key)
+                self._ids.insert(position, item_id)
+
+    def remove(self, item_id):
+        """Drops an item from the index."""
+        with self._lock:
+            self._delete(item_id)
+
+    def remove_group(self, group):
+        """Drops every item of a group, e.g. the menu items of a deleted restaurant."""
+        with self._lock:
+            for item_id in list(self._members.get(group, ())):
+                self._delete(item_id)
+
+    def query(self, prefix, limit=DEFAULT_AUTOCOMPLETE_LIMIT):
+        """
+        Finds the items with a name word starting with the prefix.
+
+        Returns:
+            List[Tuple[int, str, Optional[int]]]: (id, name, group) in key order.
+        """
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return []
+
+        results, seen = [], set()
+        with self._lock:
+            position = bisect.bisect_left(self._keys, prefix)
+            while position < len(self._keys) and len(results) < limit:
+                if not self._keys[position].startswith(prefix):
+                    break
+                item_id = self._ids[position]
+                if item_id not in seen:
+                    seen.add(item_id)
+                    results.append((item_id, self._names[item_id], self._groups.get(item_id)))
+                position += 1
+        return results
+
+    def stats(self):
+        """Returns size and build metrics of the index (memory_bytes excludes the strings)."""
+        with self._lock:
+            return {
+                "names": len(self._names),
+                "keys": len(self._keys),
+                "build_seconds": self.build_seconds,
+                "built_at": self.built_at,
+                "memory_bytes": sys.getsizeof(self._keys) + sys.getsizeof(self._ids)
+                + sys.getsizeof(self._names) + sys.getsizeof(self._groups),
+            }
+
+
+# One pair of indexes per worker process
+restaurant_name_index = NamePrefixIndex()
+menu_item_name_index = NamePrefixIndex()
+
+
+# ***************************************************************
+# Autocomplete Index Lifecycle Helpers
+# ***************************************************************
+def build_autocomplete_indexes():
+    """
+    Loads every restaurant and menu item name from the database into the indexes.
+    """
+    from ..models import db, Restaurant, MenuItem
+
+    restaurant_name_index.build(
+        (restaurant_id, name, None)
+        for restaurant_id, name in db.session.query(Restaurant.id, Restaurant.name)
+    )
+    menu_item_name_index.build(db.session.query(MenuItem.id, MenuItem.name, MenuItem.restaurant_id))
+
+
+def get_autocomplete_indexes():
+    """
+    Returns the worker's restaurant and menu item indexes, (re)building them
+    when they have not been built yet or are older than
+    AUTOCOMPLETE_INDEX_MAX_AGE seconds. The periodic rebuild picks up writes
+    that were committed by other workers.
+    """
+    max_age = current_app.config.get('AUTOCOMPLETE_INDEX_MAX_AGE')
+    is_stale = (
+        not restaurant_name_index.is_built
+        or (max_age and time.time() - restaurant_name_index.built_at > max_age)
+    )
+    if is_stale:
+        build_autocomplete_indexes()
+    return restaurant_name_index, menu_item_name_index
+
+
+def refresh_restaurant_in_autocomplete(restaurant):
+    """Applies a committed restaurant create/update to this worker's index."""
+    if restaurant_name_index.is_built:
+        restaurant_name_index.upsert(restaurant.id, restaurant.name)
+
+
+def remove_restaurant_from_autocomplete(restaurant_id):
+    """Applies a committed restaurant delete (and its menu) to this worker's indexes."""
+    if restaurant_name_index.is_built:
+        restaurant_name_index.remove(restaurant_id)
+        menu_item_name_index.remove_group(restaurant_id)
+
+
+def refresh_menu_item_in_autocomplete(menu_item):
+    """Applies a committed menu item create/update to this worker's index."""
+    if menu_item_name_index.is_built:
+        menu_item_name_index.upsert(menu_item.id, menu_item.name, menu_item.restaurant_id)
+
+
+def remove_menu_item_from_autocomplete(menu_item_id):
+    """Applies a committed menu item delete to this worker's index."""
+    if menu_item_name_index.is_built:
+        menu_item_name_index.remove(menu_item_id)
@@ -0,0 +1,143 @@
+# ***************************************************************
+# Shopping Cart Read Model
+# ***************************************************************
+def get_cart_view(cart_id):
+    """
+    Loads a cart's items with their menu item name, price and first image,
+    plus the cart totals, in a single query (the total is a window SUM).
+
+    Args:
+        cart_id (int): The ID of the shopping cart.
+
+    Returns:
+        dict: {"items": [...], "totalItems": int, "totalPrice": float}; each
+        item is ShoppingCartItem.to_dict() extended with name, price,
+        image_path, restaurant_id and line_total.
+    """
+    from sqlalchemy import func, select
+    from ..models import db, ShoppingCartItem, MenuItem, MenuItemImg
+
+    first_image = (
+        select(MenuItemImg.image_path)
+        .where(MenuItemImg.menu_item_id == MenuItem.id)
+        .order_by(MenuItemImg.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    line_total = func.coalesce(MenuItem.price, 0) * func.coalesce(ShoppingCartItem.quantity, 0)
+
+    rows = db.session.execute(
+        select(
+            ShoppingCartItem.id,
+            ShoppingCartItem.menu_item_id,
+            ShoppingCartItem.shopping_cart_id,
+            ShoppingCartItem.quantity,
+            MenuItem.name,
+            MenuItem.price,
+            MenuItem.restaurant_id,
+            first_image.label('image_path'),
+            line_total.label('line_total'),
+            func.sum(line_total).over().label('total_price')
+        )
+        .join(MenuItem, MenuItem.id == ShoppingCartItem.menu_item_id)
+        .where(ShoppingCartItem.shopping_cart_id == cart_id)
+        .order_by(ShoppingCartItem.id)
+    ).all()
+
+    items = [
+        {
+            'id': row.id,
+            'menu_item_id': row.menu_item_id,
+            'shopping_cart_id': row.shopping_cart_id,
+            'quantity': row.quantity,
+            'name': row.name,
+            'price': row.price,
+            'restaurant_id': row.restaurant_id,
+            'image_path': row.image_path,
+            'line_total': round(row.line_total, 2),
+        }
+        for row in rows
+    ]
+    return {
+        "items": items,
+        "totalItems": len(items),
+        "totalPrice": round(rows[0].total_price, 2) if rows else 0.0,
+    }
+
+
+def get_cart_total(cart_id):
+    """
+    Returns:
+        float: SUM(price * quantity) of the cart, computed in SQL.
+    """
+    from sqlalchemy import func
+    from ..models import db, ShoppingCartItem, MenuItem
+
+    total = (
+        db.session.query(func.sum(MenuItem.price * ShoppingCartItem.quantity))
+        .join(MenuItem, MenuItem.id == ShoppingCartItem.menu_item_id)
+        .filter(ShoppingCartItem.shopping_cart_id == cart_id)
+        .scalar()
+    )
+    return round(total or 0, 2)
+
+
+# ***************************************************************
+# Add Many Items to a Shopping Cart
+# ***************************************************************
+def upsert_cart_items(cart, quantities):
+    """
+    Adds quantities to a cart, merging with existing lines of the same menu item.
+
+    All requested menu items are resolved with one IN query and the cart's
+    current lines (with their restaurant) with one more; existing lines are
+    updated and new ones inserted in a single flush. A cart may only hold
+    items of one restaurant, checked over the requested and existing items
+    together. Nothing is committed.
+
+    Args:
+        cart (ShoppingCart): The (locked) cart to add to.
+        quantities (dict): Mapping of menu_item_id -> quantity to add.
+
+    Raises:
+        ValueError: If a menu item does not exist, or the items would span
+            more than one restaurant.
+
+    Returns:
+        List[int]: The IDs of the created or updated cart items.
+    """
+    from ..models import db, ShoppingCartItem, MenuItem
+
+    restaurant_by_menu_item = dict(
+        db.session.query(MenuItem.id, MenuItem.restaurant_id)
+        .filter(MenuItem.id.in_(list(quantities)))
+        .all()
+    )
+    missing = [menu_item_id for menu_item_id in quantities if menu_item_id not in restaurant_by_menu_item]
+    if missing:
+        raise ValueError(f"Invalid menu_item_id {', '.join(map(str, missing))}. These items do not exist.")
+
+    existing_lines = (
+        db.session.query(ShoppingCartItem, MenuItem.restaurant_id)
+        .join(MenuItem, MenuItem.id == ShoppingCartItem.menu_item_id)
+        .filter(ShoppingCartItem.shopping_cart_id == cart.id)
+        .all()
+    ) if cart.id is not None else []
+
+    restaurant_ids = set(restaurant_by_menu_item.values()) | {restaurant_id for _, restaurant_id in existing_lines}
+    if len(restaurant_ids) > 1:
+        raise ValueError("A cart can only contain items from one restaurant. Clear the cart to order from another restaurant.")
+
+    line_by_menu_item = {line.menu_item_id: line for line, _ in existing_lines}
+    touched = []
+    for menu_item_id, quantity in quantities.items():
+        line = line_by_menu_item.get(menu_item_id)
+        if line is not None:
+            line.quantity = (line.quantity or 0) + quantity
+        else:
+            line = ShoppingCartItem(menu_item_id=menu_item_id, quantity=quantity, cart=cart)
+            db.session.add(line)
+        touched.append(line)
+
+    db.session.flush()
+    return [line.id for line in touched]
@@ -0,0 +1,101 @@
+import logging
+from sqlalchemy import func, insert
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+
+def city_geocode_key(city_name, state_name=None, country_name=None):
+    """
+    Returns the normalized lookup key of a city: lower-cased parts with
+    collapsed whitespace joined by '|', e.g. 'new york|new york|united states'.
+    """
+    return "|".join(" ".join((part or "").lower().split()) for part in (city_name, state_name, country_name))
+
+
+# ***************************************************************
+# Read a City's Coordinates from the Geocode Table
+# ***************************************************************
+def get_cached_city_coordinates(city_name, state_name=None, country_name=None):
+    """
+    Returns the stored coordinates of a city, or None when it is not known yet.
+    """
+    from ..models import CityGeocode
+
+    row = CityGeocode.query.filter_by(lookup_key=city_geocode_key(city_name, state_name, country_name)).first()
+    return row.to_dict() if row else None
+
+
+# ***************************************************************
+# Store a City's Coordinates in the Geocode Table
+# ***************************************************************
+def store_city_coordinates(city_name, state_name, country_name, coordinates, source='google'):
+    """
+    Persists a resolved city. The row is written on its own connection, so
+    the caller's session is never committed or rolled back. Concurrent inserts
+    of the same city are harmless: the unique lookup_key rejects the duplicate
+    and the error is only logged.
+    """
+    from ..models import db, CityGeocode
+
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(insert(CityGeocode.__table__).values(
+                lookup_key=city_geocode_key(city_name, state_name, country_name),
+                city=" ".join(city_name.split()),
+                state=" ".join(state_name.split()) if state_name else None,
+                country=" ".join(country_name.split()) if country_name else None,
+                latitude=coordinates['latitude'],
+                longitude=coordinates['longitude'],
+                source=source
+            ))
+    except SQLAlchemyError as e:
+        logger.warning(f"Could not store geocode for {city_name}: {e}")
+
+
+# ***************************************************************
+# Warm the Geocode Table from Existing Restaurants
+# ***************************************************************
+def warm_city_geocodes_from_restaurants():
+    """
+    Adds every city/state/country found in the restaurants table, using the
+    average restaurant coordinates as the city's location. Cities that are
+    already stored are left untouched.
+
+    Returns:
+        int: Number of cities added.
+    """
+    from ..models import db, CityGeocode, Restaurant
+
+    rows = (
+        db.session.query(
+            Restaurant.city, Restaurant.state, Restaurant.country,
+            func.avg(Restaurant.latitude), func.avg(Restaurant.longitude)
+        )
+        .filter(Restaurant.city.isnot(None), Restaurant.latitude.isnot(None), Restaurant.longitude.isnot(None))
+        .group_by(Restaurant.city, Restaurant.state, Restaurant.country)
+        .all()
+    )
+
+    known_keys = {key for key, in db.session.query(CityGeocode.lookup_key).all()}
+    added = 0
+    for city, state, country, latitude, longitude in rows:
+        # Restaurants may spell the same city with different spacing or case
+        key = city_geocode_key(city, state, country)
+        if key in known_keys:
+            continue
+        known_keys.add(key)
+        db.session.add(CityGeocode(
+            lookup_key=key,
+            city=" ".join(city.split()),
+            state=" ".join(state.split()) if state else None,
+            country=" ".join(country.split()) if country else None,
+            latitude=float(latitude),
+            longitude=float(longitude),
+            source='restaurants'
+        ))
+        added += 1
+
+    db.session.commit()
+    logger.info(f"Warmed {added} city geocodes from restaurants")
+    return added
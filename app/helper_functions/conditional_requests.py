@@ -0,0 +1,220 @@
+import hashlib
+import logging
+from functools import wraps
+from flask import request, make_response, Response
+from flask_login import current_user
+from sqlalchemy import select, func
+
+logger = logging.getLogger(__name__)
+
+
+def _current_user_id():
+    return current_user.id if current_user.is_authenticated else None
+
+
+def make_weak_etag(stamp):
+    """
+    Returns the weak ETag of a response built from the given stamp. The path,
+    query string and user are part of the tag, so a stamp only has to
+    describe the rows the response is built from.
+    """
+    source = repr((request.full_path, _current_user_id(), tuple(stamp)))
+    return hashlib.sha1(source.encode()).hexdigest()
+
+
+# ***************************************************************
+# Conditional GET Decorator
+# ***************************************************************
+def conditional_get(stamp_for):
+    """
+    Adds a weak ETag to a GET endpoint and answers 304 Not Modified when the
+    client's If-None-Match still matches.
+
+    The ETag is derived from a stamp (row versions, updated_at values, counts)
+    returned by stamp_for, which runs one small aggregate query, so a
+    revalidation neither runs the view nor serializes the body.
+
+    Args:
+        stamp_for (Callable): Receives the view arguments and returns a tuple
+            describing the current state of the response, or None to bypass
+            conditional handling (e.g. the row does not exist).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                stamp = stamp_for(**kwargs)
+            except Exception as e:
+                logger.warning(f"Could not compute the ETag stamp of {request.path}: {e}")
+                stamp = None
+            if stamp is None:
+                return view(*args, **kwargs)
+
+            etag = make_weak_etag(stamp)
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            # Let the browser keep the body but revalidate it on every use
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+# ***************************************************************
+# ETag Stamps of the Read Endpoints
+# ***************************************************************
+def _stamp(*aggregates):
+    # Runs every aggregate as a scalar subquery of a single SELECT
+    from ..models import db
+    return tuple(db.session.query(*aggregates).one())
+
+
+def _scalar(column, *criteria):
+    return select(column).where(*criteria).scalar_subquery()
+
+
+def restaurant_list_stamp():
+    from ..models import Restaurant, OrderItem
+
+    return _stamp(
+        _scalar(func.count(Restaurant.id)),
+        _scalar(func.max(Restaurant.updated_at)),
+        _scalar(func.sum(Restaurant.review_count)),
+        # Delivery times in the listing come from the restaurants' orders
+        _scalar(func.max(OrderItem.order_id))
+    )
+
+
+def restaurant_stamp(restaurant_id):
+    """
+    Stamp of everything a restaurant's detail and menu are built from: the
+    restaurant row, its menu items and their images, and its latest order.
+    Returns None for unknown restaurants and UberEats stores (live data).
+    """
+    from ..models import db, Restaurant, MenuItem, MenuItemImg, OrderItem
+
+    if isinstance(restaurant_id, str):
+        if not restaurant_id.isdigit():
+            return None
+        restaurant_id = int(restaurant_id)
+
+    row = (db.session.query(Restaurant.updated_at, Restaurant.review_count,
+                            Restaurant.rating_sum, Restaurant.ubereats_store_id)
+           .filter(Restaurant.id == restaurant_id)
+           .first())
+    if row is None or row.ubereats_store_id:
+        return None
+
+    menu_item_ids = select(MenuItem.id).where(MenuItem.restaurant_id == restaurant_id)
+    return (row.updated_at, row.review_count, row.rating_sum) + _stamp(
+        _scalar(func.count(MenuItem.id), MenuItem.restaurant_id == restaurant_id),
+        _scalar(func.max(MenuItem.updated_at), MenuItem.restaurant_id == restaurant_id),
+        _scalar(func.max(MenuItem.id), MenuItem.restaurant_id == restaurant_id),
+        _scalar(func.count(MenuItemImg.id), MenuItemImg.menu_item_id.in_(menu_item_ids)),
+        _scalar(func.max(MenuItemImg.id), MenuItemImg.menu_item_id.in_(menu_item_ids)),
+        _scalar(func.max(OrderItem.order_id), OrderItem.menu_item_id.in_(menu_item_ids))
+    )
+
+
+def menu_item_stamp(menu_item_id):
+    from ..models import MenuItem, MenuItemImg
+
+    stamp = _stamp(
+        _scalar(func.max(MenuItem.updated_at), MenuItem.id == menu_item_id),
+        _scalar(func.count(MenuItemImg.id), MenuItemImg.menu_item_id == menu_item_id),
+        _scalar(func.max(MenuItemImg.id), MenuItemImg.menu_item_id == menu_item_id)
+    )
+    return stamp if stamp[0] is not None else None
+
+
+def _reviews_stamp(*criteria):
+    from ..models import Review, ReviewImg
+
+    review_ids = select(Review.id).where(*criteria)
+    return _stamp(
+        _scalar(func.count(Review.id), *criteria),
+        _scalar(func.max(Review.updated_at), *criteria),
+        _scalar(func.max(Review.id), *criteria),
+        _scalar(func.count(ReviewImg.id), ReviewImg.review_id.in_(review_ids)),
+        _scalar(func.max(ReviewImg.id), ReviewImg.review_id.in_(review_ids))
+    )
+
+
+def review_stamp(review_id):
+    from ..models import Review
+
+    stamp = _reviews_stamp(Review.id == review_id)
+    return stamp if stamp[0] else None
+
+
+def restaurant_reviews_stamp(restaurant_id):
+    from ..models import Review
+
+    return _reviews_stamp(Review.restaurant_id == restaurant_id)
+
+
+def current_user_reviews_stamp():
+    from ..models import Review, Restaurant
+
+    criteria = Review.user_id == current_user.id
+    # The response also carries the reviewed restaurants
+    restaurant_ids = select(Review.restaurant_id).where(criteria)
+    return _reviews_stamp(criteria) + _stamp(
+        _scalar(func.max(Restaurant.updated_at), Restaurant.id.in_(restaurant_ids))
+    )
+
+
+def order_stamp(order_id):
+    """
+    Stamp of an order with its delivery, payment and items. Only computed for
+    the order's owner; other callers go through the view's own checks.
+    """
+    from ..models import db, Order, OrderItem, Delivery, Payment
+
+    row = (db.session.query(Order.user_id, Order.updated_at, Delivery.status, Payment.status)
+           .outerjoin(Delivery, Order.delivery_id == Delivery.id)
+           .outerjoin(Payment, Order.payment_id == Payment.id)
+           .filter(Order.id == order_id)
+           .first())
+    if row is None or row[0] != _current_user_id():
+        return None
+
+    return tuple(row[1:]) + _stamp(
+        _scalar(func.count(OrderItem.id), OrderItem.order_id == order_id),
+        _scalar(func.sum(OrderItem.quantity), OrderItem.order_id == order_id)
+    )
+
+
+def user_orders_stamp(user_id):
+    from ..models import Order
+
+    if user_id != _current_user_id():
+        return None
+    return _stamp(
+        _scalar(func.count(Order.id), Order.user_id == user_id),
+        _scalar(func.max(Order.updated_at), Order.user_id == user_id),
+        _scalar(func.max(Order.id), Order.user_id == user_id)
+    )
+
+
+def current_cart_stamp():
+    from ..models import ShoppingCart, ShoppingCartItem, MenuItem
+
+    cart_ids = select(ShoppingCart.id).where(ShoppingCart.user_id == current_user.id)
+    in_cart = ShoppingCartItem.shopping_cart_id.in_(cart_ids)
+    return _stamp(
+        _scalar(func.max(ShoppingCart.id), ShoppingCart.user_id == current_user.id),
+        _scalar(func.count(ShoppingCartItem.id), in_cart),
+        _scalar(func.max(ShoppingCartItem.id), in_cart),
+        _scalar(func.max(ShoppingCartItem.updated_at), in_cart),
+        _scalar(func.sum(ShoppingCartItem.quantity), in_cart),
+        # Prices and names of the items in the cart
+        _scalar(func.max(MenuItem.updated_at),
+                MenuItem.id.in_(select(ShoppingCartItem.menu_item_id).where(in_cart)))
+    )
@@ -1,28 +1,88 @@
 from sqlite3 import OperationalError
+from sqlalchemy import and_, or_
 import math
 import logging
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the batched helpers fall back to pure Python
+    np = None
+from .geohash import bounding_box, geohash_prefixes_for_box
 
 # Set up logging to capture error messages and other logs.
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default search radius for nearby lookups, in kilometers
+DEFAULT_RADIUS_KM = 5.0
+
+# Radius of Earth in kilometers
+EARTH_RADIUS_KM = 6371
+
 # ***************************************************************
 # Aggregate Restaurant Data from Database by Coordinates (Latitude and Longitude)
 # ***************************************************************
-def aggregate_restaurant_data_by_coordinates(latitude, longitude):
+def aggregate_restaurant_data_by_coordinates(latitude, longitude, radius_km=DEFAULT_RADIUS_KM, limit=None):
     """
     Fetch restaurants from the database based on provided latitude and longitude.
 
     Args:
     - latitude (float): Latitude of the desired location.
     - longitude (float): Longitude of the desired location.
+    - radius_km (float): Search radius in kilometers.
+    - limit (int, optional): Maximum number of restaurants to return.
 
     Returns:
-    - List[dict]: List of mapped restaurant data from the local database based on the provided coordinates.
+    - List[dict]: Mapped restaurant data sorted by distance, each with a 'distance_km' field.
     """
-    # Fetch data based on latitude and longitude from your local database
-    restaurants = fetch_from_database_by_coordinates(latitude, longitude)
-    return [r.to_dict() for r in restaurants]
+    from ..models import Restaurant
+    from .spatial_index import get_restaurant_spatial_index
+
+    spatial_index = get_restaurant_spatial_index()
+    if spatial_index is not None:
+        # Candidate ids come from the in-memory grid; only the top-N are hydrated
+        nearby = fetch_from_spatial_index(spatial_index, latitude, longitude, radius_km, limit)
+    else:
+        # Fetch data based on latitude and longitude from your local database
+        nearby = fetch_from_database_by_coordinates(latitude, longitude, radius=radius_km, limit=limit)
+    restaurant_dicts = Restaurant.serialize_many(restaurant for restaurant, _ in nearby)
+    for restaurant_dict, (_, distance) in zip(restaurant_dicts, nearby):
+        restaurant_dict['distance_km'] = round(distance, 3) if distance is not None else None
+    return restaurant_dicts
+
+# ***************************************************************
+# Fetch Nearby Restaurants through the In-Memory Spatial Index
+# ***************************************************************
+def fetch_from_spatial_index(spatial_index, latitude, longitude, radius_km=DEFAULT_RADIUS_KM, limit=None):
+    """
+    Resolve nearby restaurant ids from the spatial index and load only those rows.
+
+    Rows that no longer exist (deleted by another worker since the last
+    rebuild) are skipped, and distances are recomputed from the loaded rows.
+
+    Returns:
+    - List[Tuple[Restaurant, float]]: (restaurant, distance_km) pairs sorted by distance.
+    """
+    from ..models import Restaurant
+
+    candidates = spatial_index.query(latitude, longitude, radius_km, limit=limit)
+    if not candidates:
+        return []
+
+    restaurants_by_id = {
+        restaurant.id: restaurant
+        for restaurant in Restaurant.query.filter(Restaurant.id.in_([restaurant_id for restaurant_id, _ in candidates])).all()
+    }
+
+    nearby_restaurants = []
+    for restaurant_id, _ in candidates:
+        restaurant = restaurants_by_id.get(restaurant_id)
+        if restaurant is None or restaurant.latitude is None or restaurant.longitude is None:
+            continue
+        distance = haversine_distance(latitude, longitude, restaurant.latitude, restaurant.longitude)
+        if distance <= radius_km:
+            nearby_restaurants.append((restaurant, distance))
+    nearby_restaurants.sort(key=lambda pair: pair[1])
+    return nearby_restaurants
 
 # ***************************************************************
 # Aggregate Restaurant Data from Database by City, State, and Country
@@ -39,9 +99,11 @@ def aggregate_restaurant_data_by_city_state_country(city_name, state_name, count
     Returns:
     - List[dict]: List of mapped restaurant data from the local database based on the provided city, state, and country.
     """
+    from ..models import Restaurant
+
     # Fetch data based on city, state, and country from your local database
     restaurants = fetch_from_database_by_city_state_country(city_name, state_name, country_name)
-    return [r.to_dict() for r in restaurants]
+    return Restaurant.serialize_many(restaurants)
 
 
 # ***************************************************************
@@ -94,9 +156,11 @@ def fetch_local_db_data(city_name, state_name=None, country_name=None):
     Returns:
         List[dict]: List of mapped restaurant data from the local database.
     """
+    from ..models import Restaurant
+
     try:
         restaurants = fetch_from_database_by_city_state_country(city_name=city_name, state_name=state_name, country_name=country_name)
-        return [r.to_dict() for r in restaurants]
+        return Restaurant.serialize_many(restaurants)
     except OperationalError as oe:
         logger.error(oe)
         return [{"error": "Database operation failed. Please try again later."}]
@@ -108,62 +172,75 @@ def fetch_local_db_data(city_name, state_name=None, country_name=None):
 # ***************************************************************
 # Fetch Restaurants from Database by Coordinates (Latitude and Longitude)
 # ***************************************************************
-def fetch_from_database_by_coordinates(latitude=None, longitude=None, city_name=None, radius=5.0):  # Increased default radius to 5.0 km
+def fetch_from_database_by_coordinates(latitude=None, longitude=None, city_name=None, radius=DEFAULT_RADIUS_KM, limit=None):
     """
     Fetch restaurants from the database based on location (latitude, longitude) or city name.
 
+    Coordinates are narrowed down with range scans on the indexed geohash
+    column plus a km-correct lat/lon bounding box, then the remaining
+    candidates are checked against the exact haversine distance.
+
     Args:
     - latitude (float): Latitude of the desired location.
     - longitude (float): Longitude of the desired location.
     - city_name (str): Name of the city.
-    - radius (float): The difference in lat/lon to consider as "nearby". Default is 5.0 km.
+    - radius (float): Search radius in kilometers. Default is 5.0 km.
+    - limit (int, optional): Maximum number of restaurants to return.
 
     Returns:
-    - List[Restaurant]: List of nearby restaurants.
+    - List[Tuple[Restaurant, float]]: (restaurant, distance_km) pairs sorted by distance.
+      The distance is None for city lookups.
     """
     from ..models import Restaurant
 
     # If latitude and longitude are provided, search by location
-    if latitude and longitude:
-        # Define a bounding box around the provided location for quick filtering
-        lat_min, lat_max = latitude - radius, latitude + radius
-        lon_min, lon_max = longitude - radius, longitude + radius
-
-        logger.info(f"Bounding box for latitude: {lat_min} to {lat_max}")
-        logger.info(f"Bounding box for longitude: {lon_min} to {lon_max}")
+    if latitude is not None and longitude is not None:
+        lat_min, lat_max, lon_min, lon_max = bounding_box(latitude, longitude, radius)
+        logger.info(f"Bounding box for {radius} km: lat {lat_min} to {lat_max}, lon {lon_min} to {lon_max}")
 
-        # Fetch restaurants that are within this bounding box
-        nearby_restaurants = (
+        query = (
             Restaurant.query
             .filter(Restaurant.latitude.between(lat_min, lat_max))
             .filter(Restaurant.longitude.between(lon_min, lon_max))
-            .all()
         )
 
+        # Each prefix is a range scan on the geohash index ('~' sorts after the base32 alphabet)
+        prefixes = geohash_prefixes_for_box(lat_min, lat_max, lon_min, lon_max)
+        if prefixes:
+            query = query.filter(or_(*[
+                and_(Restaurant.geohash >= prefix, Restaurant.geohash < prefix + '~')
+                for prefix in prefixes
+            ]))
+
+        candidates = query.all()
+        logger.info(f"Nearby candidate restaurants count: {len(candidates)}")
+
+        # Exact distances for all candidates in one vectorized pass
+        distances = haversine_distances(
+            latitude, longitude,
+            [restaurant.latitude for restaurant in candidates],
+            [restaurant.longitude for restaurant in candidates]
+        )
+        nearby_restaurants = [
+            (restaurant, float(distance))
+            for restaurant, distance in zip(candidates, distances)
+            if distance <= radius
+        ]
+        nearby_restaurants.sort(key=lambda pair: pair[1])
+
     # If a city name is provided, fetch restaurants associated with that city
     elif city_name:
         logger.info(f"Fetching restaurants for city: {city_name}")
-        nearby_restaurants = (
-            Restaurant.query
-            .filter_by(city=city_name)
-            .all()
-        )
+        nearby_restaurants = [(restaurant, None) for restaurant in Restaurant.query.filter_by(city=city_name).all()]
     else:
         nearby_restaurants = []
 
-    logger.info(f"Nearby restaurants count: {len(nearby_restaurants)}")
-
-    # Further filter the results by exact distance using the haversine formula
-    filtered_restaurants = []
-    for restaurant in nearby_restaurants:
-        distance = haversine_distance(latitude, longitude, restaurant.latitude, restaurant.longitude)
-        logger.info(f"Distance to restaurant {restaurant.name}: {distance} km")
-        if distance <= radius:
-            filtered_restaurants.append(restaurant)
+    if limit is not None:
+        nearby_restaurants = nearby_restaurants[:limit]
 
-    logger.info(f"Filtered restaurants count (after haversine check): {len(filtered_restaurants)}")
+    logger.info(f"Nearby restaurants count (after haversine check): {len(nearby_restaurants)}")
 
-    return filtered_restaurants
+    return nearby_restaurants
 
 
 # ***************************************************************
@@ -192,10 +269,59 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
 
-    # Radius of Earth in kilometers
-    r = 6371
-
     # Calculate the actual distance
-    distance = r * c
+    distance = EARTH_RADIUS_KM * c
 
     return distance
+
+
+# ***************************************************************
+# Calculate Haversine Distances from One Point to Many Points
+# ***************************************************************
+def haversine_distances(lat1, lon1, lats2, lons2):
+    """
+    Batched haversine: distances from one point to many points in one pass.
+
+    Args:
+    - lat1, lon1: Latitude and Longitude of the origin.
+    - lats2, lons2: Sequences (or NumPy arrays) of destination latitudes and longitudes.
+
+    Returns:
+    - numpy.ndarray (or list without NumPy): Distances in kilometers, in input order.
+    """
+    if np is None:
+        return [haversine_distance(lat1, lon1, lat2, lon2) for lat2, lon2 in zip(lats2, lons2)]
+
+    lat1, lon1 = math.radians(lat1), math.radians(lon1)
+    lats2 = np.radians(np.asarray(lats2, dtype=np.float64))
+    lons2 = np.radians(np.asarray(lons2, dtype=np.float64))
+
+    a = np.sin((lats2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lats2) * np.sin((lons2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+# ***************************************************************
+# Calculate a Haversine Distance Matrix (Many Origins x Many Points)
+# ***************************************************************
+def haversine_distance_matrix(origin_lats, origin_lons, lats, lons):
+    """
+    Distances between every origin and every destination, e.g. customer
+    locations x restaurants when estimating delivery fees across a city.
+
+    Args:
+    - origin_lats, origin_lons: Sequences of origin latitudes and longitudes (length M).
+    - lats, lons: Sequences of destination latitudes and longitudes (length N).
+
+    Returns:
+    - numpy.ndarray (or list of lists without NumPy): M x N distances in kilometers.
+    """
+    if np is None:
+        return [haversine_distances(lat1, lon1, lats, lons) for lat1, lon1 in zip(origin_lats, origin_lons)]
+
+    origin_lats = np.radians(np.asarray(origin_lats, dtype=np.float64))[:, np.newaxis]
+    origin_lons = np.radians(np.asarray(origin_lons, dtype=np.float64))[:, np.newaxis]
+    lats = np.radians(np.asarray(lats, dtype=np.float64))[np.newaxis, :]
+    lons = np.radians(np.asarray(lons, dtype=np.float64))[np.newaxis, :]
+
+    a = np.sin((lats - origin_lats) / 2) ** 2 + np.cos(origin_lats) * np.cos(lats) * np.sin((lons - origin_lons) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
@@ -0,0 +1,138 @@
+import math
+
+# Base32 alphabet used by the geohash encoding
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Precision stored on restaurants (precision 9 cells are roughly 5 m x 5 m,
+# shorter prefixes of the same string address coarser cells)
+GEOHASH_PRECISION = 9
+
+# Approximate kilometers per degree of latitude
+KM_PER_DEGREE_LAT = 111.32
+
+
+# ***************************************************************
+# Encode Coordinates as a Geohash
+# ***************************************************************
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """
+    Encodes a latitude/longitude pair as a geohash string.
+
+    Args:
+        latitude (float): Latitude in decimal degrees.
+        longitude (float): Longitude in decimal degrees.
+        precision (int): Number of geohash characters to produce.
+
+    Returns:
+        str or None: The geohash, or None if either coordinate is missing.
+    """
+    if latitude is None or longitude is None:
+        return None
+
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    geohash = []
+    bits, bit_count, even = 0, 0, True
+
+    while len(geohash) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            geohash.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+
+    return "".join(geohash)
+
+
+# ***************************************************************
+# Geohash Cell Dimensions
+# ***************************************************************
+def geohash_cell_size(precision):
+    """
+    Returns the size of a geohash cell in degrees.
+
+    Returns:
+        tuple: (latitude_degrees, longitude_degrees) covered by one cell.
+    """
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+# ***************************************************************
+# Convert a Radius in Kilometers to a Bounding Box in Degrees
+# ***************************************************************
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Computes the lat/lon bounding box that contains a circle of radius_km.
+
+    Longitude degrees shrink with the cosine of the latitude, so the
+    longitude span is widened accordingly (and clamped near the poles).
+
+    Returns:
+        tuple: (lat_min, lat_max, lon_min, lon_max)
+    """
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(latitude))
+    lon_delta = 180.0 if cos_lat < 1e-6 else min(180.0, radius_km / (KM_PER_DEGREE_LAT * cos_lat))
+
+    return (
+        max(-90.0, latitude - lat_delta),
+        min(90.0, latitude + lat_delta),
+        max(-180.0, longitude - lon_delta),
+        min(180.0, longitude + lon_delta),
+    )
+
+
+# ***************************************************************
+# Geohash Prefixes Covering a Bounding Box
+# ***************************************************************
+def geohash_prefixes_for_box(lat_min, lat_max, lon_min, lon_max, max_cells=16):
+    """
+    Finds a small set of geohash prefixes whose cells cover the bounding box.
+
+    Picks the longest precision whose cells are at least as large as the box
+    (capped at max_cells prefixes) so the lookup becomes a handful of B-tree
+    range scans on the indexed geohash column.
+
+    Returns:
+        List[str]: Sorted, de-duplicated geohash prefixes (empty if the box
+        is too large for prefix filtering to help).
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        cell_lat, cell_lon = geohash_cell_size(precision)
+        rows = math.floor(lat_max / cell_lat) - math.floor(lat_min / cell_lat) + 1
+        cols = math.floor(lon_max / cell_lon) - math.floor(lon_min / cell_lon) + 1
+        if rows * cols > max_cells:
+            continue
+
+        prefixes = set()
+        for row in range(rows):
+            lat = min(lat_max, lat_min + row * cell_lat)
+            for col in range(cols):
+                lon = min(lon_max, lon_min + col * cell_lon)
+                prefixes.add(encode_geohash(lat, lon, precision))
+            prefixes.add(encode_geohash(lat, lon_max, precision))
+        for col in range(cols):
+            prefixes.add(encode_geohash(lat_max, min(lon_max, lon_min + col * cell_lon), precision))
+        prefixes.add(encode_geohash(lat_max, lon_max, precision))
+        return sorted(prefixes)
+
+    return []
@@ -2,21 +2,32 @@ from sqlite3 import OperationalError
 import base64
 from flask_caching import Cache
 import requests
-from flask import current_app
+from .http_client import http_get
+from flask import current_app, has_app_context
 from app.config import cache
 import datetime
 import random
+import os
 import math
 import logging
+from .city_geocode_cache import get_cached_city_coordinates, store_city_coordinates
+from .reverse_geocode_cache import (
+    reverse_geocode_key,
+    get_cached_address_components,
+    resolve_address_components,
+    enrich_address_components_in_background
+)
 
 # Set up logging to capture error messages and other logs.
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_GEOCODING_API_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+
 # ***************************************************************
 # Map Google Place Data to Restaurant Model
 # ***************************************************************
-def map_google_place_to_restaurant_model(google_place_data):
+def map_google_place_to_restaurant_model(google_place_data, address_components=None):
     """
     Maps the provided Google Place data to a restaurant model.
 
@@ -25,6 +36,8 @@ def map_google_place_to_restaurant_model(google_place_data):
 
     Args:
         google_place_data (dict): The Google Place data.
+        address_components (dict, optional): Pre-resolved address components. When
+            omitted they are resolved through the reverse geocode cache.
 
     Returns:
         dict: A dictionary containing information in the structure of the restaurant model.
@@ -35,8 +48,9 @@ def map_google_place_to_restaurant_model(google_place_data):
     lat = google_place_data['geometry']['location']['lat']
     lng = google_place_data['geometry']['location']['lng']
 
-    # Fetch address components using geocoding
-    address_components = get_address_components_from_geocoding(lat, lng, current_app.config['MAPS_API_KEY'])
+    # Fetch address components using geocoding (served from the cache when possible)
+    if address_components is None:
+        address_components = resolve_address_components([(lat, lng)], current_app.config['MAPS_API_KEY']).get(reverse_geocode_key(lat, lng), {})
 
     opening_time = None
     closing_time = None
@@ -80,25 +94,51 @@ def map_google_place_to_restaurant_model(google_place_data):
 # ***************************************************************
 # Fetch Nearby Restaurants from Google Places by Location
 # ***************************************************************
-def fetch_google_places_data(latitude, longitude):
+def fetch_google_places_data(latitude, longitude, defer_address_enrichment=None):
     """
     Fetch and map nearby restaurants from Google Places based on latitude and longitude.
 
+    Address components of all places are resolved together: cached ones come
+    from the reverse geocode cache and the misses are geocoded in parallel.
+    With defer_address_enrichment the misses are geocoded by a background job
+    instead, and the places are returned right away without those fields.
+
     Args:
         latitude (str): Latitude of the location.
         longitude (str): Longitude of the location.
+        defer_address_enrichment (bool, optional): Defaults to the
+            DEFER_ADDRESS_ENRICHMENT config value.
 
     Returns:
         List[dict]: List of mapped restaurant data from Google Places.
     """
     try:
         google_api_key = current_app.config['MAPS_API_KEY']
+        if defer_address_enrichment is None:
+            defer_address_enrichment = current_app.config.get('DEFER_ADDRESS_ENRICHMENT', False)
+
         endpoint = f"https://maps.googleapis.com/maps/api/place/nearbysearch/json?location={latitude},{longitude}&radius=1500&type=restaurant&key={google_api_key}"
-        response = requests.get(endpoint)
+        response = http_get(endpoint)
         data = response.json()
 
         if response.status_code == 200 and data.get('status', '') == "OK":
-            return [map_google_place_to_restaurant_model(r) for r in data['results']]
+            places = data['results']
+            coordinates = [
+                (place['geometry']['location']['lat'], place['geometry']['location']['lng'])
+                for place in places
+            ]
+
+            if defer_address_enrichment:
+                address_components = get_cached_address_components([reverse_geocode_key(lat, lng) for lat, lng in coordinates])
+                if len(address_components) < len(set(reverse_geocode_key(lat, lng) for lat, lng in coordinates)):
+                    enrich_address_components_in_background(coordinates, google_api_key)
+            else:
+                address_components = resolve_address_components(coordinates, google_api_key)
+
+            return [
+                map_google_place_to_restaurant_model(place, address_components.get(reverse_geocode_key(lat, lng), {}))
+                for place, (lat, lng) in zip(places, coordinates)
+            ]
         return []
     except Exception as e:
         logger.error(f"Error fetching data from Google Places: {e}")
@@ -122,8 +162,8 @@ def get_address_components_from_geocoding(lat, lng, api_key):
     # pass
 
     # Define the endpoint for the Google Geocoding API
-    endpoint = f"https://maps.googleapis.com/maps/api/geocode/json?latlng={lat},{lng}&key={api_key}"
-    response = requests.get(endpoint)
+    endpoint = f"{geocoding_api_url()}?latlng={lat},{lng}&key={api_key}"
+    response = http_get(endpoint)
     data = response.json()
 
     # Check if there are results in the response
@@ -148,20 +188,28 @@ def get_address_components_from_geocoding(lat, lng, api_key):
 
     return details
 
-def get_coordinates_from_geocoding_service(city_name, api_key):
+def get_coordinates_from_geocoding_service(city_name, api_key, state_name=None, country_name=None):
     """
-    Fetches latitude and longitude coordinates using Google Geocoding API based on city name.
+    Fetches latitude and longitude coordinates based on city name.
+
+    The city_geocodes table is consulted first; only unknown cities are sent
+    to the Google Geocoding API, and the answer is stored for next time.
 
     Args:
         city_name (str): The name of the city.
         api_key (str): The API key for Google Geocoding.
+        state_name (str, optional): The state, used to disambiguate the city.
+        country_name (str, optional): The country, used to disambiguate the city.
 
     Returns:
         dict or None: A dictionary containing 'latitude' and 'longitude' keys or None if unsuccessful.
     """
+    cached = get_cached_city_coordinates(city_name, state_name, country_name)
+    if cached:
+        return cached
 
-    endpoint = f"https://maps.googleapis.com/maps/api/geocode/json?address={city_name}&key={api_key}"
-    response = requests.get(endpoint)
+    address = ", ".join(part for part in (city_name, state_name, country_name) if part)
+    response = http_get(geocoding_api_url(), params={"address": address, "key": api_key})
     data = response.json()
 
     # Check if there are results in the response
@@ -171,6 +219,19 @@ def get_coordinates_from_geocoding_service(city_name, api_key):
         longitude = location.get('lng')
 
         if latitude and longitude:
-            return {'latitude': latitude, 'longitude': longitude}
+            coordinates = {'latitude': latitude, 'longitude': longitude}
+            store_city_coordinates(city_name, state_name, country_name, coordinates)
+            return coordinates
 
     return None
+
+
+def geocoding_api_url():
+    """
+    Returns the Geocoding API endpoint. GEOCODING_API_URL can point it at the
+    local stub server (`flask stub geocoding`). Also works outside an app
+    context, e.g. from the reverse geocode thread pool.
+    """
+    if has_app_context():
+        return current_app.config.get('GEOCODING_API_URL', DEFAULT_GEOCODING_API_URL)
+    return os.environ.get('GEOCODING_API_URL', DEFAULT_GEOCODING_API_URL)
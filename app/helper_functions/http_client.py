@@ -0,0 +1,162 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeouts in seconds applied when the caller passes none
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# Connections kept alive per host
+POOL_MAXSIZE = 20
+
+# Bounded retries with exponential backoff (0.3s, 0.6s, 1.2s) on connection
+# errors and transient statuses. POST is retried only on connection errors
+# raised before the request was sent, never on a response status.
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+# Per-thread deadline set by request_deadline
+_local = threading.local()
+
+
+def _build_session(retries=True):
+    if retries:
+        retry = Retry(
+            total=RETRY_TOTAL,
+            backoff_factor=RETRY_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+            raise_on_status=False
+        )
+    else:
+        # requests' own default: timeouts surface as requests.Timeout
+        retry = Retry(0, read=False)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(url, retries=True):
+    """
+    Returns the pooled keep-alive session of the url's host, creating it on first use.
+    """
+    host = urlsplit(url).netloc
+    with _sessions_lock:
+        session = _sessions.get((host, retries))
+        if session is None:
+            session = _sessions[(host, retries)] = _build_session(retries)
+        return session
+
+
+# ***************************************************************
+# Bound the Outbound Requests of a Block
+# ***************************************************************
+@contextmanager
+def request_deadline(seconds):
+    """
+    Makes every request sent by the current thread inside the block finish
+    within `seconds` overall: connect and read timeouts are capped to the
+    time left, retries are skipped, and a request started past the deadline
+    raises requests.Timeout without being sent. Nested deadlines keep the
+    earliest one.
+    """
+    previous = getattr(_local, 'deadline', None)
+    deadline = time.monotonic() + seconds
+    _local.deadline = deadline if previous is None else min(previous, deadline)
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+
+def _bounded_timeout(timeout, remaining):
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    return (
+        remaining if connect is None else min(connect, remaining),
+        remaining if read is None else min(read, remaining)
+    )
+
+
+def _record(host, elapsed, failed):
+    with _stats_lock:
+        stats = _stats.setdefault(host, {"requests": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["requests"] += 1
+        stats["errors"] += 1 if failed else 0
+        stats["total_ms"] += elapsed * 1000
+        stats["max_ms"] = max(stats["max_ms"], elapsed * 1000)
+
+
+# ***************************************************************
+# Send an Outbound HTTP Request
+# ***************************************************************
+def http_request(method, url, **kwargs):
+    """
+    Sends a request through the host's pooled session with the default
+    timeout and retry policy (bounded by the thread's request_deadline, if
+    any), and records per-host latency and errors.
+
+    Accepts the same keyword arguments as requests.request; errors are raised
+    as the usual requests exceptions.
+    """
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    host = urlsplit(url).netloc
+    retries = True
+    deadline = getattr(_local, 'deadline', None)
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise requests.Timeout(f"Deadline exceeded before requesting {host}")
+        kwargs['timeout'] = _bounded_timeout(kwargs['timeout'], remaining)
+        retries = False
+
+    started = time.perf_counter()
+    failed = True
+    try:
+        response = get_session(url, retries).request(method, url, **kwargs)
+        failed = response.status_code >= 500
+        return response
+    finally:
+        _record(host, time.perf_counter() - started, failed)
+
+
+def http_get(url, **kwargs):
+    return http_request('GET', url, **kwargs)
+
+
+def http_post(url, **kwargs):
+    return http_request('POST', url, **kwargs)
+
+
+# ***************************************************************
+# Outbound HTTP Metrics
+# ***************************************************************
+def get_http_client_stats():
+    """
+    Returns per-host counters: requests, errors (exceptions and 5xx),
+    average and max latency in milliseconds.
+    """
+    with _stats_lock:
+        return {
+            host: {
+                "requests": stats["requests"],
+                "errors": stats["errors"],
+                "avg_ms": round(stats["total_ms"] / stats["requests"], 1) if stats["requests"] else 0,
+                "max_ms": round(stats["max_ms"], 1),
+            }
+            for host, stats in _stats.items()
+        }
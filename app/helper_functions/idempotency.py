@@ -0,0 +1,210 @@
+import json
+import time
+import hashlib
+import logging
+from functools import wraps
+from datetime import datetime, timedelta
+from flask import current_app, request, jsonify, make_response, Response
+from flask_login import current_user
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+# Seconds between checks while another request holds the same key
+_POLL_INTERVAL = 0.1
+
+# Card fields of a payment response, passed as idempotent(..., redact=...) by the payment routes
+CARD_RESPONSE_FIELDS = frozenset({
+    'cardholder_name', 'card_number', 'card_expiry_month', 'card_expiry_year',
+    'card_cvc', 'postal_code'
+})
+
+
+def request_fingerprint():
+    """
+    Returns the SHA-256 of the request method, path and body. JSON bodies
+    are canonicalized so that key order does not matter.
+    """
+    payload = request.get_json(silent=True)
+    body = json.dumps(payload, sort_keys=True) if payload is not None else request.get_data(as_text=True)
+    return hashlib.sha256(f"{request.method}\n{request.path}\n{body}".encode()).hexdigest()
+
+
+def _redact(value, fields):
+    if isinstance(value, dict):
+        return {key: _redact(item, fields) for key, item in value.items() if key not in fields}
+    if isinstance(value, list):
+        return [_redact(item, fields) for item in value]
+    return value
+
+
+def stored_response_body(response, redact=()):
+    """Returns the body of a response as saved for replays, without the redacted fields."""
+    body = response.get_data(as_text=True)
+    if not redact:
+        return body
+    try:
+        return json.dumps(_redact(json.loads(body), frozenset(redact)))
+    except ValueError:
+        return body
+
+
+def _replay(record):
+    response = Response(record.response_body, status=record.response_status, mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+# ***************************************************************
+# Claim an Idempotency Key
+# ***************************************************************
+def _claim(lookup_key, fingerprint):
+    """
+    Inserts the in-progress row for a key; the unique lookup_key makes the
+    insert a lock shared by all workers. A concurrent duplicate waits for the
+    first request to finish and then replays its response.
+
+    Returns:
+        Tuple[Optional[int], Optional[Response]]: The claimed row id, or the
+        response to return instead of running the view.
+    """
+    from ..models import db, IdempotencyKey
+
+    config = current_app.config
+    ttl = timedelta(hours=config.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+    lock_timeout = timedelta(seconds=config.get('IDEMPOTENCY_LOCK_TIMEOUT', 30))
+    deadline = time.monotonic() + config.get('IDEMPOTENCY_WAIT_SECONDS', 5)
+
+    while True:
+        now = datetime.utcnow()
+        record = IdempotencyKey(
+            lookup_key=lookup_key,
+            request_fingerprint=fingerprint,
+            status='in_progress',
+            created_at=now,
+            expires_at=now + ttl
+        )
+        try:
+            db.session.add(record)
+            db.session.commit()
+            return record.id, None
+        except IntegrityError:
+            db.session.rollback()
+
+        existing = IdempotencyKey.query.filter_by(lookup_key=lookup_key).first()
+        if existing is None:
+            # Released between our insert and this read; try again
+            continue
+
+        expired = existing.expires_at < now
+        abandoned = existing.status == 'in_progress' and existing.created_at < now - lock_timeout
+        if expired or abandoned:
+            IdempotencyKey.query.filter_by(id=existing.id).delete(synchronize_session=False)
+            db.session.commit()
+            continue
+
+        if existing.request_fingerprint != fingerprint:
+            return None, (jsonify({"error": "Idempotency-Key was already used with a different request."}), 422)
+
+        if existing.status == 'completed':
+            return None, _replay(existing)
+
+        if time.monotonic() >= deadline:
+            return None, (jsonify({"error": "A request with this Idempotency-Key is still being processed."}), 409)
+        db.session.rollback()
+        time.sleep(_POLL_INTERVAL)
+
+
+def _complete(record_id, response, redact=()):
+    from ..models import db, IdempotencyKey
+
+    try:
+        IdempotencyKey.query.filter_by(id=record_id).update({
+            'status': 'completed',
+            'response_status': response.status_code,
+            'response_body': stored_response_body(response, redact)
+        }, synchronize_session=False)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Could not store idempotent response: {e}")
+
+
+def _release(record_id):
+    # Lets a retry run the request again after a failure
+    from ..models import db, IdempotencyKey
+
+    try:
+        db.session.rollback()
+        IdempotencyKey.query.filter_by(id=record_id).delete(synchronize_session=False)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Could not release idempotency key: {e}")
+
+
+# ***************************************************************
+# Idempotent Endpoint Decorator
+# ***************************************************************
+def idempotent(endpoint, redact=()):
+    """
+    Makes a POST endpoint safe to retry with an Idempotency-Key header.
+
+    The first request with a key runs normally and its response (unless it
+    is a 5xx or an exception) is stored for IDEMPOTENCY_KEY_TTL_HOURS.
+    Retries with the same key and body replay that response without
+    running the view; the same key with a different body is rejected with
+    422. Keys are scoped to the logged in user; anonymous requests with the
+    header are rejected with 401. Requests without the header are not
+    affected.
+
+    Args:
+        endpoint (str): Name that scopes keys to this endpoint, e.g. 'orders.create'.
+        redact (Iterable[str], optional): Response fields, at any depth, that are
+            never stored; a replay returns the response without them.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return view(*args, **kwargs)
+            if len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+                return jsonify({"error": f"{IDEMPOTENCY_HEADER} must be at most {MAX_IDEMPOTENCY_KEY_LENGTH} characters."}), 400
+            if not current_user.is_authenticated:
+                return jsonify({"error": f"{IDEMPOTENCY_HEADER} requires an authenticated user."}), 401
+
+            record_id, early_response = _claim(f"{current_user.id}|{endpoint}|{key}", request_fingerprint())
+            if early_response is not None:
+                return early_response
+
+            try:
+                response = make_response(view(*args, **kwargs))
+            except Exception:
+                _release(record_id)
+                raise
+
+            if response.status_code >= 500:
+                _release(record_id)
+            else:
+                _complete(record_id, response, redact)
+            return response
+        return wrapper
+    return decorator
+
+
+def purge_expired_idempotency_keys():
+    """
+    Deletes expired idempotency keys.
+
+    Returns:
+        int: The number of deleted rows.
+    """
+    from ..models import db, IdempotencyKey
+
+    deleted = IdempotencyKey.query.filter(IdempotencyKey.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
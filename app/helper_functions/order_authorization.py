@@ -20,13 +20,14 @@ def is_authorized_to_access_order(user, order_id):
     """
 
     # Import necessary models locally to avoid circular import issues
-    from ..models import Order, OrderItem, MenuItem, db
+    from ..models import Order, OrderItem, MenuItem, Restaurant, db
 
-    # Query the database to fetch the order and its associated menu item
-    # This is done by joining the Order, OrderItem, and MenuItem tables
-    order = (db.session.query(Order, MenuItem)
+    # Query the database to fetch the order and the owner of its restaurant
+    # This is done by joining the Order, OrderItem, MenuItem and Restaurant tables
+    order = (db.session.query(Order, Restaurant.owner_id)
              .join(OrderItem, Order.id == OrderItem.order_id)
              .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
+             .join(Restaurant, MenuItem.restaurant_id == Restaurant.id)
              .filter(Order.id == order_id)
              .first())
 
@@ -34,14 +35,77 @@ def is_authorized_to_access_order(user, order_id):
     if not order:
         return None, False
 
-    # Extract the order and menu item instances from the query result
-    order_instance, menu_item_instance = order
+    # Extract the order instance and restaurant owner from the query result
+    order_instance, restaurant_owner_id = order
 
     # Check if the user is either the one who placed the order or the owner of the restaurant
     # If so, return the order instance and True (indicating authorization)
-    if user.id == order_instance.user_id or user.id == menu_item_instance.restaurant_id:
+    if user.id == order_instance.user_id or user.id == restaurant_owner_id:
         return order_instance, True
 
     # If the user is not authorized, return None and False
     return None, False
 
+
+
+def owns_restaurant_of_delivery(user, delivery_id):
+    """
+    Check if the user owns the restaurant that is fulfilling a delivery, i.e.
+    the restaurant of one of the items of the delivery's order.
+
+    Args:
+        user (User): The user object to check.
+        delivery_id (int): The ID of the delivery.
+
+    Returns:
+        bool: True if the user owns the restaurant.
+    """
+    from ..models import Order, OrderItem, MenuItem, Restaurant, db
+
+    match = (db.session.query(Order.id)
+             .join(OrderItem, Order.id == OrderItem.order_id)
+             .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
+             .join(Restaurant, MenuItem.restaurant_id == Restaurant.id)
+             .filter(Order.delivery_id == delivery_id, Restaurant.owner_id == user.id)
+             .first())
+    return match is not None
+
+
+def authorize_orders(user, order_ids):
+    """
+    Set-wise version of is_authorized_to_access_order for many orders.
+
+    A single query loads every requested order with a flag telling whether the
+    user placed it or owns the restaurant of one of its items.
+
+    Args:
+        user (User): The user object to check.
+        order_ids (Iterable[int]): The IDs of the orders.
+
+    Returns:
+        dict: Mapping of order id -> row with id, user_id, status, delivery_id and
+        is_authorized, for every order that exists.
+
+    Example:
+    >>> authorize_orders(user_obj, [5, 6])[5].is_authorized
+    True
+    """
+
+    # Import necessary models locally to avoid circular import issues
+    from sqlalchemy import case, func, or_
+    from ..models import Order, OrderItem, MenuItem, Restaurant, db
+
+    is_authorized = func.max(case(
+        (or_(Order.user_id == user.id, Restaurant.owner_id == user.id), 1),
+        else_=0
+    ))
+    rows = (db.session.query(Order.id, Order.user_id, Order.status, Order.delivery_id,
+                             is_authorized.label('is_authorized'))
+            .outerjoin(OrderItem, Order.id == OrderItem.order_id)
+            .outerjoin(MenuItem, OrderItem.menu_item_id == MenuItem.id)
+            .outerjoin(Restaurant, MenuItem.restaurant_id == Restaurant.id)
+            .filter(Order.id.in_(list(order_ids)))
+            .group_by(Order.id, Order.user_id, Order.status, Order.delivery_id)
+            .all())
+
+    return {row.id: row for row in rows}
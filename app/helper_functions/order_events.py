@@ -0,0 +1,187 @@
+import json
+import time
+import queue
+import logging
+import itertools
+import threading
+from flask import current_app
+
+try:
+    import redis
+except ImportError:  # Redis is optional; the in-memory broker is used without it
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per subscriber before new ones are dropped for that subscriber
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def user_channel(user_id):
+    """Returns the channel that carries a user's order and delivery events."""
+    return f"user:{user_id}"
+
+
+# ***************************************************************
+# Event Brokers
+# ***************************************************************
+class InMemorySubscription:
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def get(self, timeout=None):
+        """Returns the next event, or None when none arrived within timeout seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker._unsubscribe(self)
+
+
+class InMemoryEventBroker:
+    """
+    Process-local pub/sub. Only reaches clients connected to the same worker,
+    so use the Redis broker when running several workers.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = InMemorySubscription(self, channel)
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                logger.warning(f"Dropping event for a slow subscriber on {channel}")
+
+
+class RedisSubscription:
+    def __init__(self, client, channel):
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(channel)
+
+    def get(self, timeout=None):
+        message = self.pubsub.get_message(timeout=timeout)
+        return json.loads(message['data']) if message else None
+
+    def close(self):
+        self.pubsub.close()
+
+
+class RedisEventBroker:
+    """Pub/sub through Redis, shared by workers on every host."""
+
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(url)
+
+    def subscribe(self, channel):
+        return RedisSubscription(self.client, channel)
+
+    def publish(self, channel, event):
+        self.client.publish(channel, json.dumps(event))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_event_broker():
+    """
+    Returns the process-wide broker selected by EVENT_BROKER ('memory' or 'redis').
+    """
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            if current_app.config.get('EVENT_BROKER', 'memory') == 'redis':
+                if redis is None:
+                    raise RuntimeError("EVENT_BROKER is 'redis' but the redis package is not installed")
+                _broker = RedisEventBroker(current_app.config['REDIS_URL'])
+            else:
+                _broker = InMemoryEventBroker()
+        return _broker
+
+
+# ***************************************************************
+# Publish Status Transitions
+# ***************************************************************
+_event_ids = itertools.count(1)
+
+
+def _publish(channel, event):
+    event['id'] = next(_event_ids)
+    event['at'] = time.time()
+    try:
+        get_event_broker().publish(channel, event)
+    except Exception as e:
+        # Clients resync on reconnect; a lost event must not fail the write
+        logger.error(f"Could not publish {event['type']} event: {e}")
+
+
+def publish_order_status(order, previous_status=None, status=None):
+    """
+    Publishes a committed order status change to the order's owner.
+
+    order may be an Order or any row with id, user_id and delivery_id;
+    status defaults to order.status.
+    """
+    _publish(user_channel(order.user_id), {
+        "type": "order.status",
+        "order_id": order.id,
+        "status": status or order.status,
+        "previous_status": previous_status,
+        "delivery_id": order.delivery_id,
+    })
+
+
+def publish_delivery_status(delivery, previous_status=None):
+    """Publishes a committed delivery status change to the delivery's user."""
+    _publish(user_channel(delivery.user_id), {
+        "type": "delivery.status",
+        "delivery_id": delivery.id,
+        "status": delivery.status,
+        "previous_status": previous_status,
+        "tracking_number": delivery.tracking_number,
+        "estimated_delivery": delivery.estimated_delivery.isoformat() if delivery.estimated_delivery else None,
+    })
+
+
+# ***************************************************************
+# Server-Sent Events Stream
+# ***************************************************************
+def stream_user_events(user_id, heartbeat_seconds=15):
+    """
+    Yields a user's events formatted as Server-Sent Events, with a comment
+    line every heartbeat_seconds so proxies keep the connection open.
+    """
+    subscription = get_event_broker().subscribe(user_channel(user_id))
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            event = subscription.get(timeout=heartbeat_seconds)
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        subscription.close()
@@ -2,10 +2,11 @@ from flask import current_app, jsonify, request
 from flask_login import  current_user
 from icecream import ic
 from datetime import datetime
-import requests
 from .normalize_data import normalize_data
 
-import os
+import uuid
+import base64
+import binascii
 import datetime
 
 # ++++++++++++++++++++++++++++
@@ -21,8 +22,6 @@ def create_new_order(data, total_price):
         delivery_id=delivery_id,
         payment_id=payment_id,
         status='Pending',
-        created_at=datetime.datetime.now(datetime.timezone.utc),
-        updated_at=datetime.datetime.now(datetime.timezone.utc),
         is_deleted=False
     )
     current_app.logger.info(f"Creating order with data: User ID: {current_user.id}, Total Price: {total_price}, Delivery ID: {delivery_id}, Payment ID: {payment_id}")
@@ -48,50 +47,172 @@ def create_order_items(shopping_cart, new_order):
 
 
 
-# Define a function to create a new delivery record
-def create_new_delivery(current_user, past_delivery):
-    BASE_URL = get_api_base_url()
-    DELIVERY_API_URL = f"{BASE_URL}/api/delivery"
-
-    delivery_data = {
-        "user_id": current_user.id,
-        "street_address": past_delivery.street_address,
-        "city": past_delivery.city,
-        "state": past_delivery.state,
-        "postal_code": past_delivery.postal_code,
-        "country": past_delivery.country,
-        "cost": past_delivery.cost,
-        "status": 'Pending',
-    }
+# ++++++++++++++++++++++++++++
+# Helper Function to Copy a Delivery for a New Order
+def create_new_delivery(user_id, past_delivery):
+    """
+    Builds a pending copy of a past delivery with a fresh tracking number.
+    The row is added to the session but not flushed or committed.
+    """
+    from ..models import db, Delivery
 
-    response = requests.post(DELIVERY_API_URL, json=delivery_data)
-    response.raise_for_status()
-    return response.json()
+    new_delivery = Delivery(
+        user_id=user_id,
+        street_address=past_delivery.street_address,
+        city=past_delivery.city,
+        state=past_delivery.state,
+        postal_code=past_delivery.postal_code,
+        country=past_delivery.country,
+        cost=past_delivery.cost,
+        status='Pending',
+        tracking_number=str(uuid.uuid4())
+    )
+    db.session.add(new_delivery)
+    return new_delivery
 
-# Define a function to create a new payment record
+# ++++++++++++++++++++++++++++
+# Helper Function to Copy a Payment for a New Order
 def create_new_payment(past_payment):
-    BASE_URL = get_api_base_url()
-    PAYMENT_API_URL = f"{BASE_URL}/api/payments"
-
-    payment_data = {
-        "gateway": past_payment.gateway,
-        "amount": past_payment.amount,
-        "status": 'Pending',
-    }
+    """
+    Builds a pending copy of a past payment. Card details are only copied
+    for credit card payments. The row is added to the session but not
+    flushed or committed.
+    """
+    from ..models import db, Payment
 
+    new_payment = Payment(
+        gateway=past_payment.gateway,
+        amount=past_payment.amount,
+        status='Pending'
+    )
     if past_payment.gateway == 'Credit Card':
-        payment_data.update({
-            "cardholder_name": past_payment.cardholder_name,
-            "card_number": past_payment.card_number,
-            "card_expiry_month": past_payment.card_expiry_month,
-            "card_expiry_year": past_payment.card_expiry_year,
-            "card_cvc": past_payment.card_cvc,
-            "postal_code": past_payment.postal_code,
-        })
-
-    response = requests.post(PAYMENT_API_URL, json=payment_data)
-    response.raise_for_status()
-    return response.json()
+        new_payment.cardholder_name = past_payment.cardholder_name
+        new_payment.card_number = past_payment.card_number
+        new_payment.card_expiry_month = past_payment.card_expiry_month
+        new_payment.card_expiry_year = past_payment.card_expiry_year
+        new_payment.card_cvc = past_payment.card_cvc
+        new_payment.postal_code = past_payment.postal_code
+    db.session.add(new_payment)
+    return new_payment
+
+# ***************************************************************
+# Reorder a Past Order
+# ***************************************************************
+def reorder_order(order_id, user_id):
+    """
+    Clones a past order with its items, delivery and payment into a new
+    pending order, entirely in-process.
+
+    The past order and its children are loaded with eager loads, and the new
+    rows are written in a single flush (items go out as one executemany).
+    Nothing is committed, so the caller owns the transaction and a failure
+    anywhere leaves no partial order behind.
+
+    Args:
+        order_id (int): The ID of the past order.
+        user_id (int): The ID of the user placing the reorder.
+
+    Raises:
+        ValueError: If the order does not exist.
+        PermissionError: If the order belongs to another user.
+
+    Returns:
+        Order: The new, flushed order.
+    """
+    from sqlalchemy.orm import joinedload, selectinload
+    from ..models import db, Order, OrderItem
+
+    past_order = (
+        Order.query
+        .options(
+            joinedload(Order.delivery),
+            joinedload(Order.payment),
+            selectinload(Order.items)
+        )
+        .filter(Order.id == order_id)
+        .first()
+    )
+    if not past_order:
+        raise ValueError("Order not found.")
+    if past_order.user_id != user_id:
+        raise PermissionError("You don't have permission to reorder this order.")
+
+    new_order = Order(
+        user_id=user_id,
+        total_price=past_order.total_price,
+        status='Pending',
+        is_deleted=False,
+        delivery=create_new_delivery(user_id, past_order.delivery) if past_order.delivery else None,
+        payment=create_new_payment(past_order.payment) if past_order.payment else None,
+        items=[
+            OrderItem(menu_item_id=item.menu_item_id, quantity=item.quantity)
+            for item in past_order.items
+        ]
+    )
+    db.session.add(new_order)
+    db.session.flush()
+    return new_order
+
+# ***************************************************************
+# Place an Order From the Shopping Cart
+# ***************************************************************
+def place_order_from_cart(data, user_id):
+    """
+    Turns the user's shopping cart into a pending order with a fixed number
+    of statements, whatever the cart size:
+
+    1. SELECT ... FOR UPDATE on the cart row, so a concurrent submit of the
+       same cart (or a cart write taking the same lock) waits for this one
+       and then finds the cart empty;
+    2. SUM(quantity * price) over the cart joined to menu_items;
+    3. INSERT of the order;
+    4. INSERT INTO order_items ... SELECT from the cart;
+    5. DELETE of the cart items.
+
+    Nothing is committed, so the caller owns the transaction.
+
+    Args:
+        data (dict): The request payload (delivery_id, payment_id).
+        user_id (int): The ID of the user checking out.
+
+    Raises:
+        ValueError: If the cart is missing or empty.
+
+    Returns:
+        Order: The new, flushed order.
+    """
+    from sqlalchemy import func, insert, literal, select
+    from ..models import db, ShoppingCart, ShoppingCartItem, MenuItem, OrderItem
+
+    cart = ShoppingCart.query.filter_by(user_id=user_id).with_for_update().first()
+    if not cart:
+        raise ValueError("Shopping cart is empty")
+
+    cart_lines = (
+        select(ShoppingCartItem.menu_item_id, ShoppingCartItem.quantity, MenuItem.price)
+        .join(MenuItem, MenuItem.id == ShoppingCartItem.menu_item_id)
+        .where(ShoppingCartItem.shopping_cart_id == cart.id)
+        .subquery()
+    )
+    item_count, total_price = db.session.execute(
+        select(func.count(), func.coalesce(func.sum(cart_lines.c.quantity * cart_lines.c.price), 0))
+    ).one()
+    if not item_count:
+        raise ValueError("Shopping cart is empty")
+
+    new_order = create_new_order(data, round(float(total_price), 2))
+    db.session.flush()
+
+    db.session.execute(
+        insert(OrderItem).from_select(
+            ['order_id', 'menu_item_id', 'quantity'],
+            select(literal(new_order.id), cart_lines.c.menu_item_id, cart_lines.c.quantity)
+        )
+    )
+    ShoppingCartItem.query.filter(ShoppingCartItem.shopping_cart_id == cart.id).delete(synchronize_session=False)
+
+    current_app.logger.info(f"Order {new_order.id} placed from cart {cart.id} with {item_count} items")
+    return new_order
 
 # Define a function to fetch additional details
 def fetch_additional_details(new_order):
@@ -103,9 +224,79 @@ def fetch_additional_details(new_order):
     normalized_menu_items = normalize_data([item.to_dict() for item in menu_items], 'id')
     return normalized_order_items, normalized_menu_items
 
-# Define a function to get the API base URL based on the environment
-def get_api_base_url():
-    if os.environ.get("FLASK_ENV") == "production":
-        return os.environ.get("PRODUCTION_API_BASE_URL")
-    else:
-        return os.environ.get("DEVELOPMENT_API_BASE_URL")
+# ***************************************************************
+# Keyset Pagination of a User's Orders
+# ***************************************************************
+DEFAULT_ORDERS_PAGE_SIZE = 50
+MAX_ORDERS_PAGE_SIZE = 100
+
+
+def encode_order_cursor(order):
+    """Returns an opaque cursor pointing just past the given order."""
+    raw = f"{order.created_at.isoformat()}|{order.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_order_cursor(cursor):
+    """
+    Raises:
+        ValueError: If the cursor was not produced by encode_order_cursor.
+
+    Returns:
+        Tuple[datetime, int]: The (created_at, id) the next page starts after.
+    """
+    try:
+        created_at, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.datetime.fromisoformat(created_at), int(order_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor.")
+
+
+def fetch_user_orders_page(user_id, limit=DEFAULT_ORDERS_PAGE_SIZE, cursor=None,
+                           status=None, start_date=None, end_date=None):
+    """
+    Returns one page of a user's orders, newest first.
+
+    Pages are addressed by (created_at, id) instead of an offset, so the query
+    walks ix_orders_user_id_created_at_id from the cursor and its cost does
+    not depend on how many orders the user has. Delivery and payment are
+    loaded in the same query.
+
+    Args:
+        user_id (int): The owner of the orders.
+        limit (int): Page size.
+        cursor (str, optional): next_cursor of the previous page.
+        status (str, optional): Only orders with this status.
+        start_date (datetime, optional): Only orders created at or after this time.
+        end_date (datetime, optional): Only orders created before this time.
+
+    Returns:
+        Tuple[List[Order], Optional[str]]: The orders and the cursor of the
+        next page (None on the last page).
+    """
+    from sqlalchemy import tuple_
+    from sqlalchemy.orm import joinedload
+    from ..models import Order
+
+    query = Order.query.filter(Order.user_id == user_id)
+    if status:
+        query = query.filter(Order.status == status)
+    if start_date:
+        query = query.filter(Order.created_at >= start_date)
+    if end_date:
+        query = query.filter(Order.created_at < end_date)
+    if cursor:
+        query = query.filter(tuple_(Order.created_at, Order.id) < decode_order_cursor(cursor))
+
+    orders = (
+        query
+        .options(joinedload(Order.delivery), joinedload(Order.payment))
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    if len(orders) > limit:
+        orders = orders[:limit]
+        return orders, encode_order_cursor(orders[-1])
+    return orders, None
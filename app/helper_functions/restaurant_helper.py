@@ -1,51 +1,164 @@
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from flask import current_app
 from sqlalchemy.orm import joinedload
 from collections import defaultdict
 from .normalize_data import normalize_data
+from .http_client import request_deadline
 from .google_map_related_helper_function import fetch_google_places_data
 from .uber_eats_related_helper_function import fetch_ubereats_data
 from .database_related_helper_function import fetch_local_db_data
 
 logger = logging.getLogger(__name__)
 
-def aggregate_restaurant_data(latitude, longitude, city_name=None, state_name=None, country_name=None):
+# Shared pool for the per-source fetches of aggregate_restaurant_data
+_source_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='restaurant-source')
+
+# Per-source timeouts in seconds
+DEFAULT_SOURCE_TIMEOUT = 3.0
+DEFAULT_SOURCE_TIMEOUTS = {
+    "Local Database": 2.0,
+    "UberEats": 3.0,
+    "Google Places": 3.0,
+}
+
+# Coordinates are compared at ~10 m precision when matching by name + location
+DEDUP_COORDINATE_DECIMALS = 4
+
+def aggregate_restaurant_data(latitude, longitude, city_name=None, state_name=None, country_name=None,
+                              radius_km=None, limit=None, timeouts=None):
     """
     Aggregate restaurant data from various sources based on latitude, longitude, and city name.
 
+    The sources are queried concurrently, each with its own timeout, so the
+    call costs roughly the latency of the slowest source that answers in time
+    instead of the sum of all of them. The timeout also bounds the source's
+    HTTP requests (see request_deadline), so a slow source stops instead of
+    holding a worker thread. A source that fails or times out is reported in
+    the metadata and the results of the others are still returned.
+
     Args:
         latitude (float): Latitude coordinate.
         longitude (float): Longitude coordinate.
         city_name (str, optional): Name of the city. Defaults to None.
         state_name (str, optional): Name of the state. Defaults to None.
         country_name (str, optional): Name of the country. Defaults to None.
+        radius_km (float, optional): Search radius of the local database (default DEFAULT_RADIUS_KM).
+        limit (int, optional): Maximum number of restaurants to return.
+        timeouts (dict, optional): Per-source timeouts in seconds, keyed by source name.
 
     Returns:
-        list: A list of aggregated restaurant data.
+        dict: {"restaurants": [...deduplicated results...],
+               "metadata": {"sources": {name: {"status", "count", "elapsed_ms"}}}}
     """
+    from .database_related_helper_function import aggregate_restaurant_data_by_coordinates, DEFAULT_RADIUS_KM
+
+    app = current_app._get_current_object()
+    client_id = current_app.config.get('UBER_CLIENT_ID')
+    client_secret = current_app.config.get('UBER_CLIENT_SECRET')
+    timeouts = {**DEFAULT_SOURCE_TIMEOUTS, **(timeouts or {})}
+
+    def fetch_local():
+        if latitude is not None and longitude is not None:
+            return aggregate_restaurant_data_by_coordinates(latitude, longitude, radius_km=radius_km or DEFAULT_RADIUS_KM, limit=limit)
+        return fetch_local_db_data(city_name, state_name, country_name)
+
+    # Define data sources and their fetching functions, in deduplication priority order
+    data_sources = [{"name": "Local Database", "function": fetch_local}]
+    if client_id and client_secret and latitude is not None and longitude is not None:
+        data_sources.append({"name": "UberEats", "function": lambda: fetch_ubereats_data(latitude, longitude, client_id, client_secret)})
+    if current_app.config.get('MAPS_API_KEY') and latitude is not None and longitude is not None:
+        data_sources.append({"name": "Google Places", "function": lambda: fetch_google_places_data(latitude, longitude)})
+
+    def run_source(source):
+        # Each worker thread needs its own app context (config, db session)
+        started = time.perf_counter()
+        with app.app_context(), request_deadline(timeouts.get(source["name"], DEFAULT_SOURCE_TIMEOUT)):
+            results = source["function"]()
+        return results, time.perf_counter() - started
 
-    client_id = current_app.config['UBER_CLIENT_ID']
-    client_secret = current_app.config['UBER_CLIENT_SECRET']
-
-    # Define data sources and their fetching functions
-    data_sources = [
-        # {"name": "UberEats", "function": lambda: fetch_ubereats_data(latitude, longitude, client_id, client_secret)},
-        # {"name": "Google Places", "function": lambda: fetch_google_places_data(latitude, longitude)},
-        {"name": "Local Database", "function": lambda: fetch_local_db_data(city_name, state_name, country_name)} #if city_name and state_name and country_name else []}
-    ]
-
-    aggregated_results = []
+    started = time.perf_counter()
+    futures = [(source, _source_executor.submit(run_source, source)) for source in data_sources]
 
-    # Fetch data from each source
-    for source in data_sources:
+    metadata = {}
+    results_by_source = []
+    for source, future in futures:
+        name = source["name"]
+        deadline = started + timeouts.get(name, DEFAULT_SOURCE_TIMEOUT)
         try:
-            results = source["function"]()
-            logger.info(f"Data from {source['name']}: {results}")
-            aggregated_results.extend(results)
+            results, elapsed = future.result(timeout=max(0, deadline - time.perf_counter()))
+            results = [r for r in (results or []) if "error" not in r]
+            results_by_source.append(results)
+            metadata[name] = {"status": "ok", "count": len(results), "elapsed_ms": round(elapsed * 1000, 1)}
+        except FutureTimeoutError:
+            # Only drops a fetch still queued; a running one stops at its request deadline
+            future.cancel()
+            logger.warning(f"Timed out fetching data from {name}")
+            metadata[name] = {"status": "timeout", "count": 0, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
         except Exception as e:
-            logger.error(f"Error fetching data from {source['name']}: {e}")
+            logger.error(f"Error fetching data from {name}: {e}")
+            metadata[name] = {"status": "error", "count": 0, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    restaurants = deduplicate_restaurants(results_by_source)
+    return {
+        "restaurants": restaurants[:limit] if limit else restaurants,
+        "metadata": {
+            "sources": metadata,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+    }
+
+
+def _restaurant_dedup_keys(restaurant):
+    # Identity keys of a restaurant record, strongest first
+    keys = []
+    if restaurant.get('google_place_id'):
+        keys.append(('google_place_id', restaurant['google_place_id']))
+    store_id = restaurant.get('ubereats_store_id') or restaurant.get('store_id')
+    if store_id:
+        keys.append(('ubereats_store_id', store_id))
+    if restaurant.get('name') and restaurant.get('latitude') is not None and restaurant.get('longitude') is not None:
+        keys.append((
+            'name_location',
+            " ".join(restaurant['name'].lower().split()),
+            round(float(restaurant['latitude']), DEDUP_COORDINATE_DECIMALS),
+            round(float(restaurant['longitude']), DEDUP_COORDINATE_DECIMALS)
+        ))
+    return keys
+
+
+def deduplicate_restaurants(results_by_source):
+    """
+    Merges restaurant lists from several sources, dropping duplicates.
 
-    return aggregated_results
+    Two records are the same restaurant when they share a google_place_id, an
+    UberEats store id, or the same normalized name at the same rounded
+    coordinates. The record from the earlier source wins; fields it is missing
+    are filled in from the duplicates.
+
+    Args:
+        results_by_source (List[List[dict]]): Results per source, in priority order.
+
+    Returns:
+        List[dict]: The merged restaurants.
+    """
+    merged = []
+    index_by_key = {}
+    for results in results_by_source:
+        for restaurant in results:
+            keys = _restaurant_dedup_keys(restaurant)
+            existing = next((index_by_key[key] for key in keys if key in index_by_key), None)
+            if existing is None:
+                existing = len(merged)
+                merged.append(dict(restaurant))
+            else:
+                for field, value in restaurant.items():
+                    if merged[existing].get(field) is None and value is not None:
+                        merged[existing][field] = value
+            for key in keys:
+                index_by_key.setdefault(key, existing)
+    return merged
 
 # def fetch_menu_items_for_restaurant(restaurant_id):
 #     """
@@ -0,0 +1,227 @@
+import logging
+import threading
+import itertools
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
+from flask import current_app
+from sqlalchemy import update, delete, insert, select, func
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+# Coordinates are rounded to 3 decimals (~110 m) before lookup, which is well
+# below the size of a postal code / city and lets nearby places share entries.
+REVERSE_GEOCODE_DECIMALS = 3
+
+# Shared pool used to resolve cache misses in parallel
+_geocode_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='reverse-geocode')
+# Separate pool for deferred enrichment jobs, which themselves wait on _geocode_executor
+_enrichment_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='reverse-geocode-enrich')
+
+# Per-worker LRU/TTL layer in front of the reverse_geocodes table
+_local_cache = TTLCache(maxsize=4096, ttl=3600)
+_local_cache_lock = threading.Lock()
+
+# Numbers the stores of this worker; every REVERSE_GEOCODE_EVICTION_INTERVAL-th one checks the size bound
+_store_counter = itertools.count()
+
+
+def reverse_geocode_key(lat, lng):
+    """Returns the cache key of a coordinate pair."""
+    return f"{round(float(lat), REVERSE_GEOCODE_DECIMALS):.{REVERSE_GEOCODE_DECIMALS}f},{round(float(lng), REVERSE_GEOCODE_DECIMALS):.{REVERSE_GEOCODE_DECIMALS}f}"
+
+
+def _ttl():
+    return timedelta(days=current_app.config.get('REVERSE_GEOCODE_TTL_DAYS', 30))
+
+
+# ***************************************************************
+# Read Cached Address Components
+# ***************************************************************
+def get_cached_address_components(keys):
+    """
+    Looks up address components for the given cache keys.
+
+    The in-process LRU is checked first, then the shared reverse_geocodes table
+    (one IN query for all remaining keys). Expired rows count as misses.
+
+    Args:
+        keys (Iterable[str]): Keys produced by reverse_geocode_key.
+
+    Returns:
+        dict: Mapping of key -> address components for every key that was found.
+    """
+    from ..models import ReverseGeocode
+
+    found = {}
+    with _local_cache_lock:
+        for key in keys:
+            if key in _local_cache:
+                found[key] = _local_cache[key]
+
+    remaining = [key for key in set(keys) if key not in found]
+    if not remaining:
+        return found
+
+    now = datetime.utcnow()
+    rows = ReverseGeocode.query.filter(
+        ReverseGeocode.cache_key.in_(remaining),
+        ReverseGeocode.created_at >= now - _ttl()
+    ).all()
+
+    touch_before = now - timedelta(hours=1)
+    stale_ids = []
+    for row in rows:
+        found[row.cache_key] = row.to_dict()
+        # Refresh the LRU timestamp at most once an hour to keep reads cheap
+        if row.last_used_at is None or row.last_used_at < touch_before:
+            stale_ids.append(row.id)
+
+    with _local_cache_lock:
+        for row in rows:
+            _local_cache[row.cache_key] = found[row.cache_key]
+
+    if stale_ids:
+        # Written on its own connection, off the request thread, so that a read
+        # never commits or rolls back the caller's session nor waits on its locks
+        from ..models import db
+        _enrichment_executor.submit(_touch_reverse_geocodes, db.engine, stale_ids, now)
+
+    return found
+
+
+def _touch_reverse_geocodes(engine, row_ids, now):
+    from ..models import ReverseGeocode
+
+    table = ReverseGeocode.__table__
+    try:
+        with engine.begin() as connection:
+            connection.execute(update(table).where(table.c.id.in_(row_ids)).values(last_used_at=now))
+    except SQLAlchemyError as e:
+        logger.warning(f"Could not refresh reverse geocode usage: {e}")
+
+
+# ***************************************************************
+# Store Address Components
+# ***************************************************************
+def store_address_components(components_by_key):
+    """
+    Saves resolved address components in both cache layers. Every
+    REVERSE_GEOCODE_EVICTION_INTERVAL-th store also evicts the least recently
+    used rows beyond REVERSE_GEOCODE_MAX_ENTRIES.
+
+    The rows are written on their own connection, off the request thread,
+    so the caller's session is never committed or rolled back.
+
+    Args:
+        components_by_key (dict): Mapping of key -> address components.
+
+    Returns:
+        Future: The pending write, or None when there was nothing to store.
+    """
+    from ..models import db
+
+    if not components_by_key:
+        return None
+
+    with _local_cache_lock:
+        _local_cache.update(components_by_key)
+
+    config = current_app.config
+    max_entries = None
+    if next(_store_counter) % config.get('REVERSE_GEOCODE_EVICTION_INTERVAL', 100) == 0:
+        max_entries = config.get('REVERSE_GEOCODE_MAX_ENTRIES', 50000)
+    return _enrichment_executor.submit(_write_reverse_geocodes, db.engine, dict(components_by_key), datetime.utcnow(), max_entries)
+
+
+def _write_reverse_geocodes(engine, components_by_key, now, max_entries):
+    from ..models import ReverseGeocode
+
+    table = ReverseGeocode.__table__
+    try:
+        with engine.begin() as connection:
+            # Replace the rows so re-resolved keys get fresh timestamps
+            connection.execute(delete(table).where(table.c.cache_key.in_(list(components_by_key))))
+            connection.execute(insert(table), [
+                {
+                    "cache_key": key,
+                    "city": components.get('city'),
+                    "state": components.get('state'),
+                    "postal_code": components.get('postal_code'),
+                    "country": components.get('country'),
+                    "created_at": now,
+                    "last_used_at": now,
+                }
+                for key, components in components_by_key.items()
+            ])
+
+            if max_entries is not None:
+                overflow = connection.execute(select(func.count()).select_from(table)).scalar() - max_entries
+                if overflow > 0:
+                    stale_ids = select(table.c.id).order_by(table.c.last_used_at.asc()).limit(overflow).scalar_subquery()
+                    connection.execute(delete(table).where(table.c.id.in_(stale_ids)))
+    except SQLAlchemyError as e:
+        # Another worker may have stored the same key concurrently; the cache is best effort
+        logger.warning(f"Could not store reverse geocode results: {e}")
+
+
+# ***************************************************************
+# Resolve Address Components for Many Coordinates
+# ***************************************************************
+def resolve_address_components(coordinates, api_key):
+    """
+    Returns address components for many coordinates with as few Geocoding
+    API calls as possible: cached keys are served from the cache and the
+    misses are resolved in parallel, then written back.
+
+    Args:
+        coordinates (Iterable[Tuple[float, float]]): (lat, lng) pairs.
+        api_key (str): The API key for Google Geocoding.
+
+    Returns:
+        dict: Mapping of reverse_geocode_key(lat, lng) -> address components.
+    """
+    from .google_map_related_helper_function import get_address_components_from_geocoding
+
+    coordinates_by_key = {reverse_geocode_key(lat, lng): (lat, lng) for lat, lng in coordinates}
+    found = get_cached_address_components(list(coordinates_by_key))
+
+    misses = [key for key in coordinates_by_key if key not in found]
+    if misses:
+        futures = {
+            key: _geocode_executor.submit(get_address_components_from_geocoding, *coordinates_by_key[key], api_key)
+            for key in misses
+        }
+        resolved = {}
+        for key, future in futures.items():
+            try:
+                resolved[key] = future.result()
+            except Exception as e:
+                logger.error(f"Reverse geocoding failed for {key}: {e}")
+        # Empty results are not cached so they can be retried later
+        store_address_components({key: components for key, components in resolved.items() if components})
+        found.update(resolved)
+
+    return found
+
+
+# ***************************************************************
+# Resolve Address Components in the Background
+# ***************************************************************
+def enrich_address_components_in_background(coordinates, api_key):
+    """
+    Resolves and caches address components without blocking the request, so
+    that later requests for the same area are served from the cache.
+    """
+    app = current_app._get_current_object()
+    coordinates = list(coordinates)
+
+    def job():
+        with app.app_context():
+            try:
+                resolve_address_components(coordinates, api_key)
+            except Exception as e:
+                logger.error(f"Background reverse geocoding failed: {e}")
+
+    return _enrichment_executor.submit(job)
@@ -0,0 +1,111 @@
+import logging
+from sqlalchemy import func
+
+logger = logging.getLogger(__name__)
+
+# ***************************************************************
+# Apply a Review Change to the Restaurant Aggregates
+# ***************************************************************
+def apply_review_to_aggregates(restaurant_id, stars_delta, count_delta):
+    """
+    Adjusts the denormalized rating_sum/review_count columns of a restaurant.
+
+    The update is issued as a single atomic UPDATE (column = column + delta) so
+    concurrent review writes cannot lose increments. It joins the caller's
+    transaction and is committed together with the review change.
+
+    Args:
+        restaurant_id (int): The ID of the reviewed restaurant.
+        stars_delta (int): Amount to add to rating_sum (negative on removal).
+        count_delta (int): Amount to add to review_count (+1, 0 or -1).
+    """
+    from ..models import db, Restaurant
+
+    if restaurant_id is None or (not stars_delta and not count_delta):
+        return
+
+    db.session.query(Restaurant).filter(Restaurant.id == restaurant_id).update(
+        {
+            Restaurant.rating_sum: Restaurant.rating_sum + (stars_delta or 0),
+            Restaurant.review_count: Restaurant.review_count + (count_delta or 0),
+        },
+        synchronize_session=False
+    )
+
+
+# ***************************************************************
+# Compute Review Aggregates from the Reviews Table
+# ***************************************************************
+def compute_review_aggregates():
+    """
+    Computes the true rating sum and review count of every reviewed restaurant.
+
+    Returns:
+        dict: Mapping of restaurant_id -> (rating_sum, review_count).
+    """
+    from ..models import db, Review
+
+    rows = (
+        db.session.query(
+            Review.restaurant_id,
+            func.coalesce(func.sum(Review.stars), 0),
+            func.count(Review.id)
+        )
+        .group_by(Review.restaurant_id)
+        .all()
+    )
+    return {restaurant_id: (int(stars), int(count)) for restaurant_id, stars, count in rows}
+
+
+# ***************************************************************
+# Backfill Restaurant Review Aggregates
+# ***************************************************************
+def backfill_review_aggregates():
+    """
+    Recomputes rating_sum/review_count for every restaurant from the reviews table.
+
+    Returns:
+        int: Number of restaurants whose aggregates were changed.
+    """
+    from ..models import db, Restaurant
+
+    aggregates = compute_review_aggregates()
+    updated = 0
+    for restaurant in Restaurant.query.all():
+        rating_sum, review_count = aggregates.get(restaurant.id, (0, 0))
+        if restaurant.rating_sum != rating_sum or restaurant.review_count != review_count:
+            restaurant.rating_sum = rating_sum
+            restaurant.review_count = review_count
+            updated += 1
+
+    db.session.commit()
+    logger.info(f"Backfilled review aggregates for {updated} restaurants")
+    return updated
+
+
+# ***************************************************************
+# Find Restaurants with Stale Review Aggregates
+# ***************************************************************
+def find_review_aggregate_mismatches():
+    """
+    Compares the stored aggregates against the reviews table.
+
+    Returns:
+        List[dict]: One entry per restaurant whose stored values are out of date.
+    """
+    from ..models import db, Restaurant
+
+    aggregates = compute_review_aggregates()
+    mismatches = []
+    stored = db.session.query(Restaurant.id, Restaurant.rating_sum, Restaurant.review_count).all()
+    for restaurant_id, rating_sum, review_count in stored:
+        expected_sum, expected_count = aggregates.get(restaurant_id, (0, 0))
+        if rating_sum != expected_sum or review_count != expected_count:
+            mismatches.append({
+                "restaurant_id": restaurant_id,
+                "rating_sum": rating_sum,
+                "review_count": review_count,
+                "expected_rating_sum": expected_sum,
+                "expected_review_count": expected_count,
+            })
+    return mismatches
@@ -0,0 +1,184 @@
+import re
+import logging
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 50
+# Words of a query beyond this are ignored
+MAX_SEARCH_TERMS = 8
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# The FTS5 table migration a9e47c3d15b2 creates on SQLite; the migration keeps
+# its own frozen copy, so change both together
+SQLITE_SEARCH_TABLE_DDL = (
+    "CREATE VIRTUAL TABLE restaurant_search_documents USING fts5("
+    "restaurant_id UNINDEXED, name, food_type, description, menu_text, "
+    "tokenize='porter unicode61', prefix='2 3')"
+)
+
+
+def _prefix():
+    from ..models.db import environment, SCHEMA
+    return f"{SCHEMA}." if environment == "production" else ""
+
+
+def _dialect():
+    from ..models import db
+    return db.session.get_bind().dialect.name
+
+
+def search_terms(query):
+    """Splits a query into lowercase words, dropping punctuation and operators."""
+    return _TERM_RE.findall(query.lower())[:MAX_SEARCH_TERMS]
+
+
+# ***************************************************************
+# Build Search Documents
+# ***************************************************************
+# One document per restaurant: its name, food type and description plus the
+# names and descriptions of its menu items. Postgres keeps it as a weighted
+# tsvector (GIN index), SQLite as a row of an FTS5 table.
+def _postgres_upsert_sql(where):
+    p = _prefix()
+    return f"""
+        INSERT INTO {p}restaurant_search_documents (restaurant_id, document)
+        SELECT r.id,
+               setweight(to_tsvector('english', coalesce(r.name, '')), 'A') ||
+               setweight(to_tsvector('english', coalesce(r.food_type, '')), 'B') ||
+               setweight(to_tsvector('english', coalesce(
+                   (SELECT string_agg(m.name, ' ') FROM {p}menu_items m WHERE m.restaurant_id = r.id), '')), 'B') ||
+               setweight(to_tsvector('english', coalesce(r.description, '')), 'C') ||
+               setweight(to_tsvector('english', coalesce(
+                   (SELECT string_agg(m.description, ' ') FROM {p}menu_items m WHERE m.restaurant_id = r.id), '')), 'D')
+        FROM {p}restaurants r
+        {where}
+        ON CONFLICT (restaurant_id) DO UPDATE SET document = EXCLUDED.document
+    """
+
+
+def _sqlite_insert_sql(where):
+    return f"""
+        INSERT INTO restaurant_search_documents (restaurant_id, name, food_type, description, menu_text)
+        SELECT r.id, coalesce(r.name, ''), coalesce(r.food_type, ''), coalesce(r.description, ''),
+               coalesce((SELECT group_concat(coalesce(m.name, '') || ' ' || coalesce(m.description, ''), ' ')
+                         FROM menu_items m WHERE m.restaurant_id = r.id), '')
+        FROM restaurants r
+        {where}
+    """
+
+
+def _write_documents(restaurant_id=None):
+    from ..models import db
+
+    where = "WHERE r.id = :restaurant_id" if restaurant_id is not None else ""
+    params = {"restaurant_id": restaurant_id}
+    dialect = _dialect()
+
+    if dialect == 'postgresql':
+        if restaurant_id is None:
+            db.session.execute(text(f"DELETE FROM {_prefix()}restaurant_search_documents"))
+        db.session.execute(text(_postgres_upsert_sql(where)), params)
+    elif dialect == 'sqlite':
+        # FTS5 rows cannot be upserted; replace them
+        if restaurant_id is None:
+            db.session.execute(text("DELETE FROM restaurant_search_documents"))
+        else:
+            db.session.execute(text("DELETE FROM restaurant_search_documents WHERE restaurant_id = :restaurant_id"), params)
+        db.session.execute(text(_sqlite_insert_sql(where)), params)
+    else:
+        return False
+    return True
+
+
+def refresh_restaurant_search_document(restaurant_id):
+    """
+    Rebuilds one restaurant's search document after a committed write to the
+    restaurant or one of its menu items. Also removes the document of a
+    deleted restaurant. Errors are logged, never raised, so a failed index
+    update does not fail the write.
+    """
+    from ..models import db
+
+    try:
+        if _write_documents(restaurant_id):
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Could not refresh the search document of restaurant {restaurant_id}: {e}")
+
+
+def rebuild_search_index():
+    """
+    Rebuilds every search document.
+
+    Returns:
+        int: The number of indexed restaurants.
+    """
+    from ..models import db, Restaurant
+
+    if not _write_documents():
+        logger.warning(f"Full-text search is not supported on {_dialect()}; nothing indexed")
+        return 0
+    db.session.commit()
+    return Restaurant.query.count()
+
+
+# ***************************************************************
+# Search
+# ***************************************************************
+def search_restaurant_ids(query, limit=DEFAULT_SEARCH_PAGE_SIZE, offset=0):
+    """
+    Returns the ids of the restaurants matching every word of the query, best
+    match first. Each word also matches as a prefix, so partial input
+    ("pizz", "thai cur") finds results while the user types.
+
+    Args:
+        query (str): The search input.
+        limit (int): Page size.
+        offset (int): Number of results to skip.
+
+    Returns:
+        Tuple[List[int], bool]: The restaurant ids of the page and whether more
+        results follow.
+    """
+    from ..models import db, Restaurant
+
+    terms = search_terms(query)
+    if not terms:
+        return [], False
+
+    params = {"limit": limit + 1, "offset": offset}
+    dialect = _dialect()
+    if dialect == 'postgresql':
+        params["query"] = " & ".join(f"{term}:*" for term in terms)
+        rows = db.session.execute(text(f"""
+            SELECT d.restaurant_id
+            FROM {_prefix()}restaurant_search_documents d,
+                 to_tsquery('english', :query) q
+            WHERE d.document @@ q
+            ORDER BY ts_rank_cd(d.document, q) DESC, d.restaurant_id
+            LIMIT :limit OFFSET :offset
+        """), params)
+    elif dialect == 'sqlite':
+        params["query"] = " ".join(f'"{term}"*' for term in terms)
+        # bm25 weights follow the column order: restaurant_id, name, food_type, description, menu_text
+        rows = db.session.execute(text("""
+            SELECT restaurant_id
+            FROM restaurant_search_documents
+            WHERE restaurant_search_documents MATCH :query
+            ORDER BY bm25(restaurant_search_documents, 0.0, 10.0, 5.0, 2.0, 1.0), restaurant_id
+            LIMIT :limit OFFSET :offset
+        """), params)
+    else:
+        # No full-text index on this database; match names only
+        rows = (db.session.query(Restaurant.id)
+                .filter(*[Restaurant.name.ilike(f"%{term}%") for term in terms])
+                .order_by(Restaurant.name, Restaurant.id)
+                .limit(limit + 1)
+                .offset(offset))
+
+    ids = [row[0] for row in rows]
+    return ids[:limit], len(ids) > limit
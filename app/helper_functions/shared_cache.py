@@ -0,0 +1,352 @@
+import json
+import time
+import uuid
+import logging
+import threading
+from functools import wraps
+from flask import current_app, request, g, make_response, Response
+
+try:
+    import redis
+except ImportError:  # Redis is optional; the local stand-in is used without it
+    redis = None
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+logger = logging.getLogger(__name__)
+
+# How long a loader may hold the rebuild lock of a key, in seconds
+LOCK_TTL_SECONDS = 10
+# Seconds between checks while another worker rebuilds a key
+_POLL_INTERVAL = 0.05
+
+
+# ***************************************************************
+# Local Stand-in for a Redis Server
+# ***************************************************************
+class LocalRedis:
+    """
+    Process-local implementation of the few Redis commands the shared cache
+    uses (get, set with ex/nx, delete, incr). Lets tests and single-worker
+    setups run without a Redis server.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry else None
+
+    def set(self, key, value, ex=None, nx=False):
+        with self._lock:
+            if nx and self._live(key) is not None:
+                return None
+            value = value.encode() if isinstance(value, str) else value
+            self._data[key] = (value, time.time() + ex if ex else None)
+            return True
+
+    def mget(self, keys):
+        with self._lock:
+            entries = [self._live(key) for key in keys]
+            return [entry[0] if entry else None for entry in entries]
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    def incr(self, key):
+        with self._lock:
+            entry = self._live(key)
+            value = int(entry[0]) + 1 if entry else 1
+            self._data[key] = (str(value).encode(), entry[1] if entry else None)
+            return value
+
+
+# ***************************************************************
+# Shared Cache
+# ***************************************************************
+class SharedCache:
+    """
+    JSON cache over a Redis-protocol client, shared by every worker.
+
+    Keys are grouped in namespaces ("<prefix>:<namespace>:v<version>:<key>").
+    Bumping a namespace's version invalidates all its keys at once without
+    scanning them. On a miss only one caller per key runs the loader; the
+    others wait briefly for its result instead of all hitting the database.
+    """
+
+    def __init__(self, client, prefix='starcoeat', default_ttl=300):
+        self.client = client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, namespace, field):
+        with self._stats_lock:
+            stats = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "loads": 0, "waits": 0, "errors": 0})
+            stats[field] += 1
+
+    def _version(self, namespace):
+        version = self.client.get(f"{self.prefix}:{namespace}:version")
+        return int(version) if version else 0
+
+    def _key(self, namespace, key):
+        return f"{self.prefix}:{namespace}:v{self._version(namespace)}:{key}"
+
+    def get(self, namespace, key):
+        """Returns the cached value, or None on a miss."""
+        value = self.client.get(self._key(namespace, key))
+        self._count(namespace, "hits" if value is not None else "misses")
+        return json.loads(value) if value is not None else None
+
+    def set(self, namespace, key, value, ttl=None):
+        self.client.set(self._key(namespace, key), json.dumps(value), ex=ttl or self.default_ttl)
+
+    def delete(self, namespace, key):
+        self.client.delete(self._key(namespace, key))
+
+    def invalidate(self, namespace):
+        """Invalidates every key of a namespace by bumping its version."""
+        self.client.incr(f"{self.prefix}:{namespace}:version")
+
+    def tag_versions(self, tags):
+        """Returns the current version of each tag (0 when never invalidated)."""
+        versions = self.client.mget([f"{self.prefix}:tag:{tag}" for tag in tags])
+        return [int(version) if version else 0 for version in versions]
+
+    def invalidate_tags(self, *tags):
+        """
+        Invalidates every entry stored under any of the tags. Entries embed the
+        tag versions in their key, so bumping a version orphans them.
+        """
+        for tag in tags:
+            self.client.incr(f"{self.prefix}:tag:{tag}")
+
+    def get_or_set(self, namespace, key, loader, ttl=None):
+        """
+        Returns the cached value of a key, computing it with loader() on a miss.
+
+        Cache errors never fail the caller: the loader result is returned
+        uncached and the error is counted.
+        """
+        try:
+            full_key = self._key(namespace, key)
+            value = self.client.get(full_key)
+        except Exception as e:
+            logger.warning(f"Shared cache read failed for {namespace}: {e}")
+            self._count(namespace, "errors")
+            return loader()
+
+        if value is not None:
+            self._count(namespace, "hits")
+            return json.loads(value)
+        self._count(namespace, "misses")
+
+        lock_key = f"{full_key}:lock"
+        token = uuid.uuid4().hex
+        try:
+            have_lock = self.client.set(lock_key, token, ex=LOCK_TTL_SECONDS, nx=True)
+            if not have_lock:
+                # Another worker is loading this key; wait for its result
+                self._count(namespace, "waits")
+                deadline = time.monotonic() + LOCK_TTL_SECONDS
+                while time.monotonic() < deadline:
+                    time.sleep(_POLL_INTERVAL)
+                    value = self.client.get(full_key)
+                    if value is not None:
+                        return json.loads(value)
+                    if self.client.get(lock_key) is None:
+                        break
+        except Exception as e:
+            logger.warning(f"Shared cache lock failed for {namespace}: {e}")
+            self._count(namespace, "errors")
+            return loader()
+
+        try:
+            value = loader()
+            self._count(namespace, "loads")
+            try:
+                self.client.set(full_key, json.dumps(value), ex=ttl or self.default_ttl)
+            except Exception as e:
+                logger.warning(f"Shared cache write failed for {namespace}: {e}")
+                self._count(namespace, "errors")
+        finally:
+            # Also released when the loader raises, so waiters do not sit out the lock TTL
+            if have_lock:
+                self._release_lock(namespace, lock_key, token)
+        return value
+
+    def _release_lock(self, namespace, lock_key, token):
+        try:
+            if self.client.get(lock_key) == token.encode():
+                self.client.delete(lock_key)
+        except Exception as e:
+            logger.warning(f"Shared cache lock release failed for {namespace}: {e}")
+            self._count(namespace, "errors")
+
+    def stats(self):
+        """
+        Returns this worker's hit/miss counters per namespace with the hit rate.
+        """
+        with self._stats_lock:
+            return {
+                namespace: {
+                    **stats,
+                    "hit_rate": round(stats["hits"] / (stats["hits"] + stats["misses"]), 3)
+                    if stats["hits"] + stats["misses"] else None
+                }
+                for namespace, stats in self._stats.items()
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def build_cache_client(config):
+    """
+    Creates the client selected by SHARED_CACHE_BACKEND ('redis', 'fakeredis' or 'local').
+    """
+    backend = config.get('SHARED_CACHE_BACKEND', 'local')
+    if backend == 'redis':
+        if redis is None:
+            raise RuntimeError("SHARED_CACHE_BACKEND is 'redis' but the redis package is not installed")
+        return redis.Redis.from_url(config['REDIS_URL'])
+    if backend == 'fakeredis' and fakeredis is not None:
+        return fakeredis.FakeRedis()
+    return LocalRedis()
+
+
+def get_shared_cache():
+    """
+    Returns the process-wide SharedCache built from the app config.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = SharedCache(
+                build_cache_client(current_app.config),
+                prefix=current_app.config.get('SHARED_CACHE_PREFIX', 'starcoeat'),
+                default_ttl=current_app.config.get('SHARED_CACHE_DEFAULT_TTL', 300)
+            )
+        return _shared_cache
+
+
+# ***************************************************************
+# Response Cache
+# ***************************************************************
+RESPONSE_NAMESPACE = 'responses'
+
+
+def cached_response(tags_for, ttl=None):
+    """
+    Caches the full JSON body of a GET endpoint in the shared cache.
+
+    A hit skips the view entirely (no queries, no serialization). Entries are
+    keyed by the request path and the versions of their tags, and are dropped
+    by SharedCache.invalidate_tags from the write routes. Only 200 responses
+    are stored; a view can opt out for one request by setting
+    g.skip_response_cache. ETags and 304s are left to conditional_get, which
+    should wrap this decorator.
+
+    Args:
+        tags_for (Callable): Receives the view arguments and returns the tags of
+            the response, or None to bypass the cache for this request.
+        ttl (int, optional): Seconds to keep entries (default SHARED_CACHE_DEFAULT_TTL).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            tags = tags_for(**kwargs)
+            if not tags:
+                return view(*args, **kwargs)
+
+            try:
+                cache = get_shared_cache()
+                versions = cache.tag_versions(tags)
+                key = f"{request.full_path}|" + ",".join(f"{tag}@{version}" for tag, version in zip(tags, versions))
+                entry = cache.get(RESPONSE_NAMESPACE, key)
+            except Exception as e:
+                logger.warning(f"Response cache unavailable: {e}")
+                return view(*args, **kwargs)
+
+            if entry is not None:
+                response = Response(entry["body"], status=200, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and response.is_json and not g.get('skip_response_cache'):
+                try:
+                    cache.set(RESPONSE_NAMESPACE, key, {"body": response.get_data(as_text=True)}, ttl=ttl)
+                except Exception as e:
+                    logger.warning(f"Could not store cached response: {e}")
+                response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+# ***************************************************************
+# Restaurant Cache Namespaces and Tags
+# ***************************************************************
+RESTAURANT_LIST_NAMESPACE = 'restaurants:list'
+
+
+def restaurant_cache_tag(restaurant_id):
+    """Returns the tag of every cached response built from one restaurant's data."""
+    return f"restaurant:{restaurant_id}"
+
+
+def invalidate_restaurant_caches(restaurant_id=None, listings=True):
+    """
+    Drops the cached responses of one restaurant (its detail and menu)
+    and, unless listings is False, the cached restaurant listings.
+    Call after the write has been committed.
+    """
+    try:
+        cache = get_shared_cache()
+        if listings:
+            cache.invalidate(RESTAURANT_LIST_NAMESPACE)
+        if restaurant_id is not None:
+            cache.invalidate_tags(restaurant_cache_tag(restaurant_id))
+    except Exception as e:
+        logger.error(f"Could not invalidate restaurant caches: {e}")
+
+
+def invalidate_order_restaurant_caches(order_id):
+    """
+    Drops the cached responses of the restaurants an order was placed with,
+    and the cached restaurant listings, since both carry delivery times read
+    from the orders. Call after the order write has been committed.
+    """
+    from ..models import db, OrderItem, MenuItem
+
+    try:
+        restaurant_ids = [
+            restaurant_id for (restaurant_id,) in
+            db.session.query(MenuItem.restaurant_id)
+            .join(OrderItem, OrderItem.menu_item_id == MenuItem.id)
+            .filter(OrderItem.order_id == order_id)
+            .distinct()
+        ]
+        cache = get_shared_cache()
+        cache.invalidate(RESTAURANT_LIST_NAMESPACE)
+        if restaurant_ids:
+            cache.invalidate_tags(*[restaurant_cache_tag(restaurant_id) for restaurant_id in restaurant_ids])
+    except Exception as e:
+        logger.error(f"Could not invalidate the restaurant caches of order {order_id}: {e}")
@@ -0,0 +1,207 @@
+import sys
+import math
+import time
+import logging
+import threading
+from array import array
+from flask import current_app
+from .geohash import bounding_box
+
+logger = logging.getLogger(__name__)
+
+# Default grid cell edge in degrees (~5.5 km of latitude)
+DEFAULT_CELL_SIZE_DEG = 0.05
+
+
+class RestaurantSpatialIndex:
+    """
+    In-process uniform grid over restaurant coordinates.
+
+    Coordinates and ids live in flat float/int arrays; each grid cell holds the
+    array slots of the restaurants inside it. A nearby query only visits the
+    cells overlapping the search bounding box and returns candidate ids with
+    their distance, so the database is only hit to hydrate the top results.
+    """
+
+    def __init__(self, cell_size_deg=DEFAULT_CELL_SIZE_DEG):
+        self.cell_size_deg = cell_size_deg
+        self._lock = threading.RLock()
+        self._reset()
+        self.build_seconds = None
+        self.built_at = None
+
+    def _reset(self):
+        self._ids = array('q')
+        self._lats = array('d')
+        self._lons = array('d')
+        self._slot_by_id = {}
+        self._free_slots = []
+        self._cells = {}
+
+    def _cell_of(self, latitude, longitude):
+        return (math.floor(latitude / self.cell_size_deg), math.floor(longitude / self.cell_size_deg))
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    def build(self, rows):
+        """
+        Replaces the index content.
+
+        Args:
+            rows (Iterable[Tuple[int, float, float]]): (id, latitude, longitude) rows.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            self._reset()
+            for restaurant_id, latitude, longitude in rows:
+                self._insert(restaurant_id, latitude, longitude)
+            self.build_seconds = time.perf_counter() - started
+            self.built_at = time.time()
+        logger.info(f"Spatial index built with {len(self._slot_by_id)} restaurants in {self.build_seconds:.4f}s")
+
+    def _insert(self, restaurant_id, latitude, longitude):
+        if latitude is None or longitude is None:
+            return
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._ids[slot] = restaurant_id
+            self._lats[slot] = latitude
+            self._lons[slot] = longitude
+        else:
+            slot = len(self._ids)
+            self._ids.append(restaurant_id)
+            self._lats.append(latitude)
+            self._lons.append(longitude)
+        self._slot_by_id[restaurant_id] = slot
+        self._cells.setdefault(self._cell_of(latitude, longitude), set()).add(slot)
+
+    def _delete(self, restaurant_id):
+        slot = self._slot_by_id.pop(restaurant_id, None)
+        if slot is None:
+            return
+        cell = self._cell_of(self._lats[slot], self._lons[slot])
+        slots = self._cells.get(cell)
+        if slots is not None:
+            slots.discard(slot)
+            if not slots:
+                del self._cells[cell]
+        self._free_slots.append(slot)
+
+    def upsert(self, restaurant_id, latitude, longitude):
+        """Adds a restaurant or moves it to its new coordinates."""
+        with self._lock:
+            self._delete(restaurant_id)
+            self._insert(restaurant_id, latitude, longitude)
+
+    def remove(self, restaurant_id):
+        """Drops a restaurant from the index."""
+        with self._lock:
+            self._delete(restaurant_id)
+
+    def query(self, latitude, longitude, radius_km, limit=None):
+        """
+        Finds the restaurants within radius_km of a point.
+
+        Returns:
+            List[Tuple[int, float]]: (restaurant_id, distance_km) sorted by distance.
+        """
+        from .database_related_helper_function import haversine_distance
+
+        lat_min, lat_max, lon_min, lon_max = bounding_box(latitude, longitude, radius_km)
+        row_min, col_min = self._cell_of(lat_min, lon_min)
+        row_max, col_max = self._cell_of(lat_max, lon_max)
+
+        results = []
+        with self._lock:
+            for row in range(row_min, row_max + 1):
+                for col in range(col_min, col_max + 1):
+                    for slot in self._cells.get((row, col), ()):
+                        distance = haversine_distance(latitude, longitude, self._lats[slot], self._lons[slot])
+                        if distance <= radius_km:
+                            results.append((self._ids[slot], distance))
+
+        results.sort(key=lambda pair: pair[1])
+        return results[:limit] if limit is not None else results
+
+    def stats(self):
+        """
+        Returns size and build metrics of the index.
+
+        memory_bytes is an estimate of the arrays, the id lookup table and the
+        grid cells (excluding the interned ints stored in them).
+        """
+        with self._lock:
+            memory_bytes = (
+                self._ids.buffer_info()[1] * self._ids.itemsize
+                + self._lats.buffer_info()[1] * self._lats.itemsize
+                + self._lons.buffer_info()[1] * self._lons.itemsize
+                + sys.getsizeof(self._slot_by_id)
+                + sys.getsizeof(self._cells)
+                + sum(sys.getsizeof(slots) for slots in self._cells.values())
+            )
+            return {
+                "restaurants": len(self._slot_by_id),
+                "cells": len(self._cells),
+                "cell_size_deg": self.cell_size_deg,
+                "build_seconds": self.build_seconds,
+                "built_at": self.built_at,
+                "memory_bytes": memory_bytes,
+            }
+
+
+# One index per worker process
+restaurant_spatial_index = RestaurantSpatialIndex()
+
+
+# ***************************************************************
+# Spatial Index Lifecycle Helpers
+# ***************************************************************
+def spatial_index_enabled():
+    return bool(current_app.config.get('SPATIAL_INDEX_ENABLED'))
+
+
+def build_restaurant_spatial_index():
+    """
+    Loads every restaurant's coordinates from the database into the index.
+    """
+    from ..models import db, Restaurant
+
+    rows = db.session.query(Restaurant.id, Restaurant.latitude, Restaurant.longitude).all()
+    restaurant_spatial_index.build(rows)
+    return restaurant_spatial_index
+
+
+def get_restaurant_spatial_index():
+    """
+    Returns the worker's index, (re)building it when it has not been built yet
+    or is older than SPATIAL_INDEX_MAX_AGE seconds. The periodic rebuild picks
+    up writes that were committed by other workers.
+
+    Returns:
+        RestaurantSpatialIndex or None: None when the index is disabled.
+    """
+    if not spatial_index_enabled():
+        return None
+
+    max_age = current_app.config.get('SPATIAL_INDEX_MAX_AGE')
+    is_stale = (
+        not restaurant_spatial_index.is_built
+        or (max_age and time.time() - restaurant_spatial_index.built_at > max_age)
+    )
+    if is_stale:
+        build_restaurant_spatial_index()
+    return restaurant_spatial_index
+
+
+def refresh_restaurant_in_spatial_index(restaurant):
+    """Applies a committed restaurant create/update to this worker's index."""
+    if spatial_index_enabled() and restaurant_spatial_index.is_built:
+        restaurant_spatial_index.upsert(restaurant.id, restaurant.latitude, restaurant.longitude)
+
+
+def remove_restaurant_from_spatial_index(restaurant_id):
+    """Applies a committed restaurant delete to this worker's index."""
+    if spatial_index_enabled() and restaurant_spatial_index.is_built:
+        restaurant_spatial_index.remove(restaurant_id)
@@ -2,6 +2,8 @@ from sqlite3 import OperationalError
 import base64
 from flask_caching import Cache
 import requests
+from .http_client import http_get
+from .uber_token_manager import get_uber_token_manager
 from flask import current_app
 from app.config import cache
 import datetime
@@ -75,7 +77,7 @@ def fetch_from_ubereats_by_location(latitude, longitude, access_token):
 
     try:
         # Send a GET request to the UberEats API
-        response = requests.get(endpoint, headers=headers)
+        response = http_get(endpoint, headers=headers)
 
         # Check if the response was successful; if not, raise an error
         response.raise_for_status()
@@ -118,45 +120,21 @@ def fetch_ubereats_data(latitude, longitude, client_id, client_secret):
 # ***************************************************************
 # Get Uber Access Token
 # ***************************************************************
-def get_uber_access_token(client_id, client_secret):
+def get_uber_access_token(client_id=None, client_secret=None):
     """
     Get UberEats API token using client credentials.
 
+    The token is served by the shared UberTokenManager, so login.uber.com is
+    only contacted when the cached token is about to expire.
+
     Args:
-        client_id (str): UberEats client ID.
-        client_secret (str): UberEats client secret.
+        client_id (str, optional): UberEats client ID. Defaults to UBER_CLIENT_ID.
+        client_secret (str, optional): UberEats client secret. Defaults to UBER_CLIENT_SECRET.
 
     Returns:
         str: UberEats API token.
     """
-    # # Retrieve Uber API credentials from the app's configuration
-    # UBER_CLIENT_ID = current_app.config['UBER_CLIENT_ID']
-    # UBER_CLIENT_SECRET = current_app.config['UBER_CLIENT_SECRET']
-
-    # Define the UberEats token endpoint
-    auth_url = "https://login.uber.com/oauth/v2/token"
-
-    # Construct headers for the request, including the base64-encoded client credentials
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded",
-        "Authorization": f"Basic {base64.b64encode(f'{client_id}:{client_secret}'.encode()).decode()}"
-    }
-
-    # Define the payload for the token request
-    payload = {
-        "grant_type": "client_credentials",
-        "scope": "eats.restaurant"
-    }
-    try:
-        # Send a POST request to get the access token
-        response = requests.post(auth_url, headers=headers, data=payload)
-        response.raise_for_status()
-        return response.json()['access_token']
-
-    except requests.RequestException as e:
-        error_message = f"Failed to get Uber access token. Error: {response.json().get('error_description', 'Unknown error')}"
-        logger.error(error_message)
-        raise ValueError(error_message)
+    return get_uber_token_manager(client_id, client_secret).get_token()
 
 # ***************************************************************
 # Fetch Restaurant Details from UberEats API by Store ID
@@ -183,7 +161,7 @@ def fetch_from_ubereats_api_by_store_id(store_id, access_token):
 
     try:
         # Send a GET request to the UberEats API for the specific store
-        response = requests.get(endpoint, headers=headers)
+        response = http_get(endpoint, headers=headers)
 
         # Check if the response was successful; if not, raise an error
         response.raise_for_status()
@@ -0,0 +1,260 @@
+import os
+import json
+import time
+import base64
+import fcntl
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from flask import current_app
+import requests
+from .http_client import http_post
+
+try:
+    import redis
+except ImportError:  # Redis is optional; the file store is used without it
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+UBER_TOKEN_URL = "https://login.uber.com/oauth/v2/token"
+UBER_TOKEN_SCOPE = "eats.restaurant"
+
+# A token is refreshed in the background once it is this close to expiring...
+REFRESH_MARGIN_SECONDS = 300
+# ...and synchronously (treated as expired) this close to expiring
+EXPIRY_SKEW_SECONDS = 60
+
+
+# ***************************************************************
+# Token Stores Shared Across Workers
+# ***************************************************************
+class InMemoryTokenStore:
+    """Process-local store; the stand-in used in tests and single-worker setups."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._data.get(key)
+
+    def set(self, key, value):
+        self._data[key] = value
+
+    @contextmanager
+    def lock(self, key):
+        with self._lock:
+            yield
+
+
+class FileTokenStore:
+    """
+    Stores tokens as JSON files, shared by all gunicorn workers on a host.
+    An fcntl lock file serializes refreshes between workers.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, f"uber_token_{key}.{suffix}")
+
+    def get(self, key):
+        try:
+            with open(self._path(key, 'json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, value):
+        # Write to a temp file and rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(value, f)
+        os.replace(tmp_path, self._path(key, 'json'))
+
+    @contextmanager
+    def lock(self, key):
+        with open(self._path(key, 'lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class RedisTokenStore:
+    """Stores tokens in Redis, shared by workers on every host."""
+
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self.client.get(f"uber_token:{key}")
+        return json.loads(value) if value else None
+
+    def set(self, key, value):
+        ttl = max(1, int(value['expires_at'] - time.time()))
+        self.client.set(f"uber_token:{key}", json.dumps(value), ex=ttl)
+
+    @contextmanager
+    def lock(self, key):
+        with self.client.lock(f"uber_token_lock:{key}", timeout=30, blocking_timeout=30):
+            yield
+
+
+# ***************************************************************
+# UberEats OAuth Token Manager
+# ***************************************************************
+class UberTokenManager:
+    """
+    Caches the client-credentials token until shortly before it expires.
+
+    Tokens are read from a per-process copy first, then from the shared
+    store. Within REFRESH_MARGIN_SECONDS of expiry the current token is still
+    served while one background refresh runs. Concurrent refreshes, in this
+    process and across workers, are coalesced into a single token request.
+    """
+
+    def __init__(self, client_id, client_secret, store):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.store = store
+        self._key = base64.urlsafe_b64encode(client_id.encode()).decode().rstrip('=')
+        self._token = None
+        self._refresh_lock = threading.Lock()
+        # Held while a background refresh is in flight; only ever tried, never waited on
+        self._background_refresh_lock = threading.Lock()
+
+    @staticmethod
+    def _is_valid(token):
+        return token is not None and token['expires_at'] - EXPIRY_SKEW_SECONDS > time.time()
+
+    @staticmethod
+    def _needs_refresh(token):
+        return token['expires_at'] - REFRESH_MARGIN_SECONDS <= time.time()
+
+    def get_token(self):
+        """
+        Returns:
+            str: A valid access token.
+        """
+        token = self._token
+        if not self._is_valid(token):
+            token = self.store.get(self._key)
+            if self._is_valid(token):
+                self._token = token
+
+        if not self._is_valid(token):
+            return self.refresh()['access_token']
+
+        if self._needs_refresh(token):
+            self._refresh_in_background()
+        return token['access_token']
+
+    def refresh(self, force=False):
+        """
+        Requests a new token unless another thread or worker just did.
+
+        Returns:
+            dict: {"access_token": ..., "expires_at": epoch seconds}
+        """
+        with self._refresh_lock:
+            with self.store.lock(self._key):
+                # Someone else may have refreshed while we waited for the locks
+                token = self.store.get(self._key)
+                if not force and self._is_valid(token) and not self._needs_refresh(token):
+                    self._token = token
+                    return token
+
+                token = self._request_token()
+                self.store.set(self._key, token)
+                self._token = token
+                return token
+
+    def _refresh_in_background(self):
+        # Callers inside the margin must not wait for _refresh_lock, which the
+        # refresh holds for the whole token request: they keep the current token
+        if not self._background_refresh_lock.acquire(blocking=False):
+            return
+
+        def job():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Background Uber token refresh failed: {e}")
+            finally:
+                self._background_refresh_lock.release()
+
+        try:
+            threading.Thread(target=job, name='uber-token-refresh', daemon=True).start()
+        except Exception:
+            self._background_refresh_lock.release()
+            raise
+
+    def _request_token(self):
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Authorization": f"Basic {base64.b64encode(f'{self.client_id}:{self.client_secret}'.encode()).decode()}"
+        }
+        payload = {
+            "grant_type": "client_credentials",
+            "scope": UBER_TOKEN_SCOPE
+        }
+        try:
+            response = http_post(UBER_TOKEN_URL, headers=headers, data=payload)
+            response.raise_for_status()
+            data = response.json()
+        except requests.RequestException as e:
+            error_description = 'Unknown error'
+            if e.response is not None:
+                try:
+                    error_description = e.response.json().get('error_description', error_description)
+                except ValueError:
+                    pass
+            error_message = f"Failed to get Uber access token. Error: {error_description}"
+            logger.error(error_message)
+            raise ValueError(error_message)
+
+        logger.info("Fetched a new Uber access token")
+        return {
+            "access_token": data['access_token'],
+            "expires_at": time.time() + int(data.get('expires_in', 3600))
+        }
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def build_uber_token_store(config):
+    """
+    Creates the shared store selected by UBER_TOKEN_STORE ('file', 'redis' or 'memory').
+    """
+    store_type = config.get('UBER_TOKEN_STORE', 'file')
+    if store_type == 'redis':
+        if redis is None:
+            raise RuntimeError("UBER_TOKEN_STORE is 'redis' but the redis package is not installed")
+        return RedisTokenStore(config['REDIS_URL'])
+    if store_type == 'memory':
+        return InMemoryTokenStore()
+    return FileTokenStore(config.get('UBER_TOKEN_DIR') or os.path.join(tempfile.gettempdir(), 'starcoeat'))
+
+
+def get_uber_token_manager(client_id=None, client_secret=None):
+    """
+    Returns the process-wide token manager for the given (or configured) credentials.
+    """
+    client_id = client_id or current_app.config.get('UBER_CLIENT_ID')
+    client_secret = client_secret or current_app.config.get('UBER_CLIENT_SECRET')
+    if not client_id or not client_secret:
+        raise ValueError("Uber client credentials are not configured.")
+
+    with _managers_lock:
+        manager = _managers.get(client_id)
+        if manager is None or manager.client_secret != client_secret:
+            manager = _managers[client_id] = UberTokenManager(client_id, client_secret, build_uber_token_store(current_app.config))
+        return manager
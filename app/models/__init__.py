@@ -13,3 +13,6 @@ from .order_item import OrderItem
 from .payment import Payment
 from .review_img import ReviewImg
 from .delivery import Delivery
+from .reverse_geocode import ReverseGeocode
+from .city_geocode import CityGeocode
+from .idempotency_key import IdempotencyKey
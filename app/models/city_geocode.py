@@ -0,0 +1,26 @@
+from .db import db, environment, SCHEMA
+from datetime import datetime
+
+class CityGeocode(db.Model):
+    __tablename__ = 'city_geocodes'
+
+    if environment == "production":
+        __table_args__ = {'schema': SCHEMA}
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Normalized "city|state|country" (see helper_functions.city_geocode_key)
+    lookup_key = db.Column(db.String(320), nullable=False, unique=True, index=True)
+    city = db.Column(db.String(100), nullable=False)
+    state = db.Column(db.String(100))
+    country = db.Column(db.String(100))
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    # 'google' when resolved by the Geocoding API, 'restaurants' when warmed from local data
+    source = db.Column(db.String(20), default='google')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+        }
@@ -13,8 +13,17 @@ class Favorite(db.Model):
         else:
             return attr
 
+    # A user can't favorite the same restaurant multiple times; the constraint
+    # also serves the favorites lookups by user
     if environment == "production":
-        __table_args__ = {'schema': SCHEMA}
+        __table_args__ = (
+            db.UniqueConstraint('user_id', 'restaurant_id', name='unique_user_restaurant'),
+            {'schema': SCHEMA}
+        )
+    else:
+        __table_args__ = (
+            db.UniqueConstraint('user_id', 'restaurant_id', name='unique_user_restaurant'),
+        )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('users.id'), ondelete='CASCADE'))
@@ -25,9 +34,6 @@ class Favorite(db.Model):
     # user = db.relationship('User', backref=db.backref('favorites', lazy=True, cascade='all, delete-orphan'))
     restaurant = db.relationship('Restaurant', backref=db.backref('favorited_by', lazy=True, cascade='all, delete-orphan'))
 
-    # # this to make sure a user can't favorite the same restaurant multiple times
-    # __table_args__ = (db.UniqueConstraint('user_id', 'restaurant_id', name='unique_user_restaurant'),)
-
     def to_dict(self):
         return {
             'id': self.id,
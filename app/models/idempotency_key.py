@@ -0,0 +1,20 @@
+from .db import db, environment, SCHEMA
+from datetime import datetime
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+
+    if environment == "production":
+        __table_args__ = {'schema': SCHEMA}
+
+    id = db.Column(db.Integer, primary_key=True)
+    # "<user id or anon>|<endpoint>|<Idempotency-Key header>" (see helper_functions.idempotency)
+    lookup_key = db.Column(db.String(400), nullable=False, unique=True, index=True)
+    # SHA-256 of the method, path and body of the first request
+    request_fingerprint = db.Column(db.String(64), nullable=False)
+    # 'in_progress' while the first request runs, then 'completed'
+    status = db.Column(db.String(20), nullable=False, default='in_progress')
+    response_status = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
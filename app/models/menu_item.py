@@ -13,8 +13,16 @@ class MenuItem(db.Model):
         else:
             return attr
 
+    # Serves a restaurant's menu and its filter by type
     if environment == "production":
-        __table_args__ = {'schema': SCHEMA}
+        __table_args__ = (
+            db.Index('ix_menu_items_restaurant_id_type', 'restaurant_id', 'type'),
+            {'schema': SCHEMA}
+        )
+    else:
+        __table_args__ = (
+            db.Index('ix_menu_items_restaurant_id_type', 'restaurant_id', 'type'),
+        )
 
     id = db.Column(db.Integer, primary_key=True)
     restaurant_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('restaurants.id')))
@@ -22,6 +30,7 @@ class MenuItem(db.Model):
     description = db.Column(db.Text)
     type = db.Column(db.String(50), nullable=False)
     price = db.Column(db.Float)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     menu_item_imgs = db.relationship('MenuItemImg', backref='menu_item', cascade="all, delete-orphan")
     cart_items = db.relationship('ShoppingCartItem', backref='menu_item')
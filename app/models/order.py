@@ -13,8 +13,16 @@ class Order(db.Model):
             return f"{SCHEMA}.{attr}"
         else:
             return attr
+    # Serves keyset pagination of a user's order history, newest first
     if environment == "production":
-        __table_args__ = {'schema': SCHEMA}
+        __table_args__ = (
+            db.Index('ix_orders_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+            {'schema': SCHEMA}
+        )
+    else:
+        __table_args__ = (
+            db.Index('ix_orders_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('users.id')))
@@ -24,7 +32,8 @@ class Order(db.Model):
     total_price = db.Column(db.Float)
     status = db.Column(db.String(50), default='Pending')
     delivery_time = db.Column(db.String(20))
-    created_at = db.Column(db.DateTime, default=datetime.now)
+    # Part of the order history cursor, so it can never be NULL
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
 
     is_deleted = db.Column(db.Boolean, default=False, nullable=False)
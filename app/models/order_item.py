@@ -16,8 +16,8 @@ class OrderItem(db.Model):
 
 
     id = db.Column(db.Integer, primary_key=True)
-    menu_item_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('menu_items.id')))
-    order_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('orders.id')))
+    menu_item_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('menu_items.id')), index=True)
+    order_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('orders.id')), index=True)
     quantity = db.Column(db.Integer)
 
     menu_item = db.relationship('MenuItem', backref='order_items')
@@ -1,6 +1,8 @@
-from sqlalchemy import func, select
+from datetime import datetime
+from sqlalchemy import func, select, case, cast
 from sqlalchemy.ext.hybrid import hybrid_property, hybrid_method
 from .db import db, environment, SCHEMA
+from ..helper_functions.geohash import encode_geohash
 from .review import Review
 from .menu_item import MenuItem
 from .order import Order
@@ -15,13 +17,21 @@ class Restaurant(db.Model):
         else:
             return attr
 
+    # Serves the city/state/country lookups of the nearby endpoint
     if environment == "production":
-        __table_args__ = {'schema': SCHEMA}
+        __table_args__ = (
+            db.Index('ix_restaurants_city_state_country', 'city', 'state', 'country'),
+            {'schema': SCHEMA}
+        )
+    else:
+        __table_args__ = (
+            db.Index('ix_restaurants_city_state_country', 'city', 'state', 'country'),
+        )
 
     id = db.Column(db.Integer, primary_key=True)
     google_place_id = db.Column(db.String(255), nullable=True, unique=True)
     ubereats_store_id = db.Column(db.String(255), nullable=True, unique=True)
-    owner_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('users.id')))
+    owner_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('users.id')), index=True)
     banner_image_path = db.Column(db.String(500))
     street_address = db.Column(db.String(255))
     city = db.Column(db.String(100))
@@ -30,12 +40,22 @@ class Restaurant(db.Model):
     country = db.Column(db.String(100))
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
+    # Geohash of (latitude, longitude); its B-tree index serves nearby lookups
+    geohash = db.Column(db.String(12), nullable=True, index=True)
     name = db.Column(db.String(100))
     description = db.Column(db.Text)
     opening_time = db.Column(db.Time)
     closing_time = db.Column(db.Time)
     food_type = db.Column(db.String(100))
 
+    # Denormalized review aggregates, kept current by the review write routes
+    # (see helper_functions/review_aggregates.py) so serialization never has to
+    # run AVG/COUNT subqueries against the reviews table.
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Row version used in the ETags of the read endpoints
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
     menu_items = db.relationship('MenuItem', backref='restaurant', lazy=True, cascade="all, delete-orphan")
     reviews = db.relationship('Review', backref='restaurant', lazy=True)
 
@@ -72,32 +92,76 @@ class Restaurant(db.Model):
         # Join the delivery times into a single string separated by commas
         return ", ".join(delivery_times)
 
+    @classmethod
+    def get_delivery_times_for(cls, restaurant_ids):
+        """
+        Batched version of get_delivery_times for a page of restaurants.
+
+        Runs a single query over orders -> order_items -> menu_items for all of
+        the given restaurant ids and groups the rows in memory.
+
+        Returns:
+            dict: Mapping of restaurant_id -> comma separated delivery times.
+        """
+        restaurant_ids = list(set(restaurant_ids))
+        if not restaurant_ids:
+            return {}
+
+        rows = (
+            db.session.query(MenuItem.restaurant_id, Order.delivery_time)
+            .join(OrderItem, Order.id == OrderItem.order_id)
+            .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
+            .filter(MenuItem.restaurant_id.in_(restaurant_ids))
+            .all()
+        )
+
+        grouped = {}
+        for restaurant_id, delivery_time in rows:
+            if delivery_time is not None:
+                grouped.setdefault(restaurant_id, []).append(str(delivery_time))
+
+        return {restaurant_id: ", ".join(times) for restaurant_id, times in grouped.items()}
+
+    @classmethod
+    def serialize_many(cls, restaurants):
+        """
+        Serializes a list of restaurants with a fixed number of queries.
+
+        Ratings and review counts come from the aggregate columns, delivery
+        times from one grouped query, so the cost does not grow with the
+        number of restaurants being serialized.
+
+        Args:
+            restaurants (Iterable[Restaurant]): The restaurants to serialize.
+
+        Returns:
+            List[dict]: The restaurants in the same shape as to_dict().
+        """
+        restaurants = list(restaurants)
+        delivery_times = cls.get_delivery_times_for(r.id for r in restaurants)
+        return [r.to_dict(delivery_times=delivery_times.get(r.id, "")) for r in restaurants]
+
     @hybrid_property
     def average_rating(self):
-        avg_rating = (
-            db.session.query(func.round(func.avg(Review.stars), 1))
-            .filter(Review.restaurant_id == self.id)
-            .scalar()
-        )
-        return avg_rating or 0
+        if not self.review_count:
+            return 0
+        return round((self.rating_sum or 0) / self.review_count, 1)
 
     @average_rating.expression
     def average_rating(cls):
         return (
-            select([func.round(func.avg(Review.stars), 1)])
-            .where(Review.restaurant_id == cls.id)
+            case(
+                (cls.review_count > 0, func.round(cast(cls.rating_sum, db.Numeric) / cls.review_count, 1)),
+                else_=0
+            )
             .label("average_rating")
         )
+
     def get_num_reviews(self):
-        # Calculate and return the number of reviews for this restaurant
-        num_reviews = (
-            db.session.query(func.count(Review.id))
-            .filter(Review.restaurant_id == self.id)
-            .scalar()
-        )
-        return num_reviews or 0
+        # Number of reviews is read from the maintained aggregate column
+        return self.review_count or 0
 
-    def to_dict(self):
+    def to_dict(self, delivery_times=None):
         return {
             'id': self.id,
             'google_place_id': self.google_place_id,
@@ -122,6 +186,14 @@ class Restaurant(db.Model):
             'food_type': self.food_type,
             'average_rating': self.average_rating,
             'num_reviews': self.get_num_reviews(),
-            'delivery_times': self.get_delivery_times(),
+            'delivery_times': self.get_delivery_times() if delivery_times is None else delivery_times,
 
         }
+
+
+# Keep the geohash column in sync with the coordinates on every insert/update,
+# including rows written by the seeders.
+@db.event.listens_for(Restaurant, 'before_insert')
+@db.event.listens_for(Restaurant, 'before_update')
+def update_restaurant_geohash(mapper, connection, target):
+    target.geohash = encode_geohash(target.latitude, target.longitude)
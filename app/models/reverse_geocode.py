@@ -0,0 +1,26 @@
+from .db import db, environment, SCHEMA
+from datetime import datetime
+
+class ReverseGeocode(db.Model):
+    __tablename__ = 'reverse_geocodes'
+
+    if environment == "production":
+        __table_args__ = {'schema': SCHEMA}
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Rounded "lat,lng" the address was resolved for
+    cache_key = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    city = db.Column(db.String(100))
+    state = db.Column(db.String(100))
+    postal_code = db.Column(db.String(20))
+    country = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def to_dict(self):
+        # Same shape as get_address_components_from_geocoding
+        return {
+            field: getattr(self, field)
+            for field in ('city', 'state', 'postal_code', 'country')
+            if getattr(self, field) is not None
+        }
@@ -13,8 +13,16 @@ class Review(db.Model):
             return f"{SCHEMA}.{attr}"
         else:
             return attr
+    # Serves the reviews of a restaurant, newest first
     if environment == "production":
-        __table_args__ = {'schema': SCHEMA}
+        __table_args__ = (
+            db.Index('ix_reviews_restaurant_id_created_at', 'restaurant_id', 'created_at'),
+            {'schema': SCHEMA}
+        )
+    else:
+        __table_args__ = (
+            db.Index('ix_reviews_restaurant_id_created_at', 'restaurant_id', 'created_at'),
+        )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('users.id')))
@@ -17,29 +17,15 @@ class ShoppingCart(db.Model):
         __table_args__ = {'schema': SCHEMA}
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('users.id')))
+    user_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('users.id')), index=True)
 
     items = db.relationship("ShoppingCartItem", backref='cart', cascade="all, delete-orphan")
 
 
     def calculate_total_price(self):
-        # This method calculates the total price of all items in the shopping cart.
-
-        # Check if the items relationship is a dynamic loader, if so, load all items.
-        # This is to ensure that we're working with the actual list of items
-        # and not an unloaded SQL query or relationship.
-        items = self.items.all() if hasattr(self.items, 'all') else self.items
-
-        # Compute the total price by iterating over each item in the cart.
-        # We use a generator expression to sum up the price multiplied by the quantity.
-        # The 'or 0' part ensures that if either the price or quantity is None (which shouldn't happen),
-        # it is treated as 0 to avoid type errors during the calculation.
-        total_price = sum((item.menu_item.price or 0) * (item.quantity or 0) for item in items if item.menu_item and item.quantity is not None)
-
-        # The total price is rounded to 2 decimal places before being returned.
-        # This is a common practice when dealing with currency to avoid
-        # floating-point arithmetic issues and to ensure the price is in a standard currency format.
-        return round(total_price, 2)
+        # Computed in SQL by the cart helper, rounded to 2 decimal places
+        from ..helper_functions.cart_helper import get_cart_total
+        return get_cart_total(self.id)
 
 
     def to_dict(self):
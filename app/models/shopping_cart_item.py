@@ -11,13 +11,22 @@ class ShoppingCartItem(db.Model):
             return f"{SCHEMA}.{attr}"
         else:
             return attr
+    # Serves the lines of a cart and the line lookup when adding an item
     if environment == "production":
-        __table_args__ = {'schema': SCHEMA}
+        __table_args__ = (
+            db.Index('ix_shopping_cart_items_cart_id_menu_item_id', 'shopping_cart_id', 'menu_item_id'),
+            {'schema': SCHEMA}
+        )
+    else:
+        __table_args__ = (
+            db.Index('ix_shopping_cart_items_cart_id_menu_item_id', 'shopping_cart_id', 'menu_item_id'),
+        )
 
     id = db.Column(db.Integer, primary_key=True)
     menu_item_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('menu_items.id')))
     shopping_cart_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('shopping_carts.id')))
     quantity = db.Column(db.Integer)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def to_dict(self):
         return {
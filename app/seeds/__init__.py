@@ -1,3 +1,4 @@
+import click
 from flask.cli import AppGroup
 from .users_seeder import seed_users, undo_users
 # from .favorite_seeder import seed_favorites, undo_favorites
@@ -9,6 +10,7 @@ from .review_img_seeder import seed_review_images, undo_review_images
 # from .order_seeder import seed_orders_and_order_items, undo_orders_and_order_items
 # from .payment_seeder import seed_payments, undo_payments
 from app.models.db import db, environment, SCHEMA
+from app.helper_functions import backfill_review_aggregates, find_review_aggregate_mismatches, warm_city_geocodes_from_restaurants, purge_expired_idempotency_keys, rebuild_search_index
 
 # Creates a seed group to hold our commands
 # So we can type `flask seed --help`
@@ -39,6 +41,9 @@ def seed():
     # seed_favorites()
     seed_reviews()
     seed_review_images()
+    backfill_review_aggregates()
+    warm_city_geocodes_from_restaurants()
+    rebuild_search_index()
     # seed_shopping_carts_and_items()
     # seed_orders_and_order_items()
     # seed_payments()
@@ -56,3 +61,47 @@ def undo():
     undo_restaurants()
     undo_users()
     # Add other undo functions here
+
+# Creates the `flask seed review-aggregates` command
+@seed_commands.command('review-aggregates')
+def seed_review_aggregates():
+    # Recompute restaurants.rating_sum / review_count from the reviews table
+    updated = backfill_review_aggregates()
+    click.echo(f"Review aggregates backfilled for {updated} restaurant(s).")
+
+# Creates the `flask seed check-review-aggregates` command
+@seed_commands.command('check-review-aggregates')
+def check_review_aggregates():
+    # Report restaurants whose stored aggregates drifted from the reviews table
+    mismatches = find_review_aggregate_mismatches()
+    if not mismatches:
+        click.echo("Review aggregates are consistent.")
+        return
+    for mismatch in mismatches:
+        click.echo(
+            f"Restaurant {mismatch['restaurant_id']}: "
+            f"stored {mismatch['rating_sum']}/{mismatch['review_count']}, "
+            f"expected {mismatch['expected_rating_sum']}/{mismatch['expected_review_count']}"
+        )
+    raise SystemExit(1)
+
+# Creates the `flask seed geocodes` command
+@seed_commands.command('geocodes')
+def seed_city_geocodes():
+    # Warm the city_geocodes table from the cities of existing restaurants
+    added = warm_city_geocodes_from_restaurants()
+    click.echo(f"Added {added} city geocode(s) from restaurants.")
+
+# Creates the `flask seed purge-idempotency-keys` command
+@seed_commands.command('purge-idempotency-keys')
+def purge_idempotency_keys():
+    # Drop stored idempotent responses whose TTL has passed
+    deleted = purge_expired_idempotency_keys()
+    click.echo(f"Purged {deleted} expired idempotency key(s).")
+
+# Creates the `flask seed search-index` command
+@seed_commands.command('search-index')
+def seed_search_index():
+    # Rebuild the full-text search documents of every restaurant
+    indexed = rebuild_search_index()
+    click.echo(f"Indexed {indexed} restaurant(s) for search.")
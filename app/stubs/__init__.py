@@ -0,0 +1,8 @@
+from flask.cli import AppGroup
+from .geocoding_stub import run_geocoding_stub
+
+# Creates a stub group to hold local stand-ins for external APIs
+# So we can type `flask stub --help`
+stub_commands = AppGroup('stub')
+
+stub_commands.add_command(run_geocoding_stub)
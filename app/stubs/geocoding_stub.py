@@ -0,0 +1,77 @@
+import click
+from flask import Flask, jsonify, request
+
+# Cities known to the stub: normalized address -> (lat, lng, city, state, country, postal_code)
+STUB_CITIES = {
+    "new york": (40.7127753, -74.0059728, "New York", "New York", "United States", "10007"),
+    "los angeles": (34.0522342, -118.2436849, "Los Angeles", "California", "United States", "90012"),
+    "chicago": (41.8781136, -87.6297982, "Chicago", "Illinois", "United States", "60602"),
+    "houston": (29.7604267, -95.3698028, "Houston", "Texas", "United States", "77002"),
+    "san francisco": (37.7749295, -122.4194155, "San Francisco", "California", "United States", "94103"),
+}
+
+
+def create_geocoding_stub_app(cities=None):
+    """
+    Builds a minimal stand-in for the Google Geocoding API.
+
+    It answers forward (address=...) and reverse (latlng=...) lookups with the
+    same JSON layout as Google, from a fixed set of cities, and counts the
+    requests it served at /stats so tests can assert on cache hits.
+
+    Args:
+        cities (dict, optional): Replaces STUB_CITIES.
+
+    Returns:
+        Flask: The stub application.
+    """
+    cities = cities if cities is not None else STUB_CITIES
+    stub = Flask(__name__)
+    stats = {"forward": 0, "reverse": 0}
+
+    def to_result(lat, lng, city, state, country, postal_code):
+        return {
+            "address_components": [
+                {"long_name": city, "types": ["locality", "political"]},
+                {"long_name": state, "types": ["administrative_area_level_1", "political"]},
+                {"long_name": country, "types": ["country", "political"]},
+                {"long_name": postal_code, "types": ["postal_code"]},
+            ],
+            "geometry": {"location": {"lat": lat, "lng": lng}},
+        }
+
+    @stub.route('/maps/api/geocode/json')
+    def geocode():
+        if request.args.get('latlng'):
+            stats["reverse"] += 1
+            lat, lng = (float(v) for v in request.args['latlng'].split(','))
+            # The nearest known city stands in for the real address
+            nearest = min(cities.values(), key=lambda c: (c[0] - lat) ** 2 + (c[1] - lng) ** 2, default=None)
+            if nearest is None:
+                return jsonify({"status": "ZERO_RESULTS", "results": []})
+            return jsonify({"status": "OK", "results": [to_result(lat, lng, *nearest[2:])]})
+
+        stats["forward"] += 1
+        address = request.args.get('address', '')
+        city = " ".join(address.split(',')[0].lower().split())
+        if city not in cities:
+            return jsonify({"status": "ZERO_RESULTS", "results": []})
+        return jsonify({"status": "OK", "results": [to_result(*cities[city])]})
+
+    @stub.route('/stats')
+    def get_stats():
+        return jsonify(stats)
+
+    return stub
+
+
+# Creates the `flask stub geocoding` command
+@click.command('geocoding')
+@click.option('--host', default='127.0.0.1')
+@click.option('--port', default=5055)
+def run_geocoding_stub(host, port):
+    """
+    Serves the Geocoding API stand-in. Point the app at it with
+    GEOCODING_API_URL=http://127.0.0.1:5055/maps/api/geocode/json
+    """
+    create_geocoding_stub_app().run(host=host, port=port)
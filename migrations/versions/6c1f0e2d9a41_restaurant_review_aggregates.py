@@ -0,0 +1,42 @@
+"""add review aggregate columns to restaurants
+
+Revision ID: 6c1f0e2d9a41
+Revises: 3a425ce377af
+Create Date: 2024-01-08 10:12:31.104223
+
+"""
+import os
+from alembic import op
+import sqlalchemy as sa
+environment = os.getenv("FLASK_ENV")
+SCHEMA = os.environ.get("SCHEMA")
+
+
+# revision identifiers, used by Alembic.
+revision = '6c1f0e2d9a41'
+down_revision = '3a425ce377af'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    schema = SCHEMA if environment == "production" else None
+    prefix = f"{SCHEMA}." if environment == "production" else ""
+
+    op.add_column('restaurants', sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'), schema=schema)
+    op.add_column('restaurants', sa.Column('review_count', sa.Integer(), nullable=False, server_default='0'), schema=schema)
+
+    # Backfill the aggregates from the existing reviews
+    op.execute(
+        f"UPDATE {prefix}restaurants SET "
+        f"rating_sum = (SELECT COALESCE(SUM(stars), 0) FROM {prefix}reviews WHERE reviews.restaurant_id = restaurants.id), "
+        f"review_count = (SELECT COUNT(id) FROM {prefix}reviews WHERE reviews.restaurant_id = restaurants.id)"
+    )
+
+
+def downgrade():
+    schema = SCHEMA if environment == "production" else None
+
+    with op.batch_alter_table('restaurants', schema=schema) as batch_op:
+        batch_op.drop_column('review_count')
+        batch_op.drop_column('rating_sum')
@@ -0,0 +1,31 @@
+"""add composite index for paginated order history
+
+Revision ID: a2c7e91f4d36
+Revises: e83a5b16c7d9
+Create Date: 2024-01-15 10:22:41.873905
+
+"""
+import os
+from alembic import op
+import sqlalchemy as sa
+environment = os.getenv("FLASK_ENV")
+SCHEMA = os.environ.get("SCHEMA")
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2c7e91f4d36'
+down_revision = 'e83a5b16c7d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    schema = SCHEMA if environment == "production" else None
+
+    op.create_index('ix_orders_user_id_created_at_id', 'orders', ['user_id', 'created_at', 'id'], unique=False, schema=schema)
+
+
+def downgrade():
+    schema = SCHEMA if environment == "production" else None
+
+    op.drop_index('ix_orders_user_id_created_at_id', table_name='orders', schema=schema)
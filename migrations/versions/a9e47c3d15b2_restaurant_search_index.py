@@ -0,0 +1,68 @@
+"""create the restaurant full-text search index
+
+Postgres: restaurant_search_documents table with a weighted tsvector and a
+GIN index. SQLite: FTS5 virtual table of the same name.
+
+Revision ID: a9e47c3d15b2
+Revises: f3d8b6a29c41
+Create Date: 2024-01-22 11:03:47.518902
+
+"""
+import os
+from alembic import op
+import sqlalchemy as sa
+environment = os.getenv("FLASK_ENV")
+SCHEMA = os.environ.get("SCHEMA")
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9e47c3d15b2'
+down_revision = 'f3d8b6a29c41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    prefix = f"{SCHEMA}." if environment == "production" else ""
+
+    if dialect == 'postgresql':
+        op.execute(
+            f"CREATE TABLE {prefix}restaurant_search_documents ("
+            f"restaurant_id INTEGER PRIMARY KEY REFERENCES {prefix}restaurants (id) ON DELETE CASCADE, "
+            f"document TSVECTOR NOT NULL)"
+        )
+        op.execute(
+            f"CREATE INDEX ix_restaurant_search_documents_document "
+            f"ON {prefix}restaurant_search_documents USING GIN (document)"
+        )
+        # Backfill the documents of the existing restaurants
+        op.execute(
+            f"INSERT INTO {prefix}restaurant_search_documents (restaurant_id, document) "
+            f"SELECT r.id, "
+            f"setweight(to_tsvector('english', coalesce(r.name, '')), 'A') || "
+            f"setweight(to_tsvector('english', coalesce(r.food_type, '')), 'B') || "
+            f"setweight(to_tsvector('english', coalesce((SELECT string_agg(m.name, ' ') FROM {prefix}menu_items m WHERE m.restaurant_id = r.id), '')), 'B') || "
+            f"setweight(to_tsvector('english', coalesce(r.description, '')), 'C') || "
+            f"setweight(to_tsvector('english', coalesce((SELECT string_agg(m.description, ' ') FROM {prefix}menu_items m WHERE m.restaurant_id = r.id), '')), 'D') "
+            f"FROM {prefix}restaurants r"
+        )
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE restaurant_search_documents USING fts5("
+            "restaurant_id UNINDEXED, name, food_type, description, menu_text, "
+            "tokenize='porter unicode61', prefix='2 3')"
+        )
+        op.execute(
+            "INSERT INTO restaurant_search_documents (restaurant_id, name, food_type, description, menu_text) "
+            "SELECT r.id, coalesce(r.name, ''), coalesce(r.food_type, ''), coalesce(r.description, ''), "
+            "coalesce((SELECT group_concat(coalesce(m.name, '') || ' ' || coalesce(m.description, ''), ' ') "
+            "FROM menu_items m WHERE m.restaurant_id = r.id), '') "
+            "FROM restaurants r"
+        )
+
+
+def downgrade():
+    prefix = f"{SCHEMA}." if environment == "production" else ""
+
+    op.execute(f"DROP TABLE IF EXISTS {prefix}restaurant_search_documents")
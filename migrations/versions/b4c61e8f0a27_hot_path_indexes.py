@@ -0,0 +1,59 @@
+"""add indexes on the hot foreign keys and filters, unique favorites
+
+orders.user_id is already served by ix_orders_user_id_created_at_id.
+
+Revision ID: b4c61e8f0a27
+Revises: a9e47c3d15b2
+Create Date: 2024-01-24 15:40:12.209617
+
+"""
+import os
+from alembic import op
+import sqlalchemy as sa
+environment = os.getenv("FLASK_ENV")
+SCHEMA = os.environ.get("SCHEMA")
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4c61e8f0a27'
+down_revision = 'a9e47c3d15b2'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns)
+INDEXES = (
+    ('ix_reviews_restaurant_id_created_at', 'reviews', ['restaurant_id', 'created_at']),
+    ('ix_menu_items_restaurant_id_type', 'menu_items', ['restaurant_id', 'type']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_order_items_menu_item_id', 'order_items', ['menu_item_id']),
+    ('ix_shopping_carts_user_id', 'shopping_carts', ['user_id']),
+    ('ix_shopping_cart_items_cart_id_menu_item_id', 'shopping_cart_items', ['shopping_cart_id', 'menu_item_id']),
+    ('ix_restaurants_city_state_country', 'restaurants', ['city', 'state', 'country']),
+    ('ix_restaurants_owner_id', 'restaurants', ['owner_id']),
+)
+
+
+def upgrade():
+    schema = SCHEMA if environment == "production" else None
+    prefix = f"{SCHEMA}." if environment == "production" else ""
+
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, schema=schema)
+
+    # Keep the oldest of any duplicate favorites before enforcing uniqueness
+    op.execute(
+        f"DELETE FROM {prefix}favorites WHERE id NOT IN "
+        f"(SELECT MIN(id) FROM {prefix}favorites GROUP BY user_id, restaurant_id)"
+    )
+    with op.batch_alter_table('favorites', schema=schema) as batch_op:
+        batch_op.create_unique_constraint('unique_user_restaurant', ['user_id', 'restaurant_id'])
+
+
+def downgrade():
+    schema = SCHEMA if environment == "production" else None
+
+    with op.batch_alter_table('favorites', schema=schema) as batch_op:
+        batch_op.drop_constraint('unique_user_restaurant', type_='unique')
+
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, schema=schema)
@@ -0,0 +1,53 @@
+"""add indexed geohash column to restaurants
+
+Revision ID: b7d2a4c81e03
+Revises: 6c1f0e2d9a41
+Create Date: 2024-01-09 14:41:07.530118
+
+"""
+import os
+from alembic import op
+import sqlalchemy as sa
+from app.helper_functions.geohash import encode_geohash
+environment = os.getenv("FLASK_ENV")
+SCHEMA = os.environ.get("SCHEMA")
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2a4c81e03'
+down_revision = '6c1f0e2d9a41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    schema = SCHEMA if environment == "production" else None
+
+    op.add_column('restaurants', sa.Column('geohash', sa.String(length=12), nullable=True), schema=schema)
+    op.create_index('ix_restaurants_geohash', 'restaurants', ['geohash'], unique=False, schema=schema)
+
+    # Backfill the geohash of existing restaurants
+    restaurants = sa.table(
+        'restaurants',
+        sa.column('id', sa.Integer),
+        sa.column('latitude', sa.Float),
+        sa.column('longitude', sa.Float),
+        sa.column('geohash', sa.String),
+        schema=schema
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(restaurants.c.id, restaurants.c.latitude, restaurants.c.longitude)).fetchall()
+    for restaurant_id, latitude, longitude in rows:
+        bind.execute(
+            restaurants.update()
+            .where(restaurants.c.id == restaurant_id)
+            .values(geohash=encode_geohash(latitude, longitude))
+        )
+
+
+def downgrade():
+    schema = SCHEMA if environment == "production" else None
+
+    op.drop_index('ix_restaurants_geohash', table_name='restaurants', schema=schema)
+    with op.batch_alter_table('restaurants', schema=schema) as batch_op:
+        batch_op.drop_column('geohash')
@@ -0,0 +1,46 @@
+"""create idempotency_keys table
+
+Revision ID: c5f18d3a7e20
+Revises: a2c7e91f4d36
+Create Date: 2024-01-16 09:12:55.604128
+
+"""
+import os
+from alembic import op
+import sqlalchemy as sa
+environment = os.getenv("FLASK_ENV")
+SCHEMA = os.environ.get("SCHEMA")
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5f18d3a7e20'
+down_revision = 'a2c7e91f4d36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('idempotency_keys',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('lookup_key', sa.String(length=400), nullable=False),
+    sa.Column('request_fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('response_status', sa.Integer(), nullable=True),
+    sa.Column('response_body', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_idempotency_keys_lookup_key', 'idempotency_keys', ['lookup_key'], unique=True)
+    op.create_index('ix_idempotency_keys_expires_at', 'idempotency_keys', ['expires_at'], unique=False)
+
+    if environment == "production":
+        op.execute(f"ALTER TABLE idempotency_keys SET SCHEMA {SCHEMA};")
+
+
+def downgrade():
+    schema = SCHEMA if environment == "production" else None
+
+    op.drop_index('ix_idempotency_keys_expires_at', table_name='idempotency_keys', schema=schema)
+    op.drop_index('ix_idempotency_keys_lookup_key', table_name='idempotency_keys', schema=schema)
+    op.drop_table('idempotency_keys', schema=schema)
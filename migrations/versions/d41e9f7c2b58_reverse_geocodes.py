@@ -0,0 +1,45 @@
+"""create reverse_geocodes cache table
+
+Revision ID: d41e9f7c2b58
+Revises: b7d2a4c81e03
+Create Date: 2024-01-11 09:27:44.871352
+
+"""
+import os
+from alembic import op
+import sqlalchemy as sa
+environment = os.getenv("FLASK_ENV")
+SCHEMA = os.environ.get("SCHEMA")
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41e9f7c2b58'
+down_revision = 'b7d2a4c81e03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('reverse_geocodes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('city', sa.String(length=100), nullable=True),
+    sa.Column('state', sa.String(length=100), nullable=True),
+    sa.Column('postal_code', sa.String(length=20), nullable=True),
+    sa.Column('country', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_reverse_geocodes_cache_key', 'reverse_geocodes', ['cache_key'], unique=True)
+    op.create_index('ix_reverse_geocodes_last_used_at', 'reverse_geocodes', ['last_used_at'], unique=False)
+    if environment == "production":
+        op.execute(f"ALTER TABLE reverse_geocodes SET SCHEMA {SCHEMA};")
+
+
+def downgrade():
+    schema = SCHEMA if environment == "production" else None
+
+    op.drop_index('ix_reverse_geocodes_last_used_at', table_name='reverse_geocodes', schema=schema)
+    op.drop_index('ix_reverse_geocodes_cache_key', table_name='reverse_geocodes', schema=schema)
+    op.drop_table('reverse_geocodes', schema=schema)
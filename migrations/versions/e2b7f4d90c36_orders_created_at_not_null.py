@@ -0,0 +1,40 @@
+"""make orders.created_at non-null
+
+The order history cursor is built from (created_at, id).
+
+Revision ID: e2b7f4d90c36
+Revises: b4c61e8f0a27
+Create Date: 2024-01-26 10:12:48.530217
+
+"""
+import os
+from alembic import op
+import sqlalchemy as sa
+environment = os.getenv("FLASK_ENV")
+SCHEMA = os.environ.get("SCHEMA")
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b7f4d90c36'
+down_revision = 'b4c61e8f0a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    schema = SCHEMA if environment == "production" else None
+    prefix = f"{SCHEMA}." if environment == "production" else ""
+
+    op.execute(
+        f"UPDATE {prefix}orders SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) "
+        f"WHERE created_at IS NULL"
+    )
+    with op.batch_alter_table('orders', schema=schema) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    schema = SCHEMA if environment == "production" else None
+
+    with op.batch_alter_table('orders', schema=schema) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,44 @@
+"""create city_geocodes table
+
+Revision ID: e83a5b16c7d9
+Revises: d41e9f7c2b58
+Create Date: 2024-01-12 16:03:18.219467
+
+"""
+import os
+from alembic import op
+import sqlalchemy as sa
+environment = os.getenv("FLASK_ENV")
+SCHEMA = os.environ.get("SCHEMA")
+
+
+# revision identifiers, used by Alembic.
+revision = 'e83a5b16c7d9'
+down_revision = 'd41e9f7c2b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('city_geocodes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('lookup_key', sa.String(length=320), nullable=False),
+    sa.Column('city', sa.String(length=100), nullable=False),
+    sa.Column('state', sa.String(length=100), nullable=True),
+    sa.Column('country', sa.String(length=100), nullable=True),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('source', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_city_geocodes_lookup_key', 'city_geocodes', ['lookup_key'], unique=True)
+    if environment == "production":
+        op.execute(f"ALTER TABLE city_geocodes SET SCHEMA {SCHEMA};")
+
+
+def downgrade():
+    schema = SCHEMA if environment == "production" else None
+
+    op.drop_index('ix_city_geocodes_lookup_key', table_name='city_geocodes', schema=schema)
+    op.drop_table('city_geocodes', schema=schema)
@@ -0,0 +1,38 @@
+"""add updated_at stamps to restaurants, menu_items and shopping_cart_items
+
+Revision ID: f3d8b6a29c41
+Revises: c5f18d3a7e20
+Create Date: 2024-01-19 14:27:08.331570
+
+"""
+import os
+from alembic import op
+import sqlalchemy as sa
+environment = os.getenv("FLASK_ENV")
+SCHEMA = os.environ.get("SCHEMA")
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3d8b6a29c41'
+down_revision = 'c5f18d3a7e20'
+branch_labels = None
+depends_on = None
+
+TABLES = ('restaurants', 'menu_items', 'shopping_cart_items')
+
+
+def upgrade():
+    schema = SCHEMA if environment == "production" else None
+
+    # Existing rows start from the migration time
+    for table in TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True,
+                                       server_default=sa.func.current_timestamp()), schema=schema)
+
+
+def downgrade():
+    schema = SCHEMA if environment == "production" else None
+
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=schema) as batch_op:
+            batch_op.drop_column('updated_at')
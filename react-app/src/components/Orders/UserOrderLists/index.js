@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from "react";
 import { useDispatch, useSelector } from "react-redux";
-import { thunkGetUserOrders } from "../../../store/orders";
+import { thunkGetUserOrders, thunkLoadMoreUserOrders } from "../../../store/orders";
 import OrderDetailPage from "../OrderDetailPage";
 import OpenModalButton from "../../Modals/OpenModalButton";
 import CancelOrderButton from "../CancelOrderButton";
@@ -12,8 +12,9 @@ import "./UserOrderLists.css";
 const UserOrderLists = () => {
   const dispatch = useDispatch();
   const navigate = useNavigate();
-  const { orders, sessionUser, isLoading, error} = useSelector((state) => ({
+  const { orders, nextCursor, sessionUser, isLoading, error} = useSelector((state) => ({
     orders: state.orders.orders.byId,
+    nextCursor: state.orders.userOrdersNextCursor,
     sessionUser: state.session.user,
     isLoading: state.orders.isLoading,
     error: state.orders.error,
@@ -56,6 +57,11 @@ const UserOrderLists = () => {
 
         </>
       ))}
+      {nextCursor && (
+        <button className="load-more-orders-button" onClick={() => dispatch(thunkLoadMoreUserOrders(sessionUser.id))}>
+          Load more orders
+        </button>
+      )}
     </div>
   );
 }
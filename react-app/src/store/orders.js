@@ -48,9 +48,9 @@ export const actionUpdateOrder = (orderId, status) => ({
   payload: { orderId, status },
 });
 
-export const actionSetUserOrders = (orders) => ({
+export const actionSetUserOrders = (orders, nextCursor = null) => ({
   type: SET_USER_ORDERS,
-  payload: { orders },
+  payload: { orders, nextCursor },
 });
 
 export const actionSetOrderDetails = (orderDetails) => ({
@@ -221,19 +221,26 @@ export const thunkUpdateOrderStatus = (orderId, status) => async (dispatch) => {
   }
 };
 
-// Thunk to get user's orders
-export const thunkGetUserOrders = (userId) => async (dispatch) => {
+// Fetches one page of a user's orders and stores it with the cursor of the next page
+const fetchUserOrdersPage = async (dispatch, userId, cursor) => {
   try {
-    const response = await fetch(`/api/orders/user/${userId}`);
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    const response = await fetch(`/api/orders/user/${userId}${query}`);
 
     if (!response.ok) {
       const errors = await response.json();
       console.error(`Error fetching orders for user ID ${userId}:`, errors);
       dispatch(setError(errors.message || "Failed to fetch orders"));
-    } else {
-      const orders = await response.json();
-      dispatch(actionSetUserOrders(orders));
+      return;
     }
+
+    const data = await response.json();
+    dispatch(
+      actionSetUserOrders(
+        data.entities.orders,
+        data.pagination ? data.pagination.nextCursor : null
+      )
+    );
   } catch (error) {
     console.error(
       `An error occurred while fetching orders for user ID ${userId}:`,
@@ -243,6 +250,19 @@ export const thunkGetUserOrders = (userId) => async (dispatch) => {
   }
 };
 
+// Thunk to get the first page of a user's orders
+export const thunkGetUserOrders = (userId) => async (dispatch) => {
+  await fetchUserOrdersPage(dispatch, userId, null);
+};
+
+// Thunk to get the next page of a user's orders, if there is one
+export const thunkLoadMoreUserOrders =
+  (userId) => async (dispatch, getState) => {
+    const cursor = getState().orders.userOrdersNextCursor;
+    if (!cursor) return;
+    await fetchUserOrdersPage(dispatch, userId, cursor);
+  };
+
 // Thunk to reorder a past order
 export const thunkReorderPastOrder = (orderId) => async (dispatch) => {
   try {
@@ -358,6 +378,7 @@ const initialState = {
   orderItems: { byId: {}, allIds: [] },
   menuItems: { byId: {}, allIds: [] },
   createdOrder: null, // for tracking the most recently created order
+  userOrdersNextCursor: null, // cursor of the next page of the user's orders
   isLoading: false,
   error: null,
 };
@@ -412,6 +433,7 @@ export default function ordersReducer(state = initialState, action) {
 
       case SET_USER_ORDERS:
         mergeEntities(draft.orders, action.payload.orders);
+        draft.userOrdersNextCursor = action.payload.nextCursor;
         break;
 
       case SET_ORDER_DETAILS:
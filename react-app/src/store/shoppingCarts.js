@@ -101,7 +101,7 @@ export const thunkAddItemToCart = (menuItemId, quantity, restaurantId) => async
 };
 
 export const thunkAddItemsToCart =
-  (items, restaurantId) => async (dispatch) => {
+  (items) => async (dispatch) => {
     try {
       const response = await fetch(`/api/shopping-carts/items`, {
         method: "POST",
@@ -114,10 +114,9 @@ export const thunkAddItemsToCart =
       if (response.ok) {
         const data = await response.json();
 
-        // Dispatch actions for each added item
-        Object.values(data.entities.shoppingCartItems.byId).forEach((item) => {
-          dispatch(actionAddItemToCart(item.id, item.quantity, restaurantId));
-        });
+        // The response carries the whole updated cart
+        dispatch(actionSetCurrentCart(data.entities.shoppingCartItems.byId));
+        dispatch(actionSetTotalPrice(data.metadata.totalPrice));
         return data.message;
       } else {
         const data = await response.json();
@@ -343,9 +342,12 @@ export default function shoppingCartReducer(state = initialState, action) {
     case SET_CURRENT_CART: {
       const newCartItemsById = action.cartItems;
       const newAllIds = Object.keys(newCartItemsById);
+      // A cart only holds items of one restaurant
+      const firstItem = newCartItemsById[newAllIds[0]];
 
       return {
         ...state,
+        restaurantId: firstItem ? firstItem.restaurant_id : null,
         cartItems: {
           byId: newCartItemsById,
           allIds: newAllIds,
@@ -0,0 +1,103 @@
+import os
+
+# The app reads its configuration at import time; always test against an
+# in-memory SQLite database, never the DATABASE_URL of the environment
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+os.environ.pop('REDIS_URL', None)
+
+import pytest
+from flask import g
+from sqlalchemy import event
+
+from app import app as flask_app
+from app.models import db, User, Restaurant, MenuItem
+
+
+@pytest.fixture
+def app():
+    from app.helper_functions import shared_cache
+
+    flask_app.config.update(TESTING=True)
+    with flask_app.app_context():
+        db.engine.echo = False
+        db.create_all()
+        # Every test starts with an empty process-wide shared cache
+        shared_cache._shared_cache = None
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    def make_user(username='demo'):
+        user = User(username=username, email=f"{username}@aa.io", password='password')
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make_user
+
+
+@pytest.fixture
+def make_restaurant(app, make_user):
+    def make_restaurant(name='Luigi', owner=None, menu=(), price=12, **fields):
+        """
+        Adds a restaurant owned by owner (a new 'owner' user by default) with
+        one menu item per entry of menu: a name for an Entree at price, or a
+        dict of MenuItem fields. Returns the restaurant and its menu items.
+        """
+        owner = owner or make_user('owner')
+        restaurant = Restaurant(name=name, owner_id=owner.id, **fields)
+        db.session.add(restaurant)
+        db.session.flush()
+        items = [
+            MenuItem(**{"restaurant_id": restaurant.id, "type": 'Entree', "price": price,
+                        **(item if isinstance(item, dict) else {"name": item})})
+            for item in menu
+        ]
+        db.session.add_all(items)
+        db.session.commit()
+        return restaurant, items
+    return make_restaurant
+
+
+def login(client, user):
+    """Logs the test client in as the given user."""
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+        session['_fresh'] = True
+    # Requests share the test's app context; forget the user loaded by an earlier one
+    g.pop('_login_user', None)
+
+
+class StatementCounter:
+    """Counts the SQL statements sent to the database while active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_statements(app):
+    return lambda: StatementCounter(db.engine)
@@ -0,0 +1,72 @@
+import pytest
+from app.models import db, MenuItem, Restaurant
+from app.helper_functions import autocomplete_index
+from app.helper_functions.autocomplete_index import NamePrefixIndex, normalize_name
+from conftest import login
+
+
+def test_normalize_name_folds_accents_and_punctuation():
+    assert normalize_name("  Mario's Crêpes & Café ") == "marios crepes cafe"
+
+
+def test_index_matches_every_word_start_once():
+    index = NamePrefixIndex()
+    index.build([(1, 'Thai Garden', None), (2, 'Garden Grill', None), (3, 'Gardenia', None)])
+
+    assert [item_id for item_id, _, _ in index.query('gard')] == [1, 2, 3]
+    assert [item_id for item_id, _, _ in index.query('thai g')] == [1]
+    assert index.query('garden', limit=1) == [(1, 'Thai Garden', None)]
+    assert index.query('  ') == []
+
+
+def test_upsert_and_remove_keep_the_index_in_sync():
+    index = NamePrefixIndex()
+    index.build([(1, 'Pizza Palace', 10), (2, 'Pizza Bagel', 10), (3, 'Pasta', 11)])
+
+    index.upsert(1, 'Burger Palace', 10)
+    index.remove(3)
+
+    assert [item_id for item_id, _, _ in index.query('pizza')] == [2]
+    assert [item_id for item_id, _, _ in index.query('palace')] == [1]
+    assert index.query('pasta') == []
+
+    index.remove_group(10)
+    assert index.stats()['names'] == 0
+    assert index.stats()['keys'] == 0
+
+
+@pytest.fixture
+def fresh_indexes(app):
+    # The indexes live for the whole process; rebuild them from this test's data
+    for index in (autocomplete_index.restaurant_name_index, autocomplete_index.menu_item_name_index):
+        index.build([])
+        index.built_at = None
+
+
+def test_endpoint_suggests_restaurants_and_menu_items(client, make_user, fresh_indexes):
+    owner = make_user('owner')
+    restaurant = Restaurant(name='Thai Garden', owner_id=owner.id)
+    db.session.add(restaurant)
+    db.session.flush()
+    db.session.add(MenuItem(restaurant_id=restaurant.id, name='Thai iced tea', type='Drink', price=4))
+    db.session.commit()
+
+    body = client.get('/api/restaurants/autocomplete?q=tha').get_json()
+
+    assert body['restaurants'] == [{"id": restaurant.id, "name": 'Thai Garden'}]
+    assert [item['name'] for item in body['menuItems']] == ['Thai iced tea']
+
+
+def test_writes_update_the_built_index(client, make_user, fresh_indexes):
+    owner = make_user('owner')
+    restaurant = Restaurant(name='Noodle Bar', owner_id=owner.id)
+    db.session.add(restaurant)
+    db.session.commit()
+    client.get('/api/restaurants/autocomplete?q=noo')
+    login(client, owner)
+
+    client.post(f"/api/restaurants/{restaurant.id}/menu-items",
+                json={"name": "Dan dan noodles", "description": "Spicy", "type": "entree", "price": 11})
+    body = client.get('/api/restaurants/autocomplete?q=dan').get_json()
+
+    assert [item['name'] for item in body['menuItems']] == ['Dan dan noodles']
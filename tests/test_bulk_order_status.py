@@ -0,0 +1,69 @@
+from sqlalchemy import event
+from app.models import db, Order
+from app import helper_functions as hf
+from conftest import login
+
+
+def _orders(user, *statuses):
+    orders = [Order(user_id=user.id, total_price=10, status=status) for status in statuses]
+    db.session.add_all(orders)
+    db.session.commit()
+    return [order.id for order in orders]
+
+
+def test_bulk_cancel_reports_only_the_cancelled_orders(client, make_user, monkeypatch):
+    user = make_user()
+    pending, completed = _orders(user, 'Pending', 'Pending')
+    login(client, user)
+    published = []
+    monkeypatch.setattr(hf, 'publish_order_status',
+                        lambda order, previous, status=None: published.append(order.id))
+
+    # The second order completes between the authorization read and the UPDATE
+    def complete_second_order(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE orders'):
+            cursor.execute("UPDATE orders SET status = 'Completed' WHERE id = ?", (completed,))
+    event.listen(db.engine, 'before_cursor_execute', complete_second_order)
+    try:
+        response = client.put('/api/orders/status', json={"order_ids": [pending, completed], "status": "cancel"})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', complete_second_order)
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['updated'] == 1
+    assert body['results'] == [
+        {"order_id": pending, "success": True, "status": "Cancelled"},
+        {"order_id": completed, "success": False, "error": "Cannot cancel a completed order."},
+    ]
+    assert published == [pending]
+
+
+def test_bulk_update_reports_missing_and_foreign_orders(client, make_user):
+    owner, other = make_user('owner'), make_user('other')
+    own, foreign = _orders(owner, 'Pending')[0], _orders(other, 'Pending')[0]
+    login(client, owner)
+
+    body = client.put('/api/orders/status', json={"order_ids": [own, foreign, 999], "status": "Processing"}).get_json()
+
+    assert body['updated'] == 1
+    assert [result['success'] for result in body['results']] == [True, False, False]
+    assert db.session.get(Order, foreign).status == 'Pending'
+
+
+def test_orders_already_at_the_status_are_not_counted(client, make_user, monkeypatch):
+    user = make_user()
+    pending, processing = _orders(user, 'Pending', 'Processing')
+    login(client, user)
+    published = []
+    monkeypatch.setattr(hf, 'publish_order_status',
+                        lambda order, previous, status=None: published.append(order.id))
+
+    body = client.put('/api/orders/status', json={"order_ids": [pending, processing], "status": "Processing"}).get_json()
+
+    assert body['updated'] == 1
+    assert body['results'] == [
+        {"order_id": pending, "success": True, "status": "Processing"},
+        {"order_id": processing, "success": False, "error": "Order is already Processing."},
+    ]
+    assert published == [pending]
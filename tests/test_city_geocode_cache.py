@@ -0,0 +1,42 @@
+import threading
+import pytest
+from werkzeug.serving import make_server
+from app.helper_functions import get_coordinates_from_geocoding_service, http_get
+from app.models import db, CityGeocode
+from app.stubs.geocoding_stub import create_geocoding_stub_app
+
+
+@pytest.fixture
+def geocoding_stub(app):
+    server = make_server('127.0.0.1', 0, create_geocoding_stub_app())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    app.config['GEOCODING_API_URL'] = f"{base_url}/maps/api/geocode/json"
+    yield base_url
+    server.shutdown()
+
+
+def test_cities_are_geocoded_once(geocoding_stub):
+    first = get_coordinates_from_geocoding_service('Chicago', 'key', 'Illinois')
+    again = get_coordinates_from_geocoding_service('  chicago ', 'key', 'ILLINOIS')
+
+    assert first == {'latitude': 41.8781136, 'longitude': -87.6297982}
+    assert again['latitude'] == first['latitude'] and again['longitude'] == first['longitude']
+    assert http_get(f"{geocoding_stub}/stats").json()['forward'] == 1
+    assert CityGeocode.query.one().city == 'Chicago'
+
+
+def test_unknown_cities_are_not_stored(geocoding_stub):
+    assert get_coordinates_from_geocoding_service('Atlantis', 'key') is None
+    assert CityGeocode.query.count() == 0
+
+
+def test_store_leaves_the_request_session_alone(geocoding_stub, monkeypatch):
+    calls = []
+    monkeypatch.setattr(db.session, 'commit', lambda: calls.append('commit'))
+    monkeypatch.setattr(db.session, 'rollback', lambda: calls.append('rollback'))
+
+    get_coordinates_from_geocoding_service('Houston', 'key', 'Texas')
+
+    assert calls == []
+    assert CityGeocode.query.one().city == 'Houston'
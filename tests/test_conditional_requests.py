@@ -0,0 +1,60 @@
+import pytest
+from conftest import login
+
+
+@pytest.fixture
+def restaurant(make_user, make_restaurant):
+    owner = make_user('owner')
+    restaurant, _ = make_restaurant(owner=owner, menu=['Margherita'])
+    return restaurant.id, owner
+
+
+def test_restaurant_detail_has_one_weak_etag(client, restaurant):
+    restaurant_id, _ = restaurant
+
+    miss = client.get(f"/api/restaurants/{restaurant_id}")
+    hit = client.get(f"/api/restaurants/{restaurant_id}")
+
+    assert miss.status_code == hit.status_code == 200
+    assert miss.headers['ETag'].startswith('W/"')
+    # The response cache does not change the tag of an unchanged restaurant
+    assert hit.headers['X-Cache'] == 'HIT'
+    assert hit.headers['ETag'] == miss.headers['ETag']
+    assert hit.headers['Cache-Control'] == 'private, no-cache'
+
+
+def test_revalidation_answers_304_until_the_menu_changes(client, restaurant):
+    restaurant_id, owner = restaurant
+    etag = client.get(f"/api/restaurants/{restaurant_id}").headers['ETag']
+
+    not_modified = client.get(f"/api/restaurants/{restaurant_id}", headers={'If-None-Match': etag})
+    login(client, owner)
+    created = client.post(f"/api/restaurants/{restaurant_id}/menu-items",
+                          json={"name": "Marinara", "description": "Tomato", "type": "entree", "price": 10})
+    modified = client.get(f"/api/restaurants/{restaurant_id}", headers={'If-None-Match': etag})
+
+    assert created.status_code == 201
+    assert not_modified.status_code == 304
+    assert not_modified.get_data() == b''
+    assert modified.status_code == 200
+    assert modified.headers['ETag'] != etag
+    assert len(modified.get_json()['entities']['menuItems']['allIds']) == 2
+
+
+def test_etag_is_per_user(client, make_user):
+    first_user, second_user = make_user('first'), make_user('second')
+
+    login(client, first_user)
+    etag = client.get('/api/shopping-carts/current').headers.get('ETag')
+    login(client, second_user)
+    response = client.get('/api/shopping-carts/current', headers={'If-None-Match': etag or ''})
+
+    assert response.status_code != 304
+
+
+def test_unknown_restaurant_is_not_cached(client):
+    response = client.get('/api/restaurants/999')
+
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
+    assert 'X-Cache' not in response.headers
@@ -0,0 +1,83 @@
+from flask import jsonify
+from app.helper_functions import idempotent
+from app.models import db, Payment, IdempotencyKey
+from conftest import login
+
+CARD_PAYMENT = {
+    "gateway": "Credit Card",
+    "amount": 25.5,
+    "status": "Pending",
+    "cardholder_name": "Demo User",
+    "card_number": "4242424242424242",
+    "card_expiry_month": "12",
+    "card_expiry_year": "2030",
+    "card_cvc": "123",
+    "postal_code": "94103",
+}
+
+
+def _pay(client, key):
+    return client.post('/api/payments', json=CARD_PAYMENT, headers={'Idempotency-Key': key})
+
+
+def test_payment_requires_login(client):
+    response = _pay(client, 'anonymous')
+
+    # Redirected to the unauthorized endpoint before the view or the key lookup runs
+    assert response.status_code == 302
+    assert Payment.query.count() == 0
+    assert IdempotencyKey.query.count() == 0
+
+
+def test_anonymous_idempotency_key_is_rejected(app):
+    view = idempotent('tests.create')(lambda: jsonify({"created": True}))
+
+    with app.test_request_context('/', method='POST', json={}, headers={'Idempotency-Key': 'k1'}):
+        response, status = view()
+
+    assert status == 401
+    assert IdempotencyKey.query.count() == 0
+
+
+def test_retry_replays_the_payment_without_card_fields(client, make_user):
+    login(client, make_user())
+
+    first = _pay(client, 'checkout-1')
+    retry = _pay(client, 'checkout-1')
+
+    assert first.status_code == 201
+    assert retry.status_code == 201
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert Payment.query.count() == 1
+    assert retry.get_json()['data']['id'] == first.get_json()['data']['id']
+
+    stored = db.session.query(IdempotencyKey.response_body).scalar()
+    for field in ('card_number', 'card_cvc', 'cardholder_name', '4242424242424242'):
+        assert field not in stored
+
+
+def test_keys_are_scoped_to_the_user(client, make_user):
+    first_user, second_user = make_user('first'), make_user('second')
+
+    login(client, first_user)
+    _pay(client, 'shared-key')
+    login(client, second_user)
+    response = _pay(client, 'shared-key')
+
+    assert 'Idempotent-Replayed' not in response.headers
+    assert Payment.query.count() == 2
+
+
+def test_delivery_replay_keeps_the_postal_code(client, make_user):
+    user = make_user()
+    login(client, user)
+    delivery = {"user_id": user.id, "street_address": "1 Main St", "city": "Austin",
+                "state": "TX", "postal_code": "78701", "country": "US"}
+
+    first = client.post('/api/delivery', json=delivery, headers={'Idempotency-Key': 'address-1'})
+    retry = client.post('/api/delivery', json=delivery, headers={'Idempotency-Key': 'address-1'})
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    # Only the payment endpoint redacts card fields
+    assert retry.get_json()['postal_code'] == '78701'
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import event
+from app.models import db, Favorite
+from app.benchmarks.explain_benchmark import _hot_queries, _plan, _uses_index
+
+
+def test_hot_queries_are_served_by_an_index(app):
+    dialect = db.session.get_bind().dialect
+
+    plans = {description: (table, _plan(db, dialect, query)) for description, table, query in _hot_queries()}
+    full_scans = {description: plan for description, (table, plan) in plans.items()
+                  if not _uses_index(dialect.name, table, plan)}
+
+    assert len(plans) == 10
+    assert full_scans == {}
+
+
+@pytest.fixture
+def restaurant(make_user, make_restaurant):
+    owner = make_user('owner')
+    restaurant, _ = make_restaurant(owner=owner)
+    return owner.id, restaurant.id
+
+
+def test_favorites_are_unique_per_user_and_restaurant(restaurant):
+    user_id, restaurant_id = restaurant
+    db.session.add_all([Favorite(user_id=user_id, restaurant_id=restaurant_id) for _ in range(2)])
+
+    with pytest.raises(Exception):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_double_submitted_favorite_is_already_added(client, restaurant):
+    user_id, restaurant_id = restaurant
+
+    # The other submit inserts its row between this request's lookup and insert
+    def insert_first(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO favorites'):
+            cursor.execute("INSERT INTO favorites (user_id, restaurant_id) VALUES (?, ?)", (user_id, restaurant_id))
+            cursor.connection.commit()
+    event.listen(db.engine, 'before_cursor_execute', insert_first)
+    try:
+        response = client.post('/api/favorites/', json={"user_id": user_id, "restaurant_id": restaurant_id})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', insert_first)
+
+    assert response.status_code == 200
+    assert response.get_json()['action'] == 'added'
+    assert response.get_json()['message'] == 'Favorite already added'
+    assert Favorite.query.filter_by(user_id=user_id, restaurant_id=restaurant_id).count() == 1
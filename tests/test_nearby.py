@@ -0,0 +1,76 @@
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from app.helper_functions import http_client, restaurant_helper
+from app.models import db, Restaurant
+
+
+@pytest.fixture
+def slow_server():
+    class SlowHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(2)
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+
+
+def test_nearby_aggregates_the_sources(app, client, make_user, monkeypatch):
+    owner = make_user('owner')
+    db.session.add(Restaurant(name='Luigi', owner_id=owner.id, latitude=30.2672, longitude=-97.7431))
+    db.session.commit()
+    app.config['MAPS_API_KEY'] = 'key'
+    monkeypatch.setattr(restaurant_helper, 'fetch_google_places_data', lambda lat, lng: [
+        {"google_place_id": "place-1", "name": "Tacos", "latitude": 30.268, "longitude": -97.744},
+        # Same restaurant as the local one
+        {"google_place_id": "place-2", "name": "luigi", "latitude": 30.2672, "longitude": -97.7431},
+    ])
+
+    response = client.get('/api/restaurants/nearby?latitude=30.2672&longitude=-97.7431')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['allIds']) == 2
+    assert body['byId']['place-1']['name'] == 'Tacos'
+    assert body['byId'][str(body['allIds'][0])]['google_place_id'] == 'place-2'
+
+
+def test_a_slow_source_is_stopped_at_its_timeout(app, slow_server, monkeypatch):
+    app.config['MAPS_API_KEY'] = 'key'
+    finished = threading.Event()
+    outcome = {}
+
+    def slow_fetch(lat, lng):
+        started = time.monotonic()
+        try:
+            http_client.http_get(slow_server)
+        except requests.Timeout:
+            outcome['error'] = 'timeout'
+        outcome['elapsed'] = time.monotonic() - started
+        finished.set()
+        return []
+
+    monkeypatch.setattr(restaurant_helper, 'fetch_google_places_data', slow_fetch)
+
+    result = restaurant_helper.aggregate_restaurant_data(30.2672, -97.7431, timeouts={"Google Places": 0.3})
+
+    assert result['metadata']['sources']['Google Places']['status'] == 'timeout'
+    assert finished.wait(2)
+    # The request itself gave up at the deadline instead of waiting for the server
+    assert outcome['error'] == 'timeout'
+    assert outcome['elapsed'] < 1
+
+
+def test_a_request_past_the_deadline_is_not_sent(slow_server):
+    with http_client.request_deadline(0):
+        with pytest.raises(requests.Timeout):
+            http_client.http_get(slow_server)
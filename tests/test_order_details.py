@@ -0,0 +1,90 @@
+from app.models import db, Order, OrderItem, MenuItem, Restaurant, Delivery, Payment
+from conftest import login
+
+
+def _order_with_items(user, item_count):
+    restaurant = Restaurant(name='Luigi', owner_id=user.id)
+    db.session.add(restaurant)
+    db.session.flush()
+    menu_items = [MenuItem(restaurant_id=restaurant.id, name=f"Dish {i}", type='Entree', price=10 + i)
+                  for i in range(item_count)]
+    db.session.add_all(menu_items)
+    order = Order(
+        user_id=user.id,
+        total_price=100,
+        delivery=Delivery(user_id=user.id, city='Austin', status='Pending'),
+        payment=Payment(gateway='Credit Card', amount=100, status='Pending'),
+        items=[OrderItem(menu_item=menu_item, quantity=1) for menu_item in menu_items]
+    )
+    db.session.add(order)
+    db.session.commit()
+    return order.id
+
+
+def _statements_for(client, count_statements, order_id):
+    db.session.expunge_all()
+    with count_statements() as counter:
+        response = client.get(f"/api/orders/{order_id}")
+    assert response.status_code == 200
+    return response, counter.count
+
+
+def test_order_details_use_a_fixed_number_of_statements(client, make_user, count_statements):
+    user = make_user()
+    login(client, user)
+    small_order = _order_with_items(user, 1)
+    large_order = _order_with_items(user, 25)
+
+    # The first request also loads the logged in user
+    client.get('/api/orders/999')
+    response, small_count = _statements_for(client, count_statements, small_order)
+    _, large_count = _statements_for(client, count_statements, large_order)
+
+    # ETag stamp (2) + order with delivery/payment + items with their menu items
+    assert small_count == 4
+    assert large_count == small_count
+    body = response.get_json()
+    assert body['order']['delivery']['city'] == 'Austin'
+    assert len(body['orderItems']['allIds']) == 1
+
+
+def test_order_details_of_another_user_is_forbidden(client, make_user):
+    owner, other = make_user('owner'), make_user('other')
+    order_id = _order_with_items(owner, 1)
+    login(client, other)
+
+    response = client.get(f"/api/orders/{order_id}")
+
+    assert response.status_code == 403
+    assert 'error' in response.get_json()
+
+
+def test_missing_order_is_a_json_404(client, make_user):
+    login(client, make_user())
+
+    response = client.get('/api/orders/999')
+
+    assert response.status_code == 404
+    assert 'error' in response.get_json()
+
+
+def test_reorder_requires_login(client, make_user):
+    order_id = _order_with_items(make_user(), 1)
+
+    response = client.post(f"/api/orders/{order_id}/reorder")
+
+    assert response.status_code == 302
+    assert Order.query.count() == 1
+
+
+def test_reorder_uses_the_same_clock_as_new_orders(client, make_user):
+    user = make_user()
+    login(client, user)
+    order_id = _order_with_items(user, 2)
+
+    response = client.post(f"/api/orders/{order_id}/reorder")
+
+    assert response.status_code == 200
+    past, new = Order.query.order_by(Order.id).all()
+    assert new.created_at >= past.created_at
+    assert [item.quantity for item in new.items] == [1, 1]
@@ -0,0 +1,92 @@
+import pytest
+from app.helper_functions.order_events import get_event_broker, user_channel
+from app.models import db, Order, OrderItem, MenuItem, Restaurant, Delivery
+from conftest import login
+
+
+@pytest.fixture
+def delivery(make_user):
+    customer, owner = make_user('customer'), make_user('owner')
+    restaurant = Restaurant(name='Luigi', owner_id=owner.id)
+    db.session.add(restaurant)
+    db.session.flush()
+    menu_item = MenuItem(restaurant_id=restaurant.id, name='Pizza', type='Entree', price=12)
+    delivery = Delivery(user_id=customer.id, city='Austin', status='Pending')
+    db.session.add(Order(user_id=customer.id, total_price=12, delivery=delivery,
+                         items=[OrderItem(menu_item=menu_item, quantity=1)]))
+    db.session.commit()
+    return delivery.id, customer, owner
+
+
+def test_delivery_status_requires_login(client, delivery):
+    delivery_id, _, _ = delivery
+
+    response = client.put(f"/api/delivery/{delivery_id}/status", json={"status": "Shipped"})
+
+    assert response.status_code == 302
+    assert db.session.get(Delivery, delivery_id).status == 'Pending'
+
+
+def test_only_the_restaurant_owner_updates_the_delivery(client, delivery):
+    delivery_id, customer, owner = delivery
+
+    login(client, customer)
+    refused = client.put(f"/api/delivery/{delivery_id}/status", json={"status": "Delivered"})
+    login(client, owner)
+    accepted = client.put(f"/api/delivery/{delivery_id}/status", json={"status": "Shipped"})
+
+    assert refused.status_code == 403
+    assert accepted.status_code == 200
+    assert accepted.get_json()['status'] == 'Shipped'
+
+
+def test_delivery_status_update_reaches_the_customer_subscription(client, delivery):
+    delivery_id, customer, owner = delivery
+    subscription = get_event_broker().subscribe(user_channel(customer.id))
+    login(client, owner)
+
+    try:
+        client.put(f"/api/delivery/{delivery_id}/status", json={"status": "Shipped"})
+        event = subscription.get(timeout=1)
+        # Setting the same status again is not a transition
+        client.put(f"/api/delivery/{delivery_id}/status", json={"status": "Shipped"})
+        repeated = subscription.get(timeout=0.1)
+    finally:
+        subscription.close()
+
+    assert event['type'] == 'delivery.status'
+    assert event['delivery_id'] == delivery_id
+    assert (event['previous_status'], event['status']) == ('Pending', 'Shipped')
+    assert repeated is None
+
+
+def test_delivery_status_must_be_known(client, delivery):
+    delivery_id, _, owner = delivery
+    login(client, owner)
+
+    response = client.put(f"/api/delivery/{delivery_id}/status", json={"status": "Teleported"})
+
+    assert response.status_code == 400
+    assert db.session.get(Delivery, delivery_id).status == 'Pending'
+
+
+def test_event_stream_is_disabled_by_default(client, make_user):
+    login(client, make_user())
+
+    response = client.get('/api/orders/events')
+
+    assert response.status_code == 404
+
+
+def test_event_stream_releases_the_database_session(app, client, make_user, monkeypatch):
+    login(client, make_user())
+    monkeypatch.setitem(app.config, 'ORDER_EVENTS_STREAM_ENABLED', True)
+    removed = []
+    monkeypatch.setattr(db.session, 'remove', lambda: removed.append(True))
+
+    response = client.get('/api/orders/events')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert removed
+    response.close()
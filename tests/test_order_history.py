@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from app.models import db, Order
+from conftest import login
+
+
+def _orders(user, count):
+    now = datetime(2024, 1, 1)
+    # Two orders share each timestamp so the id has to break the ties
+    db.session.add_all([Order(user_id=user.id, total_price=10, created_at=now + timedelta(minutes=i // 2))
+                        for i in range(count)])
+    db.session.commit()
+
+
+def _all_pages(client, user, limit):
+    ids, cursor = [], None
+    while True:
+        query = f"?limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(f"/api/orders/user/{user.id}{query}").get_json()
+        ids.extend(body['entities']['orders']['allIds'])
+        cursor = body['pagination']['nextCursor']
+        if not cursor:
+            return ids
+
+
+def test_cursor_walks_every_order_once_newest_first(client, make_user):
+    user = make_user()
+    _orders(user, 7)
+    login(client, user)
+
+    ids = _all_pages(client, user, limit=3)
+
+    expected = [order.id for order in
+                Order.query.order_by(Order.created_at.desc(), Order.id.desc())]
+    assert ids == expected
+
+
+def test_invalid_cursor_is_a_400(client, make_user):
+    user = make_user()
+    login(client, user)
+
+    response = client.get(f"/api/orders/user/{user.id}?cursor=not-a-cursor")
+
+    assert response.status_code == 400
+
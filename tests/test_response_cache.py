@@ -0,0 +1,83 @@
+import pytest
+from conftest import login
+
+
+@pytest.fixture
+def menu(make_user, make_restaurant):
+    owner = make_user('owner')
+    restaurant, items = make_restaurant(owner=owner, menu=['Margherita', 'Marinara'])
+    return restaurant.id, [item.id for item in items], owner
+
+
+def test_hit_skips_the_view(client, menu, count_statements):
+    restaurant_id, _, _ = menu
+
+    miss = client.get(f"/api/restaurants/{restaurant_id}/menu-items")
+    with count_statements() as counter:
+        hit = client.get(f"/api/restaurants/{restaurant_id}/menu-items")
+
+    assert miss.headers['X-Cache'] == 'MISS'
+    assert hit.headers['X-Cache'] == 'HIT'
+    assert hit.get_json() == miss.get_json()
+    # Only the ETag stamp runs
+    assert counter.count == 2
+
+
+def test_menu_item_write_invalidates_the_restaurant_responses(client, menu):
+    restaurant_id, menu_item_ids, owner = menu
+    client.get(f"/api/restaurants/{restaurant_id}/menu-items")
+    client.get(f"/api/restaurants/{restaurant_id}")
+    login(client, owner)
+
+    deleted = client.delete(f"/api/menu-items/{menu_item_ids[0]}")
+    menu_items = client.get(f"/api/restaurants/{restaurant_id}/menu-items")
+    detail = client.get(f"/api/restaurants/{restaurant_id}")
+
+    assert deleted.status_code == 200
+    assert menu_items.headers['X-Cache'] == detail.headers['X-Cache'] == 'MISS'
+    assert menu_items.get_json()['entities']['menuItems']['allIds'] == [menu_item_ids[1]]
+    assert detail.get_json()['entities']['menuItems']['allIds'] == [menu_item_ids[1]]
+
+
+def test_query_strings_are_cached_separately(client, menu):
+    restaurant_id, _, _ = menu
+    path = f"/api/restaurants/{restaurant_id}/menu-items/filter"
+
+    client.get(f"{path}?type=Entree")
+    other = client.get(f"{path}?type=Dessert")
+
+    assert other.headers['X-Cache'] == 'MISS'
+    assert other.get_json() == []
+
+
+def test_placing_an_order_invalidates_the_restaurant_responses(client, menu, make_user):
+    restaurant_id, menu_item_ids, _ = menu
+    login(client, make_user('customer'))
+    client.post('/api/shopping-carts/items', json=[{"menu_item_id": menu_item_ids[0], "quantity": 1}])
+    client.get(f"/api/restaurants/{restaurant_id}")
+
+    placed = client.post('/api/orders/create_order', json={})
+    detail = client.get(f"/api/restaurants/{restaurant_id}")
+    reordered = client.post(f"/api/orders/{placed.get_json()['order_id']}/reorder")
+    detail_after_reorder = client.get(f"/api/restaurants/{restaurant_id}")
+
+    assert placed.status_code == reordered.status_code == 200
+    # Delivery times in the body are read from the restaurant's orders
+    assert detail.headers['X-Cache'] == 'MISS'
+    assert detail_after_reorder.headers['X-Cache'] == 'MISS'
+
+
+def test_placing_an_order_reloads_the_restaurant_listing(app, client, menu, make_user):
+    from app.helper_functions import get_shared_cache, RESTAURANT_LIST_NAMESPACE
+    _, menu_item_ids, _ = menu
+    login(client, make_user('customer'))
+    client.post('/api/shopping-carts/items', json=[{"menu_item_id": menu_item_ids[0], "quantity": 1}])
+    client.get('/api/restaurants/all')
+    client.get('/api/restaurants/all')
+
+    client.post('/api/orders/create_order', json={})
+    client.get('/api/restaurants/all')
+
+    stats = get_shared_cache().stats()[RESTAURANT_LIST_NAMESPACE]
+    assert stats["loads"] == 2
+    assert stats["hits"] == 1
@@ -0,0 +1,27 @@
+from app.helper_functions import reverse_geocode_cache
+from app.models import db, ReverseGeocode, User
+
+AUSTIN = {"city": "Austin", "state": "TX", "postal_code": "78701", "country": "US"}
+
+
+def test_store_leaves_the_request_session_alone(app):
+    pending = User(username='pending', email='pending@example.com', password='password')
+    db.session.add(pending)
+
+    reverse_geocode_cache.store_address_components({"30.267,-97.743": AUSTIN}).result()
+
+    assert pending in db.session.new
+    stored = db.session.query(ReverseGeocode.cache_key, ReverseGeocode.postal_code).all()
+    assert stored == [("30.267,-97.743", "78701")]
+
+
+def test_size_bound_is_checked_on_every_nth_store(app, monkeypatch):
+    app.config.update(REVERSE_GEOCODE_MAX_ENTRIES=2, REVERSE_GEOCODE_EVICTION_INTERVAL=3)
+    monkeypatch.setattr(reverse_geocode_cache, '_store_counter', iter(range(1, 100)))
+
+    for i in range(4):
+        reverse_geocode_cache.store_address_components({f"30.00{i},-97.000": AUSTIN}).result()
+
+    # Stores 1 and 2 skip the check, store 3 trims to the bound, store 4 skips it again
+    keys = [key for key, in db.session.query(ReverseGeocode.cache_key).order_by(ReverseGeocode.cache_key)]
+    assert keys == ["30.001,-97.000", "30.002,-97.000", "30.003,-97.000"]
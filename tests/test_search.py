@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import text
+from app.models import db
+from app.helper_functions import rebuild_search_index, search_restaurant_ids
+from app.helper_functions.search_index import search_terms, SQLITE_SEARCH_TABLE_DDL
+from conftest import login
+
+@pytest.fixture
+def restaurants(app, make_user, make_restaurant):
+    db.session.execute(text(SQLITE_SEARCH_TABLE_DDL))
+    owner = make_user('owner')
+    rows = [
+        make_restaurant('Pizza Palace', owner, food_type='Italian', description='Wood fired ovens')[0],
+        make_restaurant('Thai Garden', owner, food_type='Thai', description='Curries and noodles')[0],
+        make_restaurant('Corner Deli', owner, food_type='Sandwiches', description='Cold cuts', menu=[
+            {"name": 'Pizza bagel', "description": 'Small and crispy', "type": 'Side', "price": 4}
+        ])[0],
+    ]
+    rebuild_search_index()
+    yield {restaurant.name: restaurant.id for restaurant in rows}, owner
+    db.session.execute(text("DROP TABLE restaurant_search_documents"))
+    db.session.commit()
+
+
+def test_search_terms_drop_operators():
+    assert search_terms('Thai "curry" OR -noodles*') == ['thai', 'curry', 'or', 'noodles']
+
+
+def test_words_match_as_prefixes_best_match_first(restaurants):
+    ids, _ = restaurants
+
+    found, has_more = search_restaurant_ids('pizz')
+
+    # A name match ranks above a menu item match
+    assert found == [ids['Pizza Palace'], ids['Corner Deli']]
+    assert has_more is False
+
+
+def test_every_word_has_to_match(restaurants):
+    ids, _ = restaurants
+
+    assert search_restaurant_ids('thai cur')[0] == [ids['Thai Garden']]
+    assert search_restaurant_ids('thai pizza')[0] == []
+
+
+def test_search_endpoint_pages_through_results(client, restaurants):
+    ids, _ = restaurants
+
+    first = client.get('/api/restaurants/search/pizza?limit=1').get_json()
+    second = client.get(f"/api/restaurants/search/pizza?limit=1&offset={first['pagination']['nextOffset']}").get_json()
+
+    assert [r['id'] for r in first['restaurants']] == [ids['Pizza Palace']]
+    assert first['pagination'] == {"limit": 1, "offset": 0, "nextOffset": 1, "hasMore": True}
+    assert [r['id'] for r in second['restaurants']] == [ids['Corner Deli']]
+    assert second['pagination']['hasMore'] is False
+
+
+def test_menu_item_write_refreshes_the_document(client, restaurants):
+    ids, owner = restaurants
+    login(client, owner)
+
+    client.post(f"/api/restaurants/{ids['Thai Garden']}/menu-items",
+                json={"name": "Mango sticky rice", "description": "Coconut", "type": "dessert", "price": 6})
+
+    assert search_restaurant_ids('mango')[0] == [ids['Thai Garden']]
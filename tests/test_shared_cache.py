@@ -0,0 +1,43 @@
+import time
+import pytest
+import fakeredis
+from app.helper_functions.shared_cache import SharedCache, LocalRedis
+
+
+@pytest.fixture(params=['local', 'fakeredis'])
+def cache(request):
+    client = LocalRedis() if request.param == 'local' else fakeredis.FakeRedis()
+    return SharedCache(client, prefix='test')
+
+
+def test_miss_loads_once_then_hits(cache):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"name": "Luigi"}
+
+    assert cache.get_or_set('restaurants', 1, loader) == {"name": "Luigi"}
+    assert cache.get_or_set('restaurants', 1, loader) == {"name": "Luigi"}
+    assert len(calls) == 1
+
+
+def test_failing_loader_releases_the_lock(cache):
+    def failing_loader():
+        raise RuntimeError("database down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_set('restaurants', 1, failing_loader)
+
+    started = time.monotonic()
+    assert cache.get_or_set('restaurants', 1, lambda: "loaded") == "loaded"
+    # The next caller gets the lock right away instead of waiting out its TTL
+    assert time.monotonic() - started < 1
+
+
+def test_bumping_the_namespace_invalidates_its_keys(cache):
+    cache.get_or_set('restaurants', 1, lambda: "old")
+
+    cache.invalidate('restaurants')
+
+    assert cache.get_or_set('restaurants', 1, lambda: "new") == "new"
@@ -0,0 +1,47 @@
+import pytest
+from app.models import ShoppingCartItem
+from conftest import login
+
+
+@pytest.fixture
+def menu(make_user, make_restaurant):
+    owner = make_user('owner')
+    items = [make_restaurant(name, owner, menu=[f"{name} special"], price=10)[1][0] for name in ('Luigi', 'Sakura')]
+    return [item.id for item in items]
+
+
+def test_adding_the_same_item_twice_merges_the_line(client, make_user, menu):
+    login(client, make_user())
+
+    first = client.post('/api/shopping-carts/items/add', json={"menu_item_id": menu[0], "quantity": 1})
+    second = client.post('/api/shopping-carts/items/add', json={"menu_item_id": menu[0], "quantity": 2})
+
+    assert first.status_code == second.status_code == 201
+    assert first.get_json()['entities']['shoppingCartItems']['allIds'] == \
+        second.get_json()['entities']['shoppingCartItems']['allIds']
+    line = ShoppingCartItem.query.one()
+    assert line.quantity == 3
+
+
+def test_single_add_keeps_the_cart_to_one_restaurant(client, make_user, menu):
+    login(client, make_user())
+    client.post('/api/shopping-carts/items/add', json={"menu_item_id": menu[0], "quantity": 1})
+
+    response = client.post('/api/shopping-carts/items/add', json={"menu_item_id": menu[1], "quantity": 1})
+
+    assert response.status_code == 400
+    assert 'one restaurant' in response.get_json()['error']
+    assert ShoppingCartItem.query.count() == 1
+
+
+def test_batch_add_returns_the_whole_cart(client, make_user, menu):
+    login(client, make_user())
+    client.post('/api/shopping-carts/items/add', json={"menu_item_id": menu[0], "quantity": 1})
+
+    response = client.post('/api/shopping-carts/items', json=[{"menu_item_id": menu[0], "quantity": 2}])
+
+    body = response.get_json()
+    assert response.status_code == 201
+    assert body['metadata'] == {"totalItems": 1, "totalPrice": 30.0}
+    item, = body['entities']['shoppingCartItems']['byId'].values()
+    assert item['restaurant_id'] is not None
@@ -0,0 +1,34 @@
+import time
+import threading
+from app.helper_functions.uber_token_manager import UberTokenManager, InMemoryTokenStore
+
+
+def test_token_inside_the_margin_is_served_while_the_refresh_runs():
+    manager = UberTokenManager('client', 'secret', InMemoryTokenStore())
+    manager._token = {"access_token": "current", "expires_at": time.time() + 120}
+    requested = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_request():
+        calls.append(1)
+        requested.set()
+        release.wait(5)
+        return {"access_token": "fresh", "expires_at": time.time() + 3600}
+
+    manager._request_token = slow_request
+
+    assert manager.get_token() == "current"
+    assert requested.wait(5)
+    # The refresh holds its lock for the whole token request
+    started = time.monotonic()
+    tokens = [manager.get_token() for _ in range(3)]
+    assert time.monotonic() - started < 1
+    assert tokens == ["current"] * 3
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while manager._background_refresh_lock.locked() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert manager.get_token() == "fresh"
+    assert len(calls) == 1